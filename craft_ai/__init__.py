@@ -1,16 +1,60 @@
 __version__ = "2.2.8"
 
+import importlib
+import sys
+
 from . import errors
-from .client import Client
-from .interpreter import Interpreter
-from .time import Time
-from .formatters import format_property, format_decision_rules
-from .reducer import reduce_decision_rules
-from .tree_utils import (
-    extract_decision_paths_from_tree,
-    extract_decision_path_neighbors,
-    extract_output_tree,
-)
+
+# The exports are imported on first access, so that importing the interpreter
+# doesn't import the HTTP client dependencies and vice versa, cf. PEP 562.
+_LAZY_EXPORTS = {
+    "Client": ".client",
+    "Interpreter": ".interpreter",
+    "Time": ".time",
+    "format_property": ".formatters",
+    "format_decision_rules": ".formatters",
+    "reduce_decision_rules": ".reducer",
+    "ExplanationIndex": ".explanations",
+    "compile_decide": ".codegen",
+    "generate_decide_source": ".codegen",
+    "tree_to_sql": ".sql",
+    "CompactTree": ".compact_tree",
+    "load_compact_tree": ".compact_tree",
+    "save_compact_tree": ".compact_tree",
+    "DecisionProfiler": ".profiling",
+    "DecisionTreeManager": ".tree_manager",
+    "ContextHistoryMirror": ".history_mirror",
+    "OperationsValidator": ".operations_validator",
+    "RequestStats": ".request_stats",
+    "DecisionPathIndex": ".tree_utils",
+    "extract_decision_paths_from_tree": ".tree_utils",
+    "extract_decision_path_neighbors": ".tree_utils",
+    "extract_output_tree": ".tree_utils",
+    "iter_decision_paths": ".tree_utils",
+    "compact_decision_tree": ".tree_utils",
+    "get_decision_tree_memory_size": ".tree_utils",
+    "parse_v2_tree": ".tree_utils",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    # Cached, the next accesses don't go through `__getattr__`
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+if sys.version_info < (3, 7):
+    # Module level `__getattr__` isn't supported, the exports are imported eagerly
+    for _name in _LAZY_EXPORTS:
+        __getattr__(_name)
+    del _name
 
 # Defining what will be imported when doing `from craft_ai import *`
 
@@ -22,7 +66,24 @@ __all__ = [
     "format_property",
     "format_decision_rules",
     "reduce_decision_rules",
+    "ExplanationIndex",
+    "compile_decide",
+    "generate_decide_source",
+    "tree_to_sql",
+    "CompactTree",
+    "load_compact_tree",
+    "save_compact_tree",
+    "DecisionProfiler",
+    "DecisionTreeManager",
+    "ContextHistoryMirror",
+    "OperationsValidator",
+    "RequestStats",
     "extract_output_tree",
+    "DecisionPathIndex",
     "extract_decision_paths_from_tree",
     "extract_decision_path_neighbors",
+    "iter_decision_paths",
+    "compact_decision_tree",
+    "get_decision_tree_memory_size",
+    "parse_v2_tree",
 ]
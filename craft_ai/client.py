@@ -2,9 +2,11 @@
 # cf. https://stackoverflow.com/a/28854227
 from __future__ import absolute_import
 
+import datetime
+import functools
 import json
+import os
 import time
-import datetime
 
 from platform import python_implementation, python_version
 from urllib.parse import urlparse
@@ -22,9 +24,12 @@ from .errors import (
     CraftAiLongRequestTimeOutError,
     CraftAiNetworkError,
 )
-from .helpers import extract_operations_count_from_message
-from .interpreter import Interpreter
+from .helpers import SingleFlight, extract_operations_count_from_message
+from .history_mirror import ContextHistoryMirror
 from .jwt_decode import jwt_decode
+from .operations_validator import OperationsValidator
+from .request_stats import RequestStats
+from .tree_utils import compact_decision_tree
 
 USER_AGENT = "craft-ai-client-python/{} [{} {}]".format(
     pkg_version, python_implementation(), python_version()
@@ -44,15 +49,40 @@ def current_time_ms():
     return int(round(time.time() * 1000))
 
 
+def coalesced(method):
+    """Share the request of the concurrent calls of a method with the same arguments.
+
+    Enabled by the `requestCoalescing` configuration.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._config.get("requestCoalescing"):
+            return method(self, *args, **kwargs)
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return self._single_flight.do(key, method, self, *args, **kwargs)
+
+    return wrapper
+
+
 class Client(object):
     """Client class for craft ai's API"""
 
+    _operations_validator_class = OperationsValidator
+
     def __init__(self, cfg):
         self._base_url = ""
         self._headers = {}
         self._config = {}
-        # Requests session: connection pooling and base configuration for all requests
-        self._requests_session = requests.Session()
+        # Process specific state, created lazily and again after a fork, see
+        # `_ensure_process_state`
+        self._pid = None
+        self._session = None
+        self._flight = None
 
         try:
             self.config = cfg
@@ -99,6 +129,20 @@ class Client(object):
             cfg.get("boostingDecisionRetrievalTimeout"), int
         ):
             cfg["boostingDecisionRetrievalTimeout"] = 1000 * 60 * 5  # 5 minutes
+        if not isinstance(cfg.get("requestCoalescing"), bool):
+            cfg["requestCoalescing"] = False
+        if not isinstance(cfg.get("operationsValidation"), bool):
+            cfg["operationsValidation"] = False
+        if isinstance(cfg.get("contextHistoryMirror"), str):
+            cfg["contextHistoryMirror"] = ContextHistoryMirror(
+                cfg["contextHistoryMirror"]
+            )
+        if cfg.get("requestStats") is True:
+            cfg["requestStats"] = RequestStats()
+        elif not isinstance(cfg.get("requestStats"), RequestStats):
+            cfg["requestStats"] = None
+        if not isinstance(cfg.get("contextHistoryMaxAge"), (int, float)):
+            cfg["contextHistoryMaxAge"] = 0
         if not isinstance(cfg.get("url"), str):
             cfg["url"] = "https://beta.craft.ai"
         if cfg.get("url").endswith("/"):
@@ -114,23 +158,71 @@ class Client(object):
             self.config["url"], self.config["owner"], self.config["project"]
         )
 
-        if cfg.get("proxy"):
-            scheme = urlparse(self.config["url"]).scheme
-            if not scheme:
-                raise CraftAiCredentialsError(
-                    """Unable to create client with an URL"""
-                    """ without a scheme. Cannot configure"""
-                    """ the proxy."""
-                )
-            proxies = {}
-            proxies[scheme] = cfg.get("proxy")
-            self._requests_session.proxies = proxies
+        if cfg.get("proxy") and not urlparse(self.config["url"]).scheme:
+            raise CraftAiCredentialsError(
+                """Unable to create client with an URL"""
+                """ without a scheme. Cannot configure"""
+                """ the proxy."""
+            )
+        if self._session is not None:
+            self._configure_session(self._session)
+
+    def __getstate__(self):
+        # Only the validated configuration is pickled, the session and the requests
+        # in flight belong to the pickling process
+        return {"config": self._config}
+
+    def __setstate__(self, state):
+        self._config = state["config"]
+        self._base_url = "{}/api/v1/{}/{}".format(
+            self._config["url"], self._config["owner"], self._config["project"]
+        )
+        self._headers = {}
+        self._pid = None
+        self._session = None
+        self._flight = None
+
+    def _ensure_process_state(self):
+        # The pooled connections of a session can't be shared with a forked process,
+        # neither can the requests in flight of the parent process
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid = pid
+            self._session = None
+            self._flight = SingleFlight()
+
+    def _configure_session(self, session):
+        if self._config.get("proxy"):
+            scheme = urlparse(self._config["url"]).scheme
+            session.proxies = {scheme: self._config["proxy"]}
         # Headers have to be set here to avoid multiple definitions
         # of the 'Authorization' header if config is modified
         base_headers = {}
-        base_headers["Authorization"] = "Bearer " + self.config.get("token")
+        base_headers["Authorization"] = "Bearer " + self._config.get("token")
         base_headers["User-Agent"] = USER_AGENT
-        self._requests_session.headers = base_headers
+        session.headers = base_headers
+
+    @property
+    def _requests_session(self):
+        """Requests session: connection pooling and base configuration for all
+        requests, created on first use in each process."""
+        self._ensure_process_state()
+        if self._session is None:
+            session = requests.Session()
+            self._configure_session(session)
+            self._session = session
+        return self._session
+
+    @_requests_session.setter
+    def _requests_session(self, session):
+        self._ensure_process_state()
+        self._session = session
+
+    @property
+    def _single_flight(self):
+        """Concurrent identical requests in flight, see `coalesced`."""
+        self._ensure_process_state()
+        return self._flight
 
     #################
     # Agent methods #
@@ -165,14 +257,14 @@ class Client(object):
             payload["id"] = agent_id
 
         try:
-            json_pl = json.dumps(payload)
+            json_pl = self._encode_payload(payload)
         except TypeError as err:
             raise CraftAiBadRequestError(
                 "Invalid configuration or agent id given. {}".format(err.__str__())
             )
 
         req_url = "{}/agents".format(self._base_url)
-        resp = self._requests_session.post(req_url, headers=ct_header, data=json_pl)
+        resp = self._request("post", req_url, headers=ct_header, data=json_pl)
 
         agent = self._decode_response(resp)
 
@@ -218,7 +310,7 @@ class Client(object):
         self._check_entity_id(agent_id)
 
         req_url = "{}/agents/{}".format(self._base_url, agent_id)
-        resp = self._requests_session.get(req_url)
+        resp = self._request("get", req_url)
 
         agent = self._decode_response(resp)
 
@@ -227,7 +319,7 @@ class Client(object):
     def list_agents(self):
 
         req_url = "{}/agents".format(self._base_url)
-        resp = self._requests_session.get(req_url)
+        resp = self._request("get", req_url)
 
         agents = self._decode_response(resp)
 
@@ -247,9 +339,11 @@ class Client(object):
         self._check_entity_id(agent_id)
 
         req_url = "{}/agents/{}".format(self._base_url, agent_id)
-        resp = self._requests_session.delete(req_url)
+        resp = self._request("delete", req_url)
 
         decoded_resp = self._decode_response(resp)
+        # An agent created again with the same id has a new history
+        self._invalidate_mirrored_history(agent_id)
 
         return decoded_resp
 
@@ -278,6 +372,8 @@ class Client(object):
             "{}/bulk/agents".format(self._base_url),
             "DELETE",
         )
+        for i in valid_indices:
+            self._invalidate_mirrored_history(payload[i]["id"])
 
         if invalid_indices == []:
             return valid_agents
@@ -292,7 +388,7 @@ class Client(object):
         self._check_entity_id(agent_id)
 
         req_url = "{}/agents/{}/shared".format(self._base_url, agent_id)
-        resp = self._requests_session.get(req_url)
+        resp = self._request("get", req_url)
 
         url = self._decode_response(resp)
 
@@ -306,7 +402,7 @@ class Client(object):
         self._check_entity_id(agent_id)
 
         req_url = "{}/agents/{}/shared".format(self._base_url, agent_id)
-        resp = self._requests_session.delete(req_url)
+        resp = self._request("delete", req_url)
 
         decoded_resp = self._decode_response(resp)
 
@@ -341,14 +437,14 @@ class Client(object):
             payload["id"] = generator_id
 
         try:
-            json_pl = json.dumps(payload)
+            json_pl = self._encode_payload(payload)
         except TypeError as err:
             raise CraftAiBadRequestError(
                 "Invalid configuration or generator id given. {}".format(err.__str__())
             )
 
         req_url = "{}/generators".format(self._base_url)
-        resp = self._requests_session.post(req_url, headers=ct_header, data=json_pl)
+        resp = self._request("post", req_url, headers=ct_header, data=json_pl)
 
         generator = self._decode_response(resp)
 
@@ -392,7 +488,7 @@ class Client(object):
         self._check_entity_id(generator_id)
 
         req_url = "{}/generators/{}".format(self._base_url, generator_id)
-        resp = self._requests_session.get(req_url)
+        resp = self._request("get", req_url)
 
         generator = self._decode_response(resp)
 
@@ -401,7 +497,7 @@ class Client(object):
     def list_generators(self):
 
         req_url = "{}/generators".format(self._base_url)
-        resp = self._requests_session.get(req_url)
+        resp = self._request("get", req_url)
 
         generators = self._decode_response(resp)
 
@@ -419,7 +515,7 @@ class Client(object):
         self._check_entity_id(generator_id)
 
         req_url = "{}/generators/{}".format(self._base_url, generator_id)
-        resp = self._requests_session.delete(req_url)
+        resp = self._request("delete", req_url)
 
         decoded_resp = self._decode_response(resp)
 
@@ -459,6 +555,7 @@ class Client(object):
             valid_indices, valid_generators, invalid_indices, invalid_generators
         )
 
+    @coalesced
     def _get_generator_decision_tree(
         self, generator_id, timestamp, version=DEFAULT_DECISION_TREE_VERSION
     ):
@@ -489,11 +586,11 @@ class Client(object):
                 self._base_url, generator_id, timestamp
             )
 
-        resp = self._requests_session.get(req_url)
+        resp = self._request("get", req_url)
 
         decision_tree = self._decode_response(resp)
 
-        return decision_tree
+        return self._compact_decision_tree(decision_tree)
 
     def get_generator_decision_tree(
         self, generator_id, timestamp=None, version=DEFAULT_DECISION_TREE_VERSION
@@ -541,7 +638,8 @@ class Client(object):
                     generator_id, timestamp, version
                 )
             except CraftAiLongRequestTimeOutError:
-                # Do nothing and continue.
+                self._record_poll("get_generator_decision_tree")
+                # Try again
                 continue
 
     def _get_generators_decision_trees_bulk(
@@ -564,6 +662,11 @@ class Client(object):
             "{}/bulk/generators/tree".format(self._base_url),
             "POST",
         )
+        for decision_tree in valid_dts:
+            if "tree" in decision_tree:
+                decision_tree["tree"] = self._compact_decision_tree(
+                    decision_tree["tree"]
+                )
 
         if invalid_indices == []:
             return valid_dts
@@ -620,14 +723,15 @@ class Client(object):
                     payload, valid_indices, invalid_indices, invalid_dts
                 )
             except CraftAiLongRequestTimeOutError:
-                # Do nothing and continue.
+                self._record_poll("get_generators_decision_trees_bulk")
+                # Try again
                 continue
 
     def _get_generator_operations_pages(self, url, ops_list):
         if url is None:
             return ops_list
 
-        resp = self._requests_session.get(url)
+        resp = self._request("get", url)
 
         new_ops_list = self._decode_response(resp)
         next_page_url = resp.headers.get("x-craft-ai-next-page-url")
@@ -642,7 +746,7 @@ class Client(object):
 
         req_url = "{}/generators/{}/context".format(self._base_url, generator_id)
         req_params = {"start": start, "end": end}
-        resp = self._requests_session.get(req_url, params=req_params)
+        resp = self._request("get", req_url, params=req_params)
 
         initial_ops_list = self._decode_response(resp)
         next_page_url = resp.headers.get("x-craft-ai-next-page-url")
@@ -678,25 +782,44 @@ class Client(object):
                 the pandas Client handle such type of data"""
             )
 
+        if self._config["operationsValidation"]:
+            self._validate_operations(agent_id, operations)
+
+        return self._add_agent_operations(agent_id, operations)
+
+    def _validate_operations(self, agent_id, operations, configuration=None):
+        """Check the operations against the agent configuration, retrieved if not
+        given, before sending any of them.
+
+        :raise CraftAiBadRequestError: if some operations are invalid.
+        """
+        if configuration is None:
+            configuration = self.get_agent(agent_id)["configuration"]
+        self._operations_validator_class(configuration).check(operations)
+
+    def _add_agent_operations(self, agent_id, operations):
         # Extra header in addition to the main session's
         ct_header = {"Content-Type": "application/json; charset=utf-8"}
         offset = 0
         added_operations_count = 0
 
+        # Even if some chunks fail, the history may have changed
+        self._invalidate_mirrored_history(agent_id, operations)
+
         is_looping = True
 
         while is_looping:
             next_offset = offset + self.config["operationsChunksSize"]
 
             try:
-                json_pl = json.dumps(operations[offset:next_offset])
+                json_pl = self._encode_payload(operations[offset:next_offset])
             except TypeError as err:
                 raise CraftAiBadRequestError(
                     "Invalid configuration or agent id given. {}".format(err.__str__())
                 )
 
             req_url = "{}/agents/{}/context".format(self._base_url, agent_id)
-            resp = self._requests_session.post(req_url, headers=ct_header, data=json_pl)
+            resp = self._request("post", req_url, headers=ct_header, data=json_pl)
             decoded_response = self._decode_response(resp)
 
             added_operations_count += extract_operations_count_from_message(
@@ -734,7 +857,7 @@ class Client(object):
         for chunk in chunked_data:
             if len(chunk) > 1:
                 try:
-                    json_pl = json.dumps(chunk)
+                    json_pl = self._encode_payload(chunk)
                 except TypeError as err:
                     raise CraftAiBadRequestError(
                         "Error while dumping the payload into json"
@@ -742,7 +865,9 @@ class Client(object):
                             err.__str__()
                         )
                     )
-                resp = self._requests_session.post(url, headers=ct_header, data=json_pl)
+                for agent in chunk:
+                    self._invalidate_mirrored_history(agent["id"], agent["operations"])
+                resp = self._request("post", url, headers=ct_header, data=json_pl)
                 decoded_response = self._decode_response(resp)
                 responses += [
                     {
@@ -825,20 +950,52 @@ class Client(object):
         if url is None:
             return ops_list
 
-        resp = self._requests_session.get(url)
+        resp = self._request("get", url)
 
         new_ops_list = self._decode_response(resp)
         next_page_url = resp.headers.get("x-craft-ai-next-page-url")
 
         return self._get_agent_operations_pages(next_page_url, ops_list + new_ops_list)
 
+    def _invalidate_mirrored_history(self, agent_id, operations=None):
+        """Drop the mirrored history of an agent changed by the given operations, or
+        the whole mirrored history of the agent if no operations are given."""
+        mirror = self._config.get("contextHistoryMirror")
+        if mirror is None:
+            return
+        since = None
+        if operations is not None:
+            try:
+                since = min(operation["timestamp"] for operation in operations)
+            except (KeyError, TypeError, ValueError):
+                # Unexpected operations, the whole history is retrieved again
+                since = None
+        mirror.invalidate(agent_id, since)
+
+    def _get_mirrored_history(self, agent_id, kind, start, end, fetch):
+        """Serve the history of an agent from the `contextHistoryMirror`, after
+        synchronizing it if it's older than `contextHistoryMaxAge` seconds."""
+        mirror = self._config["contextHistoryMirror"]
+        if not mirror.is_fresh(agent_id, kind, self._config["contextHistoryMaxAge"]):
+            mirror.sync(
+                agent_id, kind, lambda agent_id, start: fetch(agent_id, start, None)
+            )
+        return mirror.get(agent_id, kind, start, end)
+
     def get_agent_operations(self, agent_id, start=None, end=None):
         # Raises an error when agent_id is invalid
         self._check_entity_id(agent_id)
 
+        if self._config.get("contextHistoryMirror") is not None:
+            return self._get_mirrored_history(
+                agent_id, "operations", start, end, self._get_agent_operations
+            )
+        return self._get_agent_operations(agent_id, start, end)
+
+    def _get_agent_operations(self, agent_id, start, end):
         req_url = "{}/agents/{}/context".format(self._base_url, agent_id)
         req_params = {"start": start, "end": end}
-        resp = self._requests_session.get(req_url, params=req_params)
+        resp = self._request("get", req_url, params=req_params)
 
         initial_ops_list = self._decode_response(resp)
         next_page_url = resp.headers.get("x-craft-ai-next-page-url")
@@ -849,7 +1006,7 @@ class Client(object):
         if url is None:
             return states
 
-        resp = self._requests_session.get(url)
+        resp = self._request("get", url)
 
         new_states = self._decode_response(resp)
         next_page_url = resp.headers.get("x-craft-ai-next-page-url")
@@ -860,15 +1017,23 @@ class Client(object):
         # Raises an error when agent_id is invalid
         self._check_entity_id(agent_id)
 
+        if self._config.get("contextHistoryMirror") is not None:
+            return self._get_mirrored_history(
+                agent_id, "states", start, end, self._get_agent_states
+            )
+        return self._get_agent_states(agent_id, start, end)
+
+    def _get_agent_states(self, agent_id, start, end):
         req_url = "{}/agents/{}/context/state/history".format(self._base_url, agent_id)
         req_params = {"start": start, "end": end}
-        resp = self._requests_session.get(req_url, params=req_params)
+        resp = self._request("get", req_url, params=req_params)
 
         initial_states_history = self._decode_response(resp)
         next_page_url = resp.headers.get("x-craft-ai-next-page-url")
 
         return self._get_agent_states_pages(next_page_url, initial_states_history)
 
+    @coalesced
     def get_agent_state(self, agent_id, timestamp):
         # Raises an error when agent_id is invalid
         self._check_entity_id(agent_id)
@@ -876,7 +1041,7 @@ class Client(object):
         req_url = "{}/agents/{}/context/state?t={}".format(
             self._base_url, agent_id, timestamp
         )
-        resp = self._requests_session.get(req_url)
+        resp = self._request("get", req_url)
 
         context_state = self._decode_response(resp)
 
@@ -886,6 +1051,7 @@ class Client(object):
     # Decision tree methods #
     #########################
 
+    @coalesced
     def _get_agent_decision_tree(
         self, agent_id, timestamp, version=DEFAULT_DECISION_TREE_VERSION
     ):
@@ -916,11 +1082,11 @@ class Client(object):
                 self._base_url, agent_id, timestamp
             )
 
-        resp = self._requests_session.get(req_url)
+        resp = self._request("get", req_url)
 
         decision_tree = self._decode_response(resp)
 
-        return decision_tree
+        return self._compact_decision_tree(decision_tree)
 
     def get_agent_decision_tree(
         self, agent_id, timestamp=None, version=DEFAULT_DECISION_TREE_VERSION
@@ -966,7 +1132,8 @@ class Client(object):
             try:
                 return self._get_agent_decision_tree(agent_id, timestamp, version)
             except CraftAiLongRequestTimeOutError:
-                # Do nothing and continue.
+                self._record_poll("get_agent_decision_tree")
+                # Try again
                 continue
 
     def _get_agents_decision_trees_bulk(
@@ -989,6 +1156,11 @@ class Client(object):
             "{}/bulk/decision_tree".format(self._base_url),
             "POST",
         )
+        for decision_tree in valid_dts:
+            if "tree" in decision_tree:
+                decision_tree["tree"] = self._compact_decision_tree(
+                    decision_tree["tree"]
+                )
 
         if invalid_indices == []:
             return valid_dts
@@ -1045,11 +1217,12 @@ class Client(object):
                     payload, valid_indices, invalid_indices, invalid_dts
                 )
             except CraftAiLongRequestTimeOutError:
-                # Do nothing and continue.
+                self._record_poll("get_agents_decision_trees_bulk")
+                # Try again
                 continue
 
     @staticmethod
-    def decide(tree, *args):
+    def decide(tree, *args, profiler=None):
         for argument in args:
             # Suggest pandas client if a dataframe is provided
             if hasattr(argument, "shape"):
@@ -1057,7 +1230,35 @@ class Client(object):
                     """A dataframe of operations has been provided,
                     the pandas Client handle such type of data"""
                 )
-        return Interpreter.decide(tree, args)
+        # Imported on use, the HTTP only usages don't need the interpreter
+        from .interpreter import Interpreter
+
+        return Interpreter.decide(tree, args, profiler)
+
+    @staticmethod
+    def decide_many(tree, contexts, times=None, explain=False, profiler=None):
+        """Take a decision for each of the given contexts.
+
+        :param dict tree: decision tree.
+        :param contexts: iterable of contexts.
+        :param times: Optional. Iterable of `Time` instances matching the contexts.
+        :param explain: Optional. If `True`, or given an `ExplanationIndex` of the
+        tree, adds the precomputed "reduced_decision_rules" and "explanation" to the
+        decision of each output.
+        :param profiler: Optional. `DecisionProfiler` recording the decisions.
+
+        :return: generator of decisions, a context for which no decision can be
+        taken yields `{"error": error}`.
+        :rtype: generator of dict.
+        """
+        if hasattr(contexts, "shape"):
+            raise CraftAiBadRequestError(
+                """A dataframe of contexts has been provided,
+                the pandas Client handle such type of data"""
+            )
+        from .interpreter import Interpreter
+
+        return Interpreter.decide_many(tree, contexts, times, explain, profiler)
 
     ####################
     # Boosting methods #
@@ -1113,7 +1314,8 @@ class Client(object):
                     agent_id, window, entity_type, context
                 )
             except CraftAiLongRequestTimeOutError:
-                # Do nothing and continue.
+                self._record_poll("get_agent_boosting_decision")
+                # Try again
                 continue
 
     def get_generator_boosting_decision(self, generator_id, from_ts, to_ts, context):
@@ -1166,7 +1368,8 @@ class Client(object):
                     generator_id, window, entity_type, context
                 )
             except CraftAiLongRequestTimeOutError:
-                # Do nothing and continue.
+                self._record_poll("get_generator_boosting_decision")
+                # Try again
                 continue
 
     def _get_entity_boosting_decision(self, entity_id, window, entity_type, context):
@@ -1195,9 +1398,9 @@ class Client(object):
             self._base_url, entity_type, entity_id
         )
         payload = {"timeWindow": window, "context": context}
-        json_pl = json.dumps(payload)
+        json_pl = self._encode_payload(payload)
 
-        resp = self._requests_session.post(req_url, headers=ct_header, data=json_pl)
+        resp = self._request("post", req_url, headers=ct_header, data=json_pl)
 
         decision = self._decode_response(resp)
 
@@ -1245,17 +1448,93 @@ class Client(object):
 
         return decisions
 
-    @staticmethod
-    def _parse_body(response):
+    def _request(self, method, url, **kwargs):
+        """Send a request with the session of the client, recording it in the
+        `requestStats` of the configuration if any.
+
+        :param str method: "get", "post" or "delete".
+        :param str url: the url of the request.
+        """
+        send = getattr(self._requests_session, method)
+        stats = self._config.get("requestStats")
+        if stats is None:
+            return send(url, **kwargs)
+
+        data = kwargs.get("data")
+        start = time.perf_counter()
+        try:
+            response = send(url, **kwargs)
+        except Exception as err:
+            stats.record_request(
+                method,
+                url,
+                time.perf_counter() - start,
+                request_bytes=len(data) if data else 0,
+                error=type(err).__name__,
+            )
+            raise
+        duration = time.perf_counter() - start
+        status_code = response.status_code
+        error = None
+        if status_code not in [200, 201, 204, 207]:
+            error = type(Client._get_error_from_status(status_code, None)).__name__
+        stats.record_request(
+            method,
+            url,
+            duration,
+            status_code=status_code,
+            request_bytes=len(data) if data else 0,
+            response_bytes=len(response.content or b""),
+            error=error,
+        )
+        return response
+
+    def _encode_payload(self, payload):
+        stats = self._config.get("requestStats")
+        if stats is None:
+            return json.dumps(payload)
+        start = time.perf_counter()
+        json_pl = json.dumps(payload)
+        stats.record_encode(time.perf_counter() - start, len(json_pl))
+        return json_pl
+
+    def _record_poll(self, operation):
+        stats = self._config.get("requestStats")
+        if stats is not None:
+            stats.record_poll(operation)
+
+    def _parse_body(self, response):
+        stats = self._config.get("requestStats")
+        start = time.perf_counter() if stats is not None else None
         try:
             return response.json()
         except Exception:
             raise CraftAiInternalError(
                 "Internal Error, the craft ai server responded in an invalid format."
             )
+        finally:
+            if start is not None:
+                stats.record_decode(time.perf_counter() - start)
 
-    @staticmethod
-    def _decode_response(response):
+    def _compact_decision_tree(self, decision_tree):
+        """Compact the decision tree according to the client configuration.
+
+        :param dict decision_tree: decision tree, as decoded from the response.
+
+        :return: decision tree.
+        :rtype: dict.
+        """
+        compaction = self._config.get("decisionTreeCompaction")
+        if not compaction:
+            return decision_tree
+        options = compaction if isinstance(compaction, dict) else {}
+        return compact_decision_tree(
+            decision_tree,
+            strip_metadata=options.get("strip_metadata", False),
+            tuple_distributions=options.get("tuple_distributions", False),
+        )
+
+    def _decode_response(self, response):
         """Decode the response of a request.
 
         :param response: response of a request.
@@ -1266,17 +1545,15 @@ class Client(object):
         """
         status_code = response.status_code
 
+        if status_code in [200, 201, 204, 207]:
+            return self._parse_body(response)
+
         message = "Status code " + str(status_code)
         try:
-            message = Client._parse_body(response)["message"]
+            message = self._parse_body(response)["message"]
         except (CraftAiInternalError, KeyError, TypeError):
             pass
-
-        if status_code in [200, 201, 204, 207]:
-            return Client._parse_body(response)
-        else:
-            raise Client._get_error_from_status(status_code, message)
-        return None
+        raise Client._get_error_from_status(status_code, message)
 
     @staticmethod
     def _decode_response_bulk(response_bulk):
@@ -1456,7 +1733,7 @@ class Client(object):
         ct_header = {"Content-Type": "application/json; charset=utf-8"}
 
         try:
-            json_pl = json.dumps(payload)
+            json_pl = self._encode_payload(payload)
         except TypeError as err:
             raise CraftAiBadRequestError(
                 "Error while dumping the payload into json"
@@ -1465,11 +1742,9 @@ class Client(object):
                 )
             )
         if request_type == "POST":
-            resp = self._requests_session.post(req_url, headers=ct_header, data=json_pl)
+            resp = self._request("post", req_url, headers=ct_header, data=json_pl)
         elif request_type == "DELETE":
-            resp = self._requests_session.delete(
-                req_url, headers=ct_header, data=json_pl
-            )
+            resp = self._request("delete", req_url, headers=ct_header, data=json_pl)
         else:
             raise CraftAiBadRequestError(
                 "Request for the bulk API should be either a POST or DELETE" "request"
@@ -0,0 +1,496 @@
+import math
+
+from .errors import CraftAiDecisionError, CraftAiNullDecisionError
+from .interpreter import Interpreter
+from .interpreter_v2 import DECISION_VERSION, InterpreterV2
+from .operators import OPERATORS, OPERATORS_FUNCTION
+from .tree_utils import parse_v2_tree
+
+# Python refuses to compile code indented more than 100 levels deep
+_MAX_DEPTH = 90
+
+_LITERAL_TYPES = (str, int, bool, type(None))
+
+
+def _is_leaf(node):
+    return not (node.get("children") is not None and len(node.get("children")))
+
+
+def _source_literal(value):
+    """Source of an expression building the given value, made of JSON like values."""
+    if type(value) in _LITERAL_TYPES:
+        return repr(value)
+    if type(value) is float:
+        return (
+            repr(value) if math.isfinite(value) else "float({!r})".format(repr(value))
+        )
+    if isinstance(value, list):
+        return "[{}]".format(", ".join(_source_literal(item) for item in value))
+    if isinstance(value, tuple):
+        return "({}{})".format(
+            ", ".join(_source_literal(item) for item in value),
+            "," if len(value) == 1 else "",
+        )
+    if isinstance(value, frozenset):
+        return "frozenset([{}])".format(
+            ", ".join(_source_literal(item) for item in value)
+        )
+    if isinstance(value, dict):
+        return "{{{}}}".format(
+            ", ".join(
+                "{}: {}".format(_source_literal(key), _source_literal(item))
+                for key, item in value.items()
+            )
+        )
+    raise CraftAiDecisionError(
+        """Unable to generate the decision code, {} can't be written in"""
+        """ Python source.""".format(repr(value))
+    )
+
+
+class _SourceWriter(object):
+    """Accumulate the lines of the generated source, the constants and the imports
+    it uses."""
+
+    def __init__(self):
+        self.lines = []
+        self._constants = {}
+        self._unnamed_constants = 0
+        self._constants_lines = []
+        self._imports = {}
+
+    def write(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def name(self, value):
+        """Name of the given class or function, imported by the generated module."""
+        if value.__module__ != "builtins":
+            self._imports.setdefault(value.__module__, set()).add(value.__qualname__)
+        return value.__qualname__
+
+    def constant(self, value, name=None):
+        """Name of a module level constant holding the given value."""
+        key = id(value)
+        if key not in self._constants:
+            if name is None:
+                name = "_k{}".format(self._unnamed_constants)
+                self._unnamed_constants += 1
+            self._constants[key] = (name, value)
+            self._constants_lines.append("{} = {}".format(name, _source_literal(value)))
+        return self._constants[key][0]
+
+    def literal(self, value):
+        """Source of an expression evaluating to the given value.
+
+        Scalars are inlined, other values are module level constants.
+        """
+        if type(value) in _LITERAL_TYPES:
+            return repr(value)
+        if type(value) is float and math.isfinite(value):
+            return repr(value)
+        return self.constant(value)
+
+    def source(self):
+        header = [
+            "from {} import {}".format(module, ", ".join(sorted(names)))
+            for module, names in sorted(self._imports.items())
+        ]
+        if self._constants_lines:
+            header += [""] + self._constants_lines
+        return "\n".join(header + ["", ""] + self.lines) + "\n"
+
+
+class _OutputGenerator(object):
+    def __init__(self, writer, output, root, output_type, variables):
+        self.writer = writer
+        self.output = output
+        self.root = root
+        self.output_values = root.get("output_values")
+        self.output_type = output_type
+        self.variables = variables
+
+    def generate(self, indent):
+        write = self.writer.write
+        if _is_leaf(self.root):
+            prediction = self.root.get("prediction")
+            if prediction is None:
+                prediction = self.root
+            if prediction.get("value") is None:
+                write(
+                    indent,
+                    "raise {}({})".format(
+                        self.writer.name(CraftAiNullDecisionError),
+                        repr(
+                            """Unable to take decision: the decision tree is not based"""
+                            """ on any context operations."""
+                        ),
+                    ),
+                )
+                return
+        self._generate_node(self.root, ["0"], [], [], indent)
+
+    def _assign(self, indent, result):
+        self.writer.write(
+            indent, "output[{}] = {}".format(repr(self.output), self._dict(result))
+        )
+
+    def _dict(self, result):
+        items = []
+        for key, value in result.items():
+            if key == "decision_rules":
+                source = "[{}]".format(
+                    ", ".join(
+                        "{{'property': {}, 'operator': {}, 'operand': {}}}".format(
+                            self.writer.literal(prop),
+                            self.writer.literal(operator),
+                            self.writer.literal(operand),
+                        )
+                        for prop, operator, operand in value
+                    )
+                )
+            elif isinstance(value, _Copy):
+                source = "list({})".format(self.writer.constant(value.value))
+            else:
+                source = self.writer.literal(value)
+            items.append("{}: {}".format(repr(key), source))
+        return "{{{}}}".format(", ".join(items))
+
+    def _raise(self, indent, err, ancestors):
+        """Raise the error as re-raised by the ancestors in `_decide_recursion`."""
+        if isinstance(err, CraftAiDecisionError):
+            metadata = err.metadata
+            error_class = type(err).__name__
+            if ancestors:
+                error_class = "CraftAiDecisionError"
+                if metadata is not None:
+                    rules = [
+                        ancestor["decision_rule"]
+                        for ancestor in ancestors
+                        if ancestor.get("decision_rule")
+                    ] + metadata["decision_rules"]
+                    metadata = dict(metadata, decision_rules=rules)
+            if metadata is None:
+                source = repr(err.message)
+            else:
+                source = "{}, {}".format(
+                    repr(err.message),
+                    "{{{}}}".format(
+                        ", ".join(
+                            "{}: [{}]".format(
+                                repr(key),
+                                ", ".join(self.writer.constant(r) for r in value),
+                            )
+                            if key == "decision_rules"
+                            else "{}: {}".format(repr(key), self.writer.literal(value))
+                            for key, value in metadata.items()
+                        )
+                    ),
+                )
+            error_class = self.writer.name(
+                CraftAiDecisionError
+                if error_class == "CraftAiDecisionError"
+                else type(err)
+            )
+            self.writer.write(indent, "raise {}({})".format(error_class, source))
+        else:
+            self.writer.write(
+                indent,
+                "raise {}(*{})".format(
+                    self.writer.name(type(err)), _source_literal(err.args)
+                ),
+            )
+
+    def _generate_node(self, node, path, ancestors, predicates, indent):
+        if len(path) > _MAX_DEPTH:
+            raise CraftAiDecisionError(
+                """Unable to generate the decision code, the '{}' tree is deeper"""
+                """ than {} levels.""".format(self.output, _MAX_DEPTH)
+            )
+        if _is_leaf(node):
+            self._generate_leaf(node, path, ancestors, predicates, indent)
+            return
+
+        write = self.writer.write
+        keyword = "if"
+        for child_index, child in enumerate(node["children"]):
+            decision_rule = child["decision_rule"]
+            prop = decision_rule["property"]
+            operator = decision_rule["operator"]
+            operand = decision_rule["operand"]
+            if not isinstance(operator, str) or operator not in OPERATORS.values():
+                # The children after an invalid operator are never evaluated
+                err = CraftAiDecisionError(
+                    """Invalid decision tree format, {} is not a valid"""
+                    """ decision operator.""".format(operator)
+                )
+                if keyword == "if":
+                    self._raise(indent, err, [])
+                    return
+                write(indent, "else:")
+                self._raise(indent + 1, err, [])
+                return
+            write(
+                indent,
+                "{} {}:".format(keyword, self._condition(prop, operator, operand)),
+            )
+            self._generate_node(
+                child,
+                path + [str(child_index)],
+                ancestors + [node],
+                predicates + [(prop, operator, operand)],
+                indent + 1,
+            )
+            keyword = "elif"
+
+        write(indent, "else:")
+        try:
+            result = InterpreterV2.compute_distribution(
+                node, self.output_values, self.output_type, list(path)
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            self._raise(indent + 1, err, ancestors)
+            return
+        if result.get("distribution") is not None:
+            # The distribution is computed for each decision, don't share it
+            result["distribution"] = _Copy(result["distribution"])
+        result["decision_rules"] = predicates
+        if ancestors:
+            result = _rebuild_result(result)
+        self._assign(indent + 1, result)
+
+    def _generate_leaf(self, node, path, ancestors, predicates, indent):
+        prediction = node.get("prediction")
+        if prediction is None:
+            prediction = node
+        predicted_value = prediction.get("value")
+        if predicted_value is None:
+            self._raise(
+                indent,
+                CraftAiNullDecisionError(
+                    """Unable to take decision: the decision tree has no valid"""
+                    """ predicted value for the given context.""",
+                    {"decision_rules": [node.get("decision_rule")]},
+                ),
+                ancestors,
+            )
+            return
+        try:
+            result = {
+                "predicted_value": predicted_value,
+                "confidence": prediction.get("confidence") or 0,
+                "decision_rules": predicates,
+                "nb_samples": prediction["nb_samples"],
+                "decision_path": "-".join(path),
+            }
+            distribution = prediction.get("distribution")
+            if (
+                not isinstance(distribution, list)
+                and "standard_deviation" in distribution
+            ):
+                result["standard_deviation"] = distribution.get("standard_deviation")
+                result["min"] = distribution.get("min")
+                result["max"] = distribution.get("max")
+            else:
+                result["distribution"] = distribution
+        except Exception as err:  # pylint: disable=broad-except
+            self._raise(indent, err, ancestors)
+            return
+        if ancestors:
+            result = _rebuild_result(result)
+        self._assign(indent, result)
+
+    def _condition(self, prop, operator, operand):
+        value, is_set, is_hashable = self.variables[prop]
+        literal = self.writer.literal
+        if operator == OPERATORS["IS"]:
+            return "{} == {}".format(value, literal(operand))
+        if operator == OPERATORS["GTE"]:
+            return "{} and {} >= {}".format(is_set, value, literal(operand))
+        if operator == OPERATORS["LT"]:
+            return "{} and {} < {}".format(is_set, value, literal(operand))
+        if operator == OPERATORS["IN_INTERVAL"]:
+            lower, upper = literal(operand[0]), literal(operand[1])
+            if OPERATORS_FUNCTION[OPERATORS["LT"]](operand[0], operand[1]):
+                return "{0} and {1} >= {2} and {1} < {3}".format(
+                    is_set, value, lower, upper
+                )
+            # Wrap around interval, e.g. [22, 6[ for the time of day
+            return "{0} and ({1} >= {2} or {1} < {3})".format(
+                is_set, value, lower, upper
+            )
+        # OPERATORS["IN_MULTI"]
+        members = _membership(operand)
+        if isinstance(members, frozenset):
+            # Unhashable values can't be looked up in the frozensets
+            return "({0} in {1} if {2} else {0} in {3})".format(
+                value,
+                self.writer.constant(members),
+                is_hashable,
+                self.writer.constant(tuple(operand)),
+            )
+        return "{} in {}".format(value, self.writer.constant(members))
+
+
+class _Copy(object):
+    """Value to be copied for each decision."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _membership(operand):
+    try:
+        return frozenset(operand)
+    except TypeError:
+        return tuple(operand)
+
+
+def _rebuild_result(result):
+    # Same as the result rebuilt by each of the ancestors in `_decide_recursion`
+    final_result = {
+        "predicted_value": result["predicted_value"],
+        "confidence": result["confidence"],
+        "decision_rules": result["decision_rules"],
+        "nb_samples": result["nb_samples"],
+        "decision_path": result["decision_path"],
+    }
+    if result.get("standard_deviation", None) is not None:
+        final_result["standard_deviation"] = result.get("standard_deviation")
+    if result.get("min") is not None:
+        final_result["min"] = result.get("min")
+    if result.get("max") is not None:
+        final_result["max"] = result.get("max")
+    distribution = result.get("distribution")
+    if isinstance(distribution, _Copy):
+        distribution = distribution.value
+    if distribution:
+        final_result["distribution"] = result.get("distribution")
+    return final_result
+
+
+def _collect_rules(node, rules):
+    for child in node.get("children") or []:
+        decision_rule = child.get("decision_rule")
+        if decision_rule:
+            rules.append(decision_rule)
+        _collect_rules(child, rules)
+    return rules
+
+
+def _generate(bare_tree, configuration):
+    writer = _SourceWriter()
+    outputs = configuration.get("output")
+
+    rules = []
+    for output in outputs:
+        _collect_rules(bare_tree[output], rules)
+    properties = []
+    for rule in rules:
+        if rule.get("property") not in properties:
+            properties.append(rule.get("property"))
+    variables = {
+        prop: ("v{}".format(i), "s{}".format(i), "h{}".format(i))
+        for i, prop in enumerate(properties)
+    }
+    hashed_properties = set(
+        rule["property"]
+        for rule in rules
+        if rule.get("operator") == OPERATORS["IN_MULTI"]
+        and isinstance(_membership(rule["operand"]), frozenset)
+    )
+
+    writer.write(0, "def decide(context):")
+    writer.write(
+        1,
+        "{}.check_context({}, context)".format(
+            writer.name(InterpreterV2), writer.constant(configuration, "CONFIGURATION")
+        ),
+    )
+    for prop in properties:
+        value, is_set, is_hashable = variables[prop]
+        writer.write(1, "{} = context.get({})".format(value, writer.literal(prop)))
+        writer.write(1, "{0} = {1} is not None and {1} != {{}}".format(is_set, value))
+        if prop in hashed_properties:
+            writer.write(
+                1, "{} = type({}).__hash__ is not None".format(is_hashable, value)
+            )
+    writer.write(1, "output = {}")
+    for output in outputs:
+        _OutputGenerator(
+            writer,
+            output,
+            bare_tree[output],
+            configuration["context"][output]["type"],
+            variables,
+        ).generate(1)
+    writer.write(
+        1, "return {{'output': output, '_version': {}}}".format(repr(DECISION_VERSION))
+    )
+    return writer
+
+
+def generate_decide_source(tree):
+    """Generate the Python source of a module taking decisions with the given tree.
+
+    The generated module is self-contained: it imports what it needs from
+    `craft_ai`, defines the tree configuration as `CONFIGURATION` and the operands
+    and distributions as module level constants. Its `decide(context)` function
+    takes the context as given to `InterpreterV2.decide` and returns the same
+    decisions. Each output tree is turned into nested `if/elif` statements with
+    inlined operands.
+
+    This function accepts v2 trees as retrieved from
+    `craft_ai.Client.get_agent_decision_tree`.
+
+    :param dict tree: decision tree.
+
+    :return: the source code of the module.
+    :rtype: str.
+
+    :raises CraftAiDecisionError: if the tree is not a valid v2 tree.
+    """
+    bare_tree, configuration = parse_v2_tree(tree)
+    return _generate(bare_tree, configuration).source()
+
+
+def compile_decide(tree):
+    """Compile a function taking decisions with the given tree.
+
+    The returned function takes the same arguments as `craft_ai.Client.decide`,
+    except the tree, and returns the same decisions.
+
+    :param dict tree: decision tree.
+
+    :return: the decide function.
+    :rtype: function.
+
+    :raises CraftAiDecisionError: if the tree is not a valid v2 tree.
+    """
+    bare_tree, configuration = parse_v2_tree(tree)
+    namespace = {}
+    exec(  # pylint: disable=exec-used
+        compile(
+            _generate(bare_tree, configuration).source(), "<craft_ai decide>", "exec"
+        ),
+        namespace,
+    )
+    interpreter = _GeneratedInterpreter(configuration, bare_tree, namespace["decide"])
+
+    def decide(*args):
+        return Interpreter._decide(configuration, bare_tree, args, interpreter)
+
+    return decide
+
+
+class _GeneratedInterpreter(object):
+    """Interpreter calling the generated code for the tree it was generated from."""
+
+    def __init__(self, configuration, bare_tree, decide_context):
+        self._configuration = configuration
+        self._bare_tree = bare_tree
+        self._decide_context = decide_context
+
+    def decide(self, configuration, bare_tree, context):
+        if configuration is not self._configuration or bare_tree is not self._bare_tree:
+            return InterpreterV2.decide(configuration, bare_tree, context)
+        return self._decide_context(context)
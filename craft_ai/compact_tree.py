@@ -0,0 +1,429 @@
+import mmap
+import struct
+
+from collections.abc import Mapping, Sequence
+
+from .errors import CraftAiError
+from .interpreter import Interpreter
+
+# File layout, all integers are little endian:
+#
+# - the header,
+# - the string table: the offsets of the strings in the blob, then the blob of the
+#   UTF-8 encoded strings,
+# - the node records, the children of a node are contiguous,
+# - the packed values: decision rules, node payloads (predictions, ...), the tree
+#   without its nodes and the root node of each output.
+_MAGIC = b"CRAFTTRE"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIIIIIII")
+_STRING_OFFSET = struct.Struct("<I")
+# children start, children count, decision rule offset, payload offset, flags
+_NODE = struct.Struct("<IIIIB")
+_NO_VALUE = 0xFFFFFFFF
+_HAS_CHILDREN_KEY = 1
+
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _LIST, _DICT, _BIG_INT = range(9)
+_TAG = struct.Struct("<B")
+_UINT = struct.Struct("<I")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+
+
+class _Encoder(object):
+    def __init__(self):
+        self.strings = []
+        self._string_indexes = {}
+        self.values = bytearray()
+        self._value_offsets = {}
+
+    def string(self, string):
+        index = self._string_indexes.get(string)
+        if index is None:
+            index = len(self.strings)
+            self._string_indexes[string] = index
+            self.strings.append(string)
+        return index
+
+    def _pack(self, value, chunks):
+        if value is None:
+            chunks.append(_TAG.pack(_NONE))
+        elif value is True:
+            chunks.append(_TAG.pack(_TRUE))
+        elif value is False:
+            chunks.append(_TAG.pack(_FALSE))
+        elif isinstance(value, int):
+            if -(2 ** 63) <= value < 2 ** 63:
+                chunks.append(_TAG.pack(_INT) + _INT64.pack(value))
+            else:
+                chunks.append(_TAG.pack(_BIG_INT) + _UINT.pack(self.string(str(value))))
+        elif isinstance(value, float):
+            chunks.append(_TAG.pack(_FLOAT) + _FLOAT64.pack(value))
+        elif isinstance(value, str):
+            chunks.append(_TAG.pack(_STR) + _UINT.pack(self.string(value)))
+        elif isinstance(value, (list, tuple)):
+            chunks.append(_TAG.pack(_LIST) + _UINT.pack(len(value)))
+            for item in value:
+                self._pack(item, chunks)
+        elif isinstance(value, dict):
+            chunks.append(_TAG.pack(_DICT) + _UINT.pack(len(value)))
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    raise CraftAiError(
+                        """Unable to compact the decision tree, """
+                        """'{}' is not a valid key.""".format(key)
+                    )
+                chunks.append(_UINT.pack(self.string(key)))
+                self._pack(item, chunks)
+        else:
+            raise CraftAiError(
+                """Unable to compact the decision tree, """
+                """'{}' is not a valid value.""".format(value)
+            )
+
+    def value(self, value):
+        """Offset of the packed value, identical values are stored once."""
+        chunks = []
+        self._pack(value, chunks)
+        packed = b"".join(chunks)
+        offset = self._value_offsets.get(packed)
+        if offset is None:
+            offset = len(self.values)
+            self._value_offsets[packed] = offset
+            self.values.extend(packed)
+        return offset
+
+
+def _encode(tree):
+    if not isinstance(tree, dict) or not isinstance(tree.get("trees"), dict):
+        raise CraftAiError(
+            """Unable to compact the decision tree, """
+            """the given decision tree format is not valid."""
+        )
+    encoder = _Encoder()
+    records = []
+    roots = {}
+    for output, root in tree["trees"].items():
+        roots[output] = len(records)
+        records.append(None)
+        queue = [(root, roots[output])]
+        for node, index in queue:
+            children = node.get("children")
+            children_start = len(records)
+            for child in children or []:
+                queue.append((child, len(records)))
+                records.append(None)
+            decision_rule = node.get("decision_rule")
+            payload = {
+                key: value
+                for key, value in node.items()
+                if key not in ("children", "decision_rule")
+            }
+            records[index] = _NODE.pack(
+                children_start,
+                len(children or []),
+                encoder.value(decision_rule) if "decision_rule" in node else _NO_VALUE,
+                encoder.value(payload),
+                _HAS_CHILDREN_KEY if "children" in node else 0,
+            )
+    envelope_offset = encoder.value(
+        {key: value for key, value in tree.items() if key != "trees"}
+    )
+    roots_offset = encoder.value(roots)
+
+    encoded_strings = [string.encode("utf-8") for string in encoder.strings]
+    string_offsets = [0]
+    for encoded_string in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded_string))
+    strings_section = b"".join(
+        [_STRING_OFFSET.pack(offset) for offset in string_offsets] + encoded_strings
+    )
+
+    strings_offset = _HEADER.size
+    nodes_offset = strings_offset + len(strings_section)
+    values_offset = nodes_offset + len(records) * _NODE.size
+    header = _HEADER.pack(
+        _MAGIC,
+        _FORMAT_VERSION,
+        len(encoded_strings),
+        strings_offset,
+        len(records),
+        nodes_offset,
+        values_offset,
+        envelope_offset,
+        roots_offset,
+    )
+    return b"".join([header, strings_section] + records + [bytes(encoder.values)])
+
+
+class CompactTree(object):
+    """Decision tree stored in the compact binary format.
+
+    The nodes are read from the underlying buffer when they are needed, a tree loaded
+    with `load_compact_tree(path, mmap_mode=True)` is thus shared between all the processes
+    mapping the same file. Decisions are taken by the interpreter directly on the
+    buffer, and `to_dict` gives back the tree as retrieved from
+    `craft_ai.Client.get_agent_decision_tree`.
+    """
+
+    def __init__(self, buffer, mapped_file=None):
+        self._buffer = buffer
+        self._mapped_file = mapped_file
+        try:
+            (
+                magic,
+                format_version,
+                self._nb_strings,
+                self._strings_offset,
+                self._nb_nodes,
+                self._nodes_offset,
+                self._values_offset,
+                envelope_offset,
+                roots_offset,
+            ) = _HEADER.unpack_from(buffer, 0)
+        except struct.error:
+            magic, format_version = None, None
+        if magic != _MAGIC or format_version != _FORMAT_VERSION:
+            raise CraftAiError("""Invalid compact decision tree, unknown format.""")
+        self._strings_blob_offset = (
+            self._strings_offset + (self._nb_strings + 1) * _STRING_OFFSET.size
+        )
+        self._strings = [None] * self._nb_strings
+        self._envelope = self._value(envelope_offset)
+        self._roots = self._value(roots_offset)
+        self._interpreter = None
+
+    @staticmethod
+    def from_tree(tree):
+        """Convert a decision tree into a `CompactTree`."""
+        return CompactTree(_encode(tree))
+
+    def to_bytes(self):
+        return bytes(self._buffer)
+
+    def to_dict(self):
+        """Decode the whole tree, e.g. to use it with the `tree_utils` functions."""
+        tree = dict(self._envelope)
+        tree["trees"] = {
+            output: self._decode_node(index) for output, index in self._roots.items()
+        }
+        return tree
+
+    @property
+    def outputs(self):
+        return list(self._roots)
+
+    @property
+    def configuration(self):
+        return self._envelope.get("configuration")
+
+    def output_tree(self, output):
+        """Lazy read-only view of the tree of the given output."""
+        if output not in self._roots:
+            raise CraftAiError(
+                """'{}' output tree can't be found in the given decision tree.""".format(
+                    output
+                )
+            )
+        return _NodeView(self, self._roots[output])
+
+    def decide(self, *args):
+        """Take a decision, as `craft_ai.Client.decide` with the decoded tree."""
+        if self._interpreter is None:
+            # The nodes are not needed to validate the version and configuration
+            _, configuration, tree_version = Interpreter._parse_tree(
+                dict(self._envelope, trees={})
+            )
+            self._interpreter = Interpreter._get_interpreter(tree_version)
+        bare_tree = {output: self.output_tree(output) for output in self._roots}
+        return Interpreter._decide(
+            self.configuration, bare_tree, args, self._interpreter
+        )
+
+    def close(self):
+        if self._mapped_file is not None:
+            self._buffer.close()
+            self._mapped_file.close()
+            self._mapped_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    ####################
+    # Internal helpers #
+    ####################
+
+    def _string(self, index):
+        string = self._strings[index]
+        if string is None:
+            start, end = struct.unpack_from(
+                "<II", self._buffer, self._strings_offset + index * _STRING_OFFSET.size
+            )
+            string = str(
+                self._buffer[
+                    self._strings_blob_offset + start : self._strings_blob_offset + end
+                ],
+                "utf-8",
+            )
+            self._strings[index] = string
+        return string
+
+    def _value(self, offset):
+        value, _ = self._unpack(self._values_offset + offset)
+        return value
+
+    def _unpack(self, position):
+        buffer = self._buffer
+        (tag,) = _TAG.unpack_from(buffer, position)
+        position += _TAG.size
+        if tag == _NONE:
+            return None, position
+        if tag == _TRUE:
+            return True, position
+        if tag == _FALSE:
+            return False, position
+        if tag == _INT:
+            return _INT64.unpack_from(buffer, position)[0], position + _INT64.size
+        if tag == _FLOAT:
+            return _FLOAT64.unpack_from(buffer, position)[0], position + _FLOAT64.size
+        (index,) = _UINT.unpack_from(buffer, position)
+        position += _UINT.size
+        if tag == _STR:
+            return self._string(index), position
+        if tag == _BIG_INT:
+            return int(self._string(index)), position
+        if tag == _LIST:
+            items = []
+            for _ in range(index):
+                item, position = self._unpack(position)
+                items.append(item)
+            return items, position
+        # _DICT
+        items = {}
+        for _ in range(index):
+            (key,) = _UINT.unpack_from(buffer, position)
+            item, position = self._unpack(position + _UINT.size)
+            items[self._string(key)] = item
+        return items, position
+
+    def _node(self, index):
+        return _NODE.unpack_from(self._buffer, self._nodes_offset + index * _NODE.size)
+
+    def _decode_node(self, index):
+        children_start, nb_children, rule_offset, payload_offset, flags = self._node(
+            index
+        )
+        node = {}
+        if rule_offset != _NO_VALUE:
+            node["decision_rule"] = self._value(rule_offset)
+        node.update(self._value(payload_offset))
+        if flags & _HAS_CHILDREN_KEY:
+            node["children"] = [
+                self._decode_node(children_start + i) for i in range(nb_children)
+            ]
+        return node
+
+
+class _NodeView(Mapping):
+    """Read-only node decoded lazily from a `CompactTree` buffer."""
+
+    __slots__ = ("_tree", "_index", "_record", "_payload", "_decision_rule")
+
+    def __init__(self, tree, index):
+        self._tree = tree
+        self._index = index
+        self._record = tree._node(index)
+        self._payload = None
+        self._decision_rule = None
+
+    def _get_payload(self):
+        if self._payload is None:
+            self._payload = self._tree._value(self._record[3])
+        return self._payload
+
+    def __getitem__(self, key):
+        children_start, nb_children, rule_offset, _, flags = self._record
+        if key == "children":
+            if not flags & _HAS_CHILDREN_KEY:
+                raise KeyError(key)
+            return _ChildrenView(self._tree, children_start, nb_children)
+        if key == "decision_rule":
+            if rule_offset == _NO_VALUE:
+                raise KeyError(key)
+            if self._decision_rule is None:
+                self._decision_rule = self._tree._value(rule_offset)
+            return self._decision_rule
+        return self._get_payload()[key]
+
+    def __iter__(self):
+        if self._record[2] != _NO_VALUE:
+            yield "decision_rule"
+        for key in self._get_payload():
+            yield key
+        if self._record[4] & _HAS_CHILDREN_KEY:
+            yield "children"
+
+    def __len__(self):
+        return (
+            len(self._get_payload())
+            + (self._record[2] != _NO_VALUE)
+            + bool(self._record[4] & _HAS_CHILDREN_KEY)
+        )
+
+
+class _ChildrenView(Sequence):
+    __slots__ = ("_tree", "_start", "_length")
+
+    def __init__(self, tree, start, length):
+        self._tree = tree
+        self._start = start
+        self._length = length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("child index out of range")
+        return _NodeView(self._tree, self._start + index)
+
+    def __len__(self):
+        return self._length
+
+
+def save_compact_tree(tree, path):
+    """Save a decision tree in the compact binary format.
+
+    :param dict tree: decision tree, as retrieved from
+    `craft_ai.Client.get_agent_decision_tree`.
+    :param str path: the path of the file to write.
+    """
+    with open(path, "wb") as tree_file:
+        tree_file.write(_encode(tree))
+
+
+def load_compact_tree(path, mmap_mode=False):
+    """Load a decision tree saved with `save_compact_tree`.
+
+    :param str path: the path of the file to read.
+    :param bool mmap_mode: Optional. If `True`, the file is memory-mapped instead of
+    being read, the processes loading the same file share its pages. The tree must
+    be closed with `close()`, or used as a context manager, to release the file.
+
+    :return: the compact tree.
+    :rtype: CompactTree.
+    """
+    if not mmap_mode:
+        with open(path, "rb") as tree_file:
+            return CompactTree(tree_file.read())
+    tree_file = open(path, "rb")
+    try:
+        buffer = mmap.mmap(tree_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception:
+        tree_file.close()
+        raise
+    return CompactTree(buffer, tree_file)
@@ -0,0 +1,170 @@
+import itertools
+
+from .errors import CraftAiError
+from .formatters import format_decision_rules
+from .reducer import reduce_decision_rules
+
+
+def _rule_key(rule):
+    operand = rule["operand"]
+    if isinstance(operand, list):
+        operand = tuple(operand)
+    return (rule["property"], rule["operator"], operand)
+
+
+def _rules_key(rules):
+    try:
+        key = tuple(_rule_key(rule) for rule in rules)
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _build_entry(rules):
+    try:
+        reduced_rules = reduce_decision_rules(rules)
+        explanation = format_decision_rules(reduced_rules)
+    except CraftAiError as err:
+        # Rules that can't be reduced or formatted, e.g. using operators only found
+        # in v2 trees, can't be explained. The error is raised when the entry is
+        # retrieved, to behave like `reduce_decision_rules` and
+        # `format_decision_rules`.
+        return {
+            "decision_rules": rules,
+            "reduced_decision_rules": None,
+            "explanation": None,
+            "error": err.message,
+        }
+    return {
+        "decision_rules": rules,
+        "reduced_decision_rules": reduced_rules,
+        "explanation": explanation,
+    }
+
+
+def _index_node(node, path, rules, by_path, by_rules):
+    entry = _build_entry(rules)
+    by_path[path] = entry
+    key = _rules_key(rules)
+    if key is not None:
+        by_rules.setdefault(key, entry)
+    for i, child in enumerate(node.get("children") or []):
+        decision_rule = child.get("decision_rule")
+        child_rules = rules
+        if decision_rule:
+            child_rules = rules + [
+                {
+                    "property": decision_rule["property"],
+                    "operator": decision_rule["operator"],
+                    "operand": decision_rule["operand"],
+                }
+            ]
+        _index_node(child, "{}-{}".format(path, i), child_rules, by_path, by_rules)
+
+
+class ExplanationIndex(object):
+    """Explanations of the decisions of a tree, precomputed once per node.
+
+    For each node of each output tree, the index stores the decision rules leading to
+    it, the reduced decision rules, as returned by `reduce_decision_rules`, and the
+    explanation, as returned by `format_decision_rules` on the reduced rules.
+
+    The returned entries are shared between all the decisions taken at the same node
+    and must not be modified.
+
+    This class accepts trees as retrieved from `craft_ai.Client.get_agent_decision_tree`.
+    """
+
+    def __init__(self, tree):
+        if not isinstance(tree, dict) or not isinstance(tree.get("trees"), dict):
+            raise CraftAiError(
+                """Unable to build the explanation index, """
+                """the given decision tree format is not valid."""
+            )
+        self._by_path = {}
+        self._by_rules = {}
+        for output, output_tree in tree["trees"].items():
+            by_path = {}
+            by_rules = {}
+            _index_node(output_tree, "0", [], by_path, by_rules)
+            self._by_path[output] = by_path
+            self._by_rules[output] = by_rules
+
+    @property
+    def outputs(self):
+        return list(self._by_path)
+
+    def get(self, output, decision_path):
+        """Retrieve the entry of the node at the given decision path, e.g. "0-2-1".
+
+        :return: dict with the keys "decision_rules", "reduced_decision_rules" and
+        "explanation".
+        :rtype: dict.
+
+        :raises CraftAiError: if the decision path is not in the tree or if its
+        decision rules can't be reduced.
+        """
+        try:
+            entry = self._by_path[output][decision_path]
+        except KeyError:
+            raise CraftAiError(
+                """Invalid decision path given. """
+                """{} not found in the '{}' tree""".format(decision_path, output)
+            )
+        return self._check_entry(entry)
+
+    def explain(self, output, output_decision):
+        """Retrieve the entry matching the decision taken for the given output.
+
+        Decisions from v2 trees are looked up by their decision path, decisions from v1
+        trees by their decision rules.
+
+        :param str output: the output property.
+        :param dict output_decision: the decision taken for the output, i.e.
+        `decision["output"][output]`.
+
+        :return: dict with the keys "decision_rules", "reduced_decision_rules" and
+        "explanation".
+        :rtype: dict.
+
+        :raises CraftAiError: if the decision rules can't be reduced or formatted.
+        """
+        return self._check_entry(self._lookup(output, output_decision))
+
+    def explanations(self, output):
+        """List the distinct explanations of the given output tree."""
+        seen = set()
+        explanations = []
+        entries = itertools.chain(
+            self._by_path.get(output, {}).values(),
+            self._by_rules.get(output, {}).values(),
+        )
+        for entry in entries:
+            explanation = entry.get("explanation")
+            if explanation is not None and explanation not in seen:
+                seen.add(explanation)
+                explanations.append(explanation)
+        return explanations
+
+    def _lookup(self, output, output_decision):
+        decision_path = output_decision.get("decision_path")
+        by_path = self._by_path.get(output, {})
+        if decision_path is not None and decision_path in by_path:
+            return by_path[decision_path]
+
+        rules = output_decision["decision_rules"]
+        key = _rules_key(rules)
+        by_rules = self._by_rules.setdefault(output, {})
+        entry = by_rules.get(key) if key is not None else None
+        if entry is None:
+            entry = _build_entry(rules)
+            if key is not None:
+                by_rules[key] = entry
+        return entry
+
+    @staticmethod
+    def _check_entry(entry):
+        if "error" in entry:
+            raise CraftAiError(entry["error"])
+        return entry
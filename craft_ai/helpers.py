@@ -1,4 +1,5 @@
 import re
+import threading
 
 
 def dict_depth(collection):
@@ -17,3 +18,46 @@ def extract_operations_count_from_message(message):
     if not count_matches:
         return 0
     return int(count_matches.group())
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Share a single execution between the concurrent calls with the same key.
+
+    The first caller of a key runs the function, the callers arriving while it runs
+    wait for it and get the same result, or the same error.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+        except Exception as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
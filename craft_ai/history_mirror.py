@@ -0,0 +1,203 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .errors import CraftAiError
+
+# The synchronized histories, with the key of the values of their items
+HISTORIES = {"operations": "context", "states": "sample"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    agent_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_by_agent
+    ON history (agent_id, kind, timestamp);
+CREATE TABLE IF NOT EXISTS sync (
+    agent_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (agent_id, kind)
+);
+"""
+
+
+class ContextHistoryMirror(object):
+    """Local copy of the context operations and states of agents, in a SQLite file.
+
+    Given to a client in the `contextHistoryMirror` configuration, the mirror serves
+    `get_agent_operations` and `get_agent_states`. Only the history since the last
+    stored timestamp is retrieved when an agent is synchronized again.
+
+    :param str path: the path of the SQLite database, ":memory:" keeps the mirror in
+    memory.
+
+    A pickled mirror is reopened from its path, an in memory mirror is empty once
+    unpickled. Likewise, a forked process reopens the mirror on first use.
+    """
+
+    def __init__(self, path):
+        self._open(path)
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self._open(state["path"])
+
+    def _open(self, path):
+        self.path = path
+        self._pid = os.getpid()
+        self._connection_lock = threading.Lock()
+        # The connection is shared by the threads of the client, behind the lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    @property
+    def _lock(self):
+        """Lock of the connection, taken before any use of the connection."""
+        # A SQLite connection can't be used across a fork, and the lock may have been
+        # held by another thread of the parent process while forking
+        if os.getpid() != self._pid:
+            # Not closed, closing it could roll back a transaction of the parent
+            self._forked_connection = self._connection
+            self._open(self.path)
+        return self._connection_lock
+
+    @staticmethod
+    def _check_kind(kind):
+        if kind not in HISTORIES:
+            raise CraftAiError(
+                """Invalid history given, {} should be one of {}.""".format(
+                    kind, ", ".join(HISTORIES)
+                )
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def last_timestamp(self, agent_id, kind):
+        """Retrieve the timestamp of the last item stored for an agent, or None."""
+        self._check_kind(kind)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT MAX(timestamp) FROM history WHERE agent_id = ? AND kind = ?",
+                (agent_id, kind),
+            ).fetchone()
+        return row[0]
+
+    def synced_at(self, agent_id, kind):
+        """Retrieve the time of the last synchronization of an agent, or None."""
+        self._check_kind(kind)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT synced_at FROM sync WHERE agent_id = ? AND kind = ?",
+                (agent_id, kind),
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, agent_id, kind, max_age):
+        """Whether an agent was synchronized less than `max_age` seconds ago."""
+        synced_at = self.synced_at(agent_id, kind)
+        return synced_at is not None and time.time() - synced_at < max_age
+
+    def sync(self, agent_id, kind, fetch):
+        """Retrieve the items of an agent stored after the last stored timestamp.
+
+        The items at the last stored timestamp are retrieved again and replace the
+        stored ones, as some might have been added since the last synchronization.
+
+        :param str agent_id: the id of the agent.
+        :param str kind: "operations" or "states".
+        :param fetch: function retrieving the items of the agent, called with the
+        agent id and the `start` timestamp, e.g. `client.get_agent_operations`.
+        """
+        start = self.last_timestamp(agent_id, kind)
+        items = fetch(agent_id, start)
+        value_key = HISTORIES[kind]
+        rows = [
+            (agent_id, kind, item["timestamp"], json.dumps(item[value_key]))
+            for item in items
+        ]
+        with self._lock, self._connection:
+            if start is not None:
+                self._connection.execute(
+                    """DELETE FROM history
+                    WHERE agent_id = ? AND kind = ? AND timestamp >= ?""",
+                    (agent_id, kind, start),
+                )
+            self._connection.executemany(
+                "INSERT INTO history VALUES (?, ?, ?, ?)", rows
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync VALUES (?, ?, ?)",
+                (agent_id, kind, time.time()),
+            )
+        return len(rows)
+
+    def get(self, agent_id, kind, start=None, end=None):
+        """Retrieve the stored items of an agent between `start` and `end`, included.
+
+        :return: the items, in the format of `get_agent_operations` and
+        `get_agent_states`.
+        :rtype: list.
+        """
+        self._check_kind(kind)
+        query = "SELECT timestamp, value FROM history WHERE agent_id = ? AND kind = ?"
+        params = [agent_id, kind]
+        if start is not None:
+            query += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND timestamp <= ?"
+            params.append(end)
+        query += " ORDER BY timestamp, rowid"
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        value_key = HISTORIES[kind]
+        return [
+            {"timestamp": timestamp, value_key: json.loads(value)}
+            for timestamp, value in rows
+        ]
+
+    def invalidate(self, agent_id, since=None):
+        """Drop the stored history of an agent from the `since` timestamp, included.
+
+        The next synchronization retrieves the history again from the last stored
+        timestamp, e.g. after operations were added to the agent before it. The
+        agent isn't fresh anymore.
+
+        :param str agent_id: the id of the agent.
+        :param int since: Optional. the first timestamp to drop, the whole history of
+        the agent by default.
+        """
+        if since is None:
+            self.clear(agent_id)
+            return
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM history WHERE agent_id = ? AND timestamp >= ?",
+                (agent_id, since),
+            )
+            self._connection.execute("DELETE FROM sync WHERE agent_id = ?", (agent_id,))
+
+    def clear(self, agent_id=None):
+        """Remove the stored history of an agent, or of all the agents."""
+        with self._lock, self._connection:
+            if agent_id is None:
+                self._connection.execute("DELETE FROM history")
+                self._connection.execute("DELETE FROM sync")
+            else:
+                self._connection.execute(
+                    "DELETE FROM history WHERE agent_id = ?", (agent_id,)
+                )
+                self._connection.execute(
+                    "DELETE FROM sync WHERE agent_id = ?", (agent_id,)
+                )
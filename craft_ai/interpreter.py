@@ -1,21 +1,70 @@
 import re
 from semver import VersionInfo
 
-from craft_ai.errors import CraftAiDecisionError
+from craft_ai.errors import CraftAiDecisionError, CraftAiError
+from craft_ai.explanations import ExplanationIndex
 from craft_ai.time import Time
 from craft_ai.timezones import get_timezone_key, timezone_offset_in_standard_format
 from craft_ai.interpreter_v1 import InterpreterV1
 from craft_ai.interpreter_v2 import InterpreterV2
 
 
+# Marks the end of the times given to `decide_many`
+_NO_TIME = object()
+
+
 class Interpreter(object):
     @staticmethod
-    def decide(tree, args):
+    def decide(tree, args, profiler=None):
         bare_tree, configuration, tree_version = Interpreter._parse_tree(tree)
         interpreter = Interpreter._get_interpreter(tree_version)
 
+        if profiler is not None:
+            return Interpreter._profiled_decide(
+                configuration, bare_tree, args, interpreter, profiler
+            )
         return Interpreter._decide(configuration, bare_tree, args, interpreter)
 
+    @staticmethod
+    def decide_many(tree, contexts, times=None, explain=False, profiler=None):
+        """Take a decision for each of the given contexts.
+
+        The tree is parsed once and the decisions are yielded in the order of the
+        contexts, as they are computed. A context for which no decision can be taken,
+        including a context that isn't a dict, yields a dict like
+        `{"error": CraftAiDecisionError(...)}` instead of interrupting the whole batch.
+
+        :param dict tree: decision tree.
+        :param contexts: iterable of contexts, as given to `decide`.
+        :param times: Optional. Iterable of `Time` instances matching the contexts,
+        used to generate the time properties.
+        :param explain: Optional. If `True`, or given an `ExplanationIndex` of the
+        tree, the decision of each output also holds its "reduced_decision_rules" and
+        its "explanation", shared between all the decisions taken at the same node.
+        They are `None` when the decision rules can't be reduced or formatted.
+        :param profiler: Optional. `DecisionProfiler` recording the decisions.
+
+        :return: generator of decisions.
+
+        :raises CraftAiDecisionError: if the tree is not valid, or when iterating the
+        decisions if there are fewer times than contexts.
+        """
+        bare_tree, configuration, tree_version = Interpreter._parse_tree(tree)
+        interpreter = Interpreter._compile(
+            configuration, bare_tree, Interpreter._get_interpreter(tree_version)
+        )
+        explanation_index = Interpreter._get_explanation_index(tree, explain)
+
+        return Interpreter._decide_many(
+            configuration,
+            bare_tree,
+            contexts,
+            times,
+            interpreter,
+            explanation_index,
+            profiler,
+        )
+
     ####################
     # Internal helpers #
     ####################
@@ -39,6 +88,86 @@ class Interpreter(object):
 
         return decision
 
+    @staticmethod
+    def _profiled_decide(configuration, bare_tree, args, interpreter, profiler):
+        start = profiler.start()
+        try:
+            decision = Interpreter._decide(configuration, bare_tree, args, interpreter)
+        except CraftAiError as err:
+            profiler.record_error(err, start)
+            raise
+        profiler.record(decision, bare_tree, start)
+        return decision
+
+    @staticmethod
+    def _decide_many(
+        configuration,
+        bare_tree,
+        contexts,
+        times,
+        interpreter,
+        explanation_index=None,
+        profiler=None,
+    ):
+        times = iter(times) if times is not None else None
+        for index, context in enumerate(contexts):
+            time = None
+            if times is not None:
+                time = next(times, _NO_TIME)
+                if time is _NO_TIME:
+                    raise CraftAiDecisionError(
+                        """Invalid times given, there is no time for the context"""
+                        """ {}, the times should match the contexts.""".format(index)
+                    )
+            if not isinstance(context, dict):
+                err = CraftAiDecisionError(
+                    """Invalid context given, {} is not a dict.""".format(context)
+                )
+                if profiler is not None:
+                    profiler.record_error(err)
+                yield {"error": err}
+                continue
+            args = (context,) if time is None else (context, time)
+            try:
+                if profiler is not None:
+                    decision = Interpreter._profiled_decide(
+                        configuration, bare_tree, args, interpreter, profiler
+                    )
+                else:
+                    decision = Interpreter._decide(
+                        configuration, bare_tree, args, interpreter
+                    )
+                if explanation_index is not None:
+                    Interpreter._explain(explanation_index, decision)
+                yield decision
+            except CraftAiError as err:
+                yield {"error": err}
+
+    @staticmethod
+    def _compile(configuration, bare_tree, interpreter):
+        # Interpreters able to compile a tree provide a faster evaluator when several
+        # decisions are taken with the same tree.
+        if hasattr(interpreter, "compile"):
+            return interpreter.compile(configuration, bare_tree)
+        return interpreter
+
+    @staticmethod
+    def _get_explanation_index(tree, explain):
+        if isinstance(explain, ExplanationIndex):
+            return explain
+        if explain:
+            return ExplanationIndex(tree)
+        return None
+
+    @staticmethod
+    def _explain(explanation_index, decision):
+        for output, output_decision in decision["output"].items():
+            # Decision rules that can't be explained don't fail the decision
+            entry = explanation_index._lookup(output, output_decision)
+            output_decision["reduced_decision_rules"] = entry["reduced_decision_rules"]
+            output_decision["explanation"] = entry["explanation"]
+        return decision
+
     @staticmethod
     def _get_interpreter(tree_version):
 
@@ -106,8 +235,12 @@ class Interpreter(object):
 
             # Generate context properties which need to
             else:
+                # The given state is left untouched, it can be shared by several
+                # decisions, e.g. with the trees of `decide_trees_from_contexts_df`
+                state = dict(state)
+                time_dict = time.to_dict()
                 for prop in to_generate:
-                    state[prop] = time.to_dict()[configuration_ctx[prop]["type"]]
+                    state[prop] = time_dict[configuration_ctx[prop]["type"]]
 
         # Rebuild the context with generated and non-generated values
         context = {
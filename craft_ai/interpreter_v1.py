@@ -8,7 +8,7 @@ from craft_ai.operators import (
 from craft_ai.types import TYPES
 from craft_ai.timezones import is_timezone
 
-_DECISION_VERSION = "1.1.0"
+DECISION_VERSION = "1.1.0"
 
 _VALUE_VALIDATORS = {
     TYPES["continuous"]: lambda value: isinstance(value, numbers.Real),
@@ -36,7 +36,7 @@ _VALUE_VALIDATORS = {
 class InterpreterV1(object):
     @staticmethod
     def decide(configuration, bare_tree, context):
-        InterpreterV1._check_context(configuration, context)
+        InterpreterV1.check_context(configuration, context)
 
         decision_result = {}
         decision_result["output"] = {}
@@ -54,9 +54,19 @@ class InterpreterV1(object):
             decision = InterpreterV1._decide_recursion(bare_tree[output], context)
             decision_result["output"][output] = decision
 
-        decision_result["_version"] = _DECISION_VERSION
+        decision_result["_version"] = DECISION_VERSION
         return decision_result
 
+    @staticmethod
+    def compile(configuration, bare_tree):
+        """Compile the given tree into a `CompiledTreeV1`.
+
+        The compiled tree takes the same decisions, and raises the same errors, as
+        `InterpreterV1.decide` without walking the tree dicts for each decision. It is
+        worth it when several decisions are taken with the same tree.
+        """
+        return CompiledTreeV1(configuration, bare_tree)
+
     ####################
     # Internal helpers #
     ####################
@@ -168,7 +178,7 @@ class InterpreterV1(object):
         return {}
 
     @staticmethod
-    def _check_context(configuration, context):
+    def check_context(configuration, context):
         # Extract the required properties (i.e. those that are not the output)
         expected_properties = [
             p for p in configuration["context"] if p not in configuration["output"]
@@ -239,3 +249,214 @@ class InterpreterV1(object):
             property_value = context[property_name]
             return _VALUE_VALIDATORS[property_type](property_value)
         return True
+
+
+def _invalid_operator(operator):
+    def raise_invalid_operator(context_value, operand):
+        raise CraftAiDecisionError(
+            """Invalid decision tree format, {} is not a valid"""
+            """ decision operator.""".format(operator)
+        )
+
+    return raise_invalid_operator
+
+
+def _raise_from_node(err, ancestors_rules):
+    # Same as the errors re-raised by each of the ancestors in `_decide_recursion`
+    if not ancestors_rules:
+        raise err
+    metadata = err.metadata
+    for rule in reversed(ancestors_rules):
+        if rule:
+            metadata["decision_rules"].insert(0, rule)
+    raise CraftAiDecisionError(err.message, metadata)
+
+
+class _FlatTreeV1(object):
+    """Output tree flattened into arrays indexed by node and by edge.
+
+    The children of the node `i` are the edges `children_start[i]` to
+    `children_end[i]`, the edge `j` leads to the node `edge_target[j]`.
+    """
+
+    def __init__(self, root):
+        self.children_start = []
+        self.children_end = []
+        self.node_rule = []
+        self.leaf = []
+        self.no_match = []
+        self.edge_property = []
+        self.edge_operand = []
+        self.edge_function = []
+        self.edge_predicate = []
+        self.edge_target = []
+
+        nodes = [root]
+        for node in nodes:
+            self.node_rule.append(node.get("decision_rule"))
+            children = node.get("children")
+            if not ("children" in node and len(children)):
+                self.children_start.append(0)
+                self.children_end.append(0)
+                self.no_match.append(None)
+                self.leaf.append(self._compile_leaf(node))
+                continue
+
+            self.leaf.append(None)
+            self.no_match.append(
+                (
+                    children[0].get("decision_rule").get("property"),
+                    [child["decision_rule"]["operand"] for child in children],
+                )
+            )
+            self.children_start.append(len(self.edge_target))
+            for child in children:
+                decision_rule = child["decision_rule"]
+                operator = decision_rule["operator"]
+                if isinstance(operator, str) and operator in OPERATORS.values():
+                    function = OPERATORS_FUNCTION[operator]
+                else:
+                    function = _invalid_operator(operator)
+                self.edge_property.append(decision_rule["property"])
+                self.edge_operand.append(decision_rule["operand"])
+                self.edge_function.append(function)
+                self.edge_predicate.append(
+                    (decision_rule["property"], operator, decision_rule["operand"],)
+                )
+                self.edge_target.append(len(nodes))
+                nodes.append(child)
+            self.children_end.append(len(self.edge_target))
+
+    @staticmethod
+    def _compile_leaf(node):
+        predicted_value = node.get("predicted_value")
+        if predicted_value is None:
+            return None
+        return (
+            predicted_value,
+            node.get("confidence") or 0,
+            node.get("standard_deviation", None),
+        )
+
+    def decide(self, context):
+        node = 0
+        path_rules = []
+        predicates = []
+        while True:
+            start = self.children_start[node]
+            end = self.children_end[node]
+            if start == end:
+                leaf = self.leaf[node]
+                if leaf is None:
+                    _raise_from_node(
+                        CraftAiNullDecisionError(
+                            """Unable to take decision: the decision tree has no valid"""
+                            """ predicted value for the given context.""",
+                            {"decision_rules": [self.node_rule[node]]},
+                        ),
+                        path_rules,
+                    )
+                predicted_value, confidence, standard_deviation = leaf
+                result = {
+                    "predicted_value": predicted_value,
+                    "confidence": confidence,
+                    "decision_rules": [
+                        {"property": prop, "operator": operator, "operand": operand}
+                        for prop, operator, operand in predicates
+                    ],
+                }
+                if standard_deviation is not None:
+                    result["standard_deviation"] = standard_deviation
+                return result
+
+            matching_edge = None
+            for edge in range(start, end):
+                property_name = self.edge_property[edge]
+                context_value = context.get(property_name)
+                if context_value is None:
+                    _raise_from_node(
+                        CraftAiDecisionError(
+                            """Unable to take decision, """
+                            """property '{}' is missing from the given context.""".format(
+                                property_name
+                            )
+                        ),
+                        path_rules,
+                    )
+                try:
+                    matches = self.edge_function[edge](
+                        context_value, self.edge_operand[edge]
+                    )
+                except CraftAiDecisionError as err:
+                    _raise_from_node(err, path_rules)
+                if matches:
+                    matching_edge = edge
+                    break
+
+            if matching_edge is None:
+                prop, operand_list = self.no_match[node]
+                decision_rule = (
+                    [self.node_rule[node]] if not self.node_rule[node] is None else []
+                )
+                _raise_from_node(
+                    CraftAiNullDecisionError(
+                        """Unable to take decision: value '{}' for property '{}' doesn't"""
+                        """ validate any of the decision rules.""".format(
+                            context.get(prop), prop
+                        ),
+                        {
+                            "decision_rules": decision_rule,
+                            "expected_values": list(operand_list),
+                            "property": prop,
+                            "value": context.get(prop),
+                        },
+                    ),
+                    path_rules,
+                )
+
+            path_rules.append(self.node_rule[node])
+            predicates.append(self.edge_predicate[matching_edge])
+            node = self.edge_target[matching_edge]
+
+
+class CompiledTreeV1(object):
+    """V1 decision tree compiled for repeated decisions.
+
+    Each output tree is flattened once into arrays holding the children ranges, the
+    operands and the operator functions, so that a decision is a loop over these
+    arrays. It can be used in place of `InterpreterV1` for the tree it was compiled
+    from.
+    """
+
+    def __init__(self, configuration, bare_tree):
+        self._configuration = configuration
+        self._bare_tree = bare_tree
+        self._outputs = []
+        for output in configuration.get("output"):
+            root = bare_tree[output]
+            # Same check as `InterpreterV1.decide`, done once
+            not_based_on_operations = not (
+                "children" in root and len(root.get("children"))
+            ) and (root.get("predicted_value") is None)
+            self._outputs.append((output, _FlatTreeV1(root), not_based_on_operations))
+
+    def decide(self, configuration, bare_tree, context):
+        if configuration is not self._configuration or bare_tree is not self._bare_tree:
+            return InterpreterV1.decide(configuration, bare_tree, context)
+        return self.decide_context(context)
+
+    def decide_context(self, context):
+        InterpreterV1.check_context(self._configuration, context)
+
+        decision_result = {}
+        decision_result["output"] = {}
+        for output, flat_tree, not_based_on_operations in self._outputs:
+            if not_based_on_operations:
+                raise CraftAiNullDecisionError(
+                    """Unable to take decision: the decision tree is not based"""
+                    """ on any context operations.""",
+                )
+            decision_result["output"][output] = flat_tree.decide(context)
+
+        decision_result["_version"] = DECISION_VERSION
+        return decision_result
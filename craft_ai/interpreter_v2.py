@@ -6,7 +6,7 @@ from craft_ai.operators import OPERATORS, OPERATORS_FUNCTION
 from craft_ai.types import TYPES
 from craft_ai.timezones import is_timezone
 
-_DECISION_VERSION = "2.0.0"
+DECISION_VERSION = "2.0.0"
 
 _VALUE_VALIDATORS = {
     TYPES["continuous"]: lambda value: isinstance(value, numbers.Real),
@@ -35,7 +35,7 @@ _VALUE_VALIDATORS = {
 class InterpreterV2(object):
     @staticmethod
     def decide(configuration, bare_tree, context):
-        InterpreterV2._check_context(configuration, context)
+        InterpreterV2.check_context(configuration, context)
 
         decision_result = {}
         decision_result["output"] = {}
@@ -63,7 +63,7 @@ class InterpreterV2(object):
                 output_type,
                 ["0"],
             )
-        decision_result["_version"] = _DECISION_VERSION
+        decision_result["_version"] = DECISION_VERSION
         return decision_result
 
     # pylint: disable-msg=too-many-arguments, too-many-locals
@@ -288,7 +288,7 @@ class InterpreterV2(object):
         return None, {}
 
     @staticmethod
-    def _check_context(configuration, context):
+    def check_context(configuration, context):
         # Extract the required properties (i.e. those that are not the output)
         expected_properties = [
             p for p in configuration["context"] if p not in configuration["output"]
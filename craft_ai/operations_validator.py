@@ -0,0 +1,121 @@
+import numbers
+
+from .errors import CraftAiBadRequestError
+from .interpreter_v2 import _VALUE_VALIDATORS
+
+# Number of errors detailed in the message of the raised errors
+MAX_REPORTED_ERRORS = 10
+
+
+def _is_ignored_value(value):
+    # Missing values and optional values are accepted for any property
+    return value is None or (isinstance(value, dict) and not value)
+
+
+class OperationsValidator(object):
+    """Check context operations against an agent configuration, before sending them.
+
+    The values are checked with the same rules as the interpreters, the missing
+    values (`None`) and optional values (`{}`) are accepted for any property.
+
+    :param dict configuration: the agent configuration.
+    """
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+        self._types = {
+            prop: attributes["type"]
+            for prop, attributes in configuration["context"].items()
+        }
+
+    @staticmethod
+    def _error(row, prop, value, message):
+        return {"row": row, "property": prop, "value": value, "message": message}
+
+    def _invalid_value_message(self, prop, value):
+        return "'{}' is not a valid value for the {} property '{}'".format(
+            value, self._types[prop], prop
+        )
+
+    def validate(self, operations):
+        """Check the operations.
+
+        :param list operations: the operations, as given to `add_agent_operations`.
+
+        :return: the errors, each one with the "row" position of the operation, the
+        "property", the "value" and a "message".
+        :rtype: list of dict.
+        """
+        errors = []
+        for row, operation in enumerate(operations):
+            if not isinstance(operation, dict):
+                errors.append(
+                    self._error(row, None, operation, "the operation is not a dict")
+                )
+                continue
+            timestamp = operation.get("timestamp")
+            if (
+                not isinstance(timestamp, numbers.Real)
+                or isinstance(timestamp, bool)
+                or timestamp < 0
+            ):
+                errors.append(
+                    self._error(
+                        row,
+                        None,
+                        timestamp,
+                        "'{}' is not a valid timestamp".format(timestamp),
+                    )
+                )
+            context = operation.get("context")
+            if not isinstance(context, dict):
+                errors.append(
+                    self._error(row, None, context, "the context is not a dict")
+                )
+                continue
+            for prop, value in context.items():
+                if prop not in self._types:
+                    errors.append(
+                        self._error(
+                            row,
+                            prop,
+                            value,
+                            "'{}' is not a property of the configuration".format(prop),
+                        )
+                    )
+                    continue
+                if _is_ignored_value(value):
+                    continue
+                validator = _VALUE_VALIDATORS.get(self._types[prop])
+                if validator is not None and not validator(value):
+                    errors.append(
+                        self._error(
+                            row, prop, value, self._invalid_value_message(prop, value)
+                        )
+                    )
+        return errors
+
+    def check(self, operations):
+        """Check the operations, raise an error if some are invalid.
+
+        :raises CraftAiBadRequestError: if some operations are invalid, the errors
+        are listed in the "errors" metadata.
+        """
+        errors = self.validate(operations)
+        if errors:
+            details = ", ".join(
+                "row {}: {}".format(error["row"], error["message"])
+                if error["row"] is not None
+                else error["message"]
+                for error in errors[:MAX_REPORTED_ERRORS]
+            )
+            if len(errors) > MAX_REPORTED_ERRORS:
+                details += ", and {} other error(s)".format(
+                    len(errors) - MAX_REPORTED_ERRORS
+                )
+            raise CraftAiBadRequestError(
+                """Invalid operations given, {} error(s) found: {}.""".format(
+                    len(errors), details
+                ),
+                {"errors": errors},
+            )
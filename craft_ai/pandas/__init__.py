@@ -3,6 +3,8 @@ try:
     from .. import errors, Time
     from .client import Client
     from .interpreter import Interpreter
+    from .replay import ContextReplay
+    from .operations_validator import OperationsValidator
     from .constants import MISSING_VALUE, OPTIONAL_VALUE
 except ImportError:
     CRAFTAI_PANDAS_ENABLED = False
@@ -10,6 +12,8 @@ except ImportError:
     Time = None
     Client = None
     Interpreter = None
+    ContextReplay = None
+    OperationsValidator = None
     MISSING_VALUE = None
     OPTIONAL_VALUE = None
 
@@ -18,6 +22,8 @@ __all__ = [
     "Client",
     "errors",
     "Interpreter",
+    "ContextReplay",
+    "OperationsValidator",
     "Time",
     "MISSING_VALUE",
     "OPTIONAL_VALUE",
@@ -1,12 +1,22 @@
 import json
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pandas as pd
 
 from .. import Client as VanillaClient
-from .. import Time
 from ..constants import DEFAULT_DECISION_TREE_VERSION
-from ..errors import CraftAiBadRequestError
+from ..errors import CraftAiBadRequestError, CraftAiDecisionError
 from .interpreter import Interpreter
-from .utils import format_input, is_valid_property_value, create_timezone_df
+from .operations_validator import OperationsValidator
+from .utils import (
+    format_input,
+    is_valid_property_value,
+    create_timezone_df,
+    create_timezone_offsets,
+    generate_time_features,
+    has_generated_time_features,
+)
 
 
 def chunker(to_be_chunked_df, chunk_size):
@@ -16,9 +26,16 @@ def chunker(to_be_chunked_df, chunk_size):
     )
 
 
+def _decide_group(tree, contexts_df):
+    # Module level function, to be sent to the workers of a process pool
+    return Interpreter.decide_from_contexts_df(tree, contexts_df)
+
+
 class Client(VanillaClient):
     """Client class for craft ai's API using pandas dataframe types"""
 
+    _operations_validator_class = OperationsValidator
+
     def add_agent_operations(self, agent_id, operations):
         if isinstance(operations, pd.DataFrame):
             if not isinstance(operations.index, pd.DatetimeIndex):
@@ -31,6 +48,8 @@ class Client(VanillaClient):
                                      it must be tz-aware."""
                 )
             agent = super(Client, self).get_agent(agent_id)
+            if self.config["operationsValidation"]:
+                self._validate_operations(agent_id, operations, agent["configuration"])
             operations = operations.copy(deep=True)
 
             tz_col = [
@@ -56,7 +75,8 @@ class Client(VanillaClient):
                     }
                     for _, row in chunk.iterrows()
                 ]
-                super(Client, self).add_agent_operations(agent_id, chunk_operations)
+                # The operations are already checked
+                super(Client, self)._add_agent_operations(agent_id, chunk_operations)
 
             return {
                 "message": 'Successfully added %i operation(s) to the agent "%s/%s/%s" context.'
@@ -187,9 +207,172 @@ class Client(VanillaClient):
             raise CraftAiBadRequestError("Invalid data given, it is not a DataFrame.")
 
     @staticmethod
-    def decide_from_contexts_df(tree, contexts_df):
+    def decide_from_contexts_df(tree, contexts_df, explain=False, profiler=None):
         Client.check_decision_context_df(contexts_df)
-        return Interpreter.decide_from_contexts_df(tree, contexts_df)
+        return Interpreter.decide_from_contexts_df(tree, contexts_df, explain, profiler)
+
+    @staticmethod
+    def decide_trees_from_contexts_df(
+        trees, contexts_df, layout="long", entity_column="entity_id"
+    ):
+        """Take the decisions of several trees for the same contexts.
+
+        The contexts and their time features are prepared once and shared by the
+        trees, instead of calling `decide_from_contexts_df` for each tree.
+
+        :param dict trees: the decision trees by entity id, e.g. agent or generator id.
+        :param pd.DataFrame contexts_df: the contexts, with a tz-aware DatetimeIndex.
+        :param str layout: Optional. "long" to stack the decisions of each tree with an
+        `entity_column` column, "wide" to put them side by side under a column level
+        holding the entity ids, "long" by default.
+        :param str entity_column: Optional. the name of the column, or column level,
+        holding the entity ids, "entity_id" by default.
+
+        :return: the decisions, with the same columns as `decide_from_contexts_df`.
+        :rtype: pd.DataFrame.
+
+        :raises CraftAiBadRequestError: if the contexts DataFrame is invalid.
+        """
+        Client.check_decision_context_df(contexts_df)
+        return Interpreter.decide_trees_from_contexts_df(
+            trees, contexts_df, layout, entity_column
+        )
+
+    def _get_agents_decision_trees_by_id(
+        self, agent_ids, timestamp, version, max_workers
+    ):
+        payload = [
+            {"id": agent_id}
+            if timestamp is None
+            else {"id": agent_id, "timestamp": timestamp}
+            for agent_id in agent_ids
+        ]
+        batch_size = self.config["operationsChunksSize"]
+        batches = [
+            payload[pos : pos + batch_size]
+            for pos in range(0, len(payload), batch_size)
+        ]
+
+        def get_batch(batch):
+            try:
+                return super(Client, self).get_agents_decision_trees_bulk(
+                    batch, version
+                )
+            except CraftAiBadRequestError as err:
+                # All the ids of the batch are invalid, the other batches are kept
+                return [{"id": entity["id"], "error": err} for entity in batch]
+
+        if max_workers is not None and max_workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(get_batch, batches))
+        else:
+            results = [get_batch(batch) for batch in batches]
+        return {
+            agent_id: result
+            for batch, batch_results in zip(batches, results)
+            for agent_id, result in zip(
+                (entity["id"] for entity in batch), batch_results
+            )
+        }
+
+    def decide_from_agents_contexts_df(
+        self,
+        contexts_df,
+        agent_column="agent_id",
+        timestamp=None,
+        version=DEFAULT_DECISION_TREE_VERSION,
+        max_workers=None,
+        max_processes=None,
+    ):
+        """Take the decisions of each row of a DataFrame with the tree of its agent.
+
+        The decision trees of the distinct agents are retrieved with
+        `get_agents_decision_trees_bulk`, in batches of `operationsChunksSize` agents,
+        then the rows of each agent are decided with its tree.
+
+        :param pd.DataFrame contexts_df: the contexts, with a tz-aware DatetimeIndex,
+        and the agent id of each row in the `agent_column` column.
+        :param str agent_column: Optional. the column holding the agent ids,
+        "agent_id" by default.
+        :param int timestamp: Optional. the timestamp of the retrieved trees, the latest
+        trees by default.
+        :param version: Optional. version of the trees to get.
+        :type version: str or int.
+        :param int max_workers: Optional. the number of batches of trees retrieved
+        concurrently, the batches are retrieved sequentially by default.
+        :param int max_processes: Optional. the number of processes deciding the
+        agents' rows, the rows are decided in the current process by default.
+
+        :return: the decisions in the order of the given rows, along with the
+        `agent_column` column. The rows without agent id and the rows of the agents
+        whose tree can't be retrieved only have an `error` value.
+        :rtype: pd.DataFrame.
+
+        :raises CraftAiBadRequestError: if the contexts DataFrame is invalid.
+        """
+        Client.check_decision_context_df(contexts_df)
+        if agent_column not in contexts_df.columns:
+            raise CraftAiBadRequestError(
+                """Invalid dataframe given, the agent ids column '{}' is """
+                """missing.""".format(agent_column)
+            )
+        if isinstance(timestamp, pd.Timestamp):
+            timestamp = timestamp.value // 10 ** 9
+
+        # Positions of the rows of each agent, the index can hold duplicates
+        groups = contexts_df.groupby(agent_column, sort=False).indices
+        if not groups:
+            raise CraftAiBadRequestError(
+                """Invalid dataframe given, the agent ids column '{}' is """
+                """empty.""".format(agent_column)
+            )
+        decision_trees = self._get_agents_decision_trees_by_id(
+            list(groups), timestamp, version, max_workers
+        )
+
+        features_df = contexts_df.drop(columns=[agent_column])
+        decided_groups = []
+        errors = []
+        # The rows without agent id aren't part of any group
+        missing_positions = contexts_df[agent_column].isna().values.nonzero()[0]
+        if len(missing_positions):
+            errors.append(
+                pd.DataFrame(
+                    {"error": """The agent id of the row is missing."""},
+                    index=missing_positions,
+                )
+            )
+        for agent_id, positions in groups.items():
+            result = decision_trees[agent_id]
+            if "tree" in result:
+                decided_groups.append((positions, result["tree"]))
+            else:
+                error = result.get("error")
+                errors.append(
+                    pd.DataFrame(
+                        {"error": getattr(error, "message", str(error))},
+                        index=positions,
+                    )
+                )
+
+        groups_args = (
+            [tree for _, tree in decided_groups],
+            [features_df.iloc[positions] for positions, _ in decided_groups],
+        )
+        if max_processes is not None and max_processes > 1 and len(decided_groups) > 1:
+            with ProcessPoolExecutor(max_workers=max_processes) as executor:
+                predictions_dfs = list(executor.map(_decide_group, *groups_args))
+        else:
+            predictions_dfs = list(map(_decide_group, *groups_args))
+
+        for (positions, _), predictions_df in zip(decided_groups, predictions_dfs):
+            predictions_df.index = positions
+        predictions_df = pd.concat(predictions_dfs + errors, sort=False).reindex(
+            range(len(contexts_df))
+        )
+        predictions_df.index = contexts_df.index
+        predictions_df.insert(0, agent_column, contexts_df[agent_column].values)
+        return predictions_df
 
     def get_agent_decision_tree(
         self, agent_id, timestamp=None, version=DEFAULT_DECISION_TREE_VERSION
@@ -242,15 +425,7 @@ class Client(VanillaClient):
         return df, tz_col
 
     def _generate_time_features(self, params, context):
-        time = Time(
-            t=params["context_ops"][0].value
-            // 1000000000,  # Timestamp.value returns nanoseconds
-            timezone=context[params["tz_col"]]
-            if params["tz_col"]
-            else params["context_ops"][0].tz,
-        )
-
-        return time
+        return generate_time_features(params, context)
 
     def _generate_decision_context(self, params, context, time):
         configuration = params["configuration"]
@@ -277,124 +452,157 @@ class Client(VanillaClient):
         }
         return context
 
-    def _pandas_agent_boosting_decide_from_df(
-        self, agent_id, from_ts, to_ts, params, df
-    ):
+    def _pandas_boosting_decisions_payload(self, entity_id, from_ts, to_ts, params, df):
         decisions_payload = []
 
-        for row in df.itertuples(name=None):
+        for row, timezone_offset in zip(
+            df.itertuples(name=None), params.pop("timezone_offsets")
+        ):
             params["context_ops"] = row
+            params["timezone_offset"] = timezone_offset
             context = self._check_context_properties(params)
             time = self._generate_time_features(params, context)
             decide_context = self._generate_decision_context(params, context, time)
 
             decisions_payload.append(
                 {
-                    "entityName": agent_id,
+                    "entityName": entity_id,
                     "timeWindow": [from_ts, to_ts],
                     "context": decide_context,
                 }
             )
 
+        return decisions_payload
+
+    def _pandas_agent_boosting_decide_from_df(
+        self, agent_id, from_ts, to_ts, params, df
+    ):
         decisions = super(Client, self).get_agent_bulk_boosting_decision(
-            decisions_payload
+            self._pandas_boosting_decisions_payload(
+                agent_id, from_ts, to_ts, params, df
+            )
         )
-        output_name = params["configuration"]["output"][0]
 
-        return (
-            {
-                "{}_predicted_value".format(output_name): decision["output"][
-                    "predicted_value"
-                ]
-            }
-            for decision in decisions
+        return [decision["output"]["predicted_value"] for decision in decisions]
+
+    def _pandas_generator_boosting_decide_from_df(
+        self, generator_id, from_ts, to_ts, params, df
+    ):
+        decisions = super(Client, self).get_generator_bulk_boosting_decision(
+            self._pandas_boosting_decisions_payload(
+                generator_id, from_ts, to_ts, params, df
+            )
         )
 
-    def decide_boosting_from_contexts_df(self, agent_id, from_ts, to_ts, contexts_df):
-        predictions_df_list = []
-        Client.check_decision_context_df(contexts_df)
-        configuration = self.get_agent(agent_id)["configuration"]
+        return [decision["output"]["predicted_value"] for decision in decisions]
 
+    def _pandas_boosting_decide_from_contexts_df(
+        self, entity_id, from_ts, to_ts, contexts_df, configuration, decide, max_workers
+    ):
+        # Each chunk fills its own slice of the predictions, the resulting DataFrame
+        # is built once all the chunks are decided.
+        predicted_values = [None] * len(contexts_df)
         chunk_size = self.config["operationsChunksSize"]
-        for chunk in chunker(contexts_df, chunk_size):
+
+        def decide_chunk(pos):
+            chunk = contexts_df[pos : pos + chunk_size]
             df, tz_col = self._generate_decision_df_and_tz_col(
-                agent_id, chunk, configuration
+                entity_id, chunk, configuration
             )
-            predictions_iter = self._pandas_agent_boosting_decide_from_df(
-                agent_id,
+            decisions = decide(
+                entity_id,
                 from_ts,
                 to_ts,
                 {
                     "configuration": configuration,
-                    "feature_names": chunk.columns.values,
+                    "feature_names": df.columns.values,
                     "tz_col": tz_col,
+                    "timezone_offsets": create_timezone_offsets(chunk, tz_col).tolist()
+                    if has_generated_time_features(configuration)
+                    else [None] * len(chunk),
                 },
                 df,
             )
+            if len(decisions) != len(chunk):
+                raise CraftAiDecisionError(
+                    """Unable to take the boosting decisions of the rows {} to {},"""
+                    """ {} decisions were received for {} contexts.""".format(
+                        pos, pos + len(chunk) - 1, len(decisions), len(chunk)
+                    )
+                )
+            predicted_values[pos : pos + chunk_size] = decisions
 
-            predictions_df = pd.DataFrame(predictions_iter, index=chunk.index)
-            predictions_df_list.append(predictions_df)
+        positions = range(0, len(contexts_df), chunk_size)
+        if max_workers is not None and max_workers > 1 and len(positions) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Consume the results to propagate the chunks' errors
+                list(executor.map(decide_chunk, positions))
+        else:
+            for pos in positions:
+                decide_chunk(pos)
 
-        return predictions_df_list[0].append(predictions_df_list[1:])
+        output_name = configuration["output"][0]
+        return pd.DataFrame(
+            {"{}_predicted_value".format(output_name): predicted_values},
+            index=contexts_df.index,
+        )
 
-    def _pandas_generator_boosting_decide_from_df(
-        self, generator_id, from_ts, to_ts, params, df
+    def decide_boosting_from_contexts_df(
+        self, agent_id, from_ts, to_ts, contexts_df, max_workers=None
     ):
-        decisions_payload = []
+        """Get the boosting decisions of an agent for each row of a DataFrame.
 
-        for row in df.itertuples(name=None):
-            params["context_ops"] = row
-            context = self._check_context_properties(params)
-            time = self._generate_time_features(params, context)
-            decide_context = self._generate_decision_context(params, context, time)
+        The contexts are sent by chunks of `operationsChunksSize` rows.
 
-            decisions_payload.append(
-                {
-                    "entityName": generator_id,
-                    "timeWindow": [from_ts, to_ts],
-                    "context": decide_context,
-                }
-            )
+        :param str agent_id: the id of the agent.
+        :param int from_ts: The boosting model will be built from this timestamp.
+        :param int to_ts: The boosting model will be built until this timestamp.
+        :param pd.DataFrame contexts_df: time indexed contexts.
+        :param int max_workers: Optional. If greater than 1, the maximum number
+        of chunks requested concurrently.
 
-        decisions = super(Client, self).get_generator_bulk_boosting_decision(
-            decisions_payload
-        )
-        output_name = params["configuration"]["output"][0]
+        :return: the predicted values.
+        :rtype: pd.DataFrame.
+        """
+        Client.check_decision_context_df(contexts_df)
+        configuration = self.get_agent(agent_id)["configuration"]
 
-        return (
-            {
-                "{}_predicted_value".format(output_name): decision["output"][
-                    "predicted_value"
-                ]
-            }
-            for decision in decisions
+        return self._pandas_boosting_decide_from_contexts_df(
+            agent_id,
+            from_ts,
+            to_ts,
+            contexts_df,
+            configuration,
+            self._pandas_agent_boosting_decide_from_df,
+            max_workers,
         )
 
     def decide_generator_boosting_from_contexts_df(
-        self, generator_id, from_ts, to_ts, contexts_df
+        self, generator_id, from_ts, to_ts, contexts_df, max_workers=None
     ):
-        predictions_df_list = []
-        Client.check_decision_context_df(contexts_df)
-        configuration = self.get_generator(generator_id)["configuration"]
+        """Get the boosting decisions of a generator for each row of a DataFrame.
 
-        chunk_size = self.config["operationsChunksSize"]
-        for chunk in chunker(contexts_df, chunk_size):
-            df, tz_col = self._generate_decision_df_and_tz_col(
-                generator_id, chunk, configuration
-            )
+        The contexts are sent by chunks of `operationsChunksSize` rows.
 
-            predictions_iter = self._pandas_generator_boosting_decide_from_df(
-                generator_id,
-                from_ts,
-                to_ts,
-                {
-                    "configuration": configuration,
-                    "feature_names": df.columns.values,
-                    "tz_col": tz_col,
-                },
-                df,
-            )
-            predictions_df = pd.DataFrame(predictions_iter, index=chunk.index)
-            predictions_df_list.append(predictions_df)
+        :param str generator_id: the id of the generator.
+        :param int from_ts: The boosting model will be built from this timestamp.
+        :param int to_ts: The boosting model will be built until this timestamp.
+        :param pd.DataFrame contexts_df: time indexed contexts.
+        :param int max_workers: Optional. If greater than 1, the maximum number
+        of chunks requested concurrently.
 
-        return predictions_df_list[0].append(predictions_df_list[1:])
+        :return: the predicted values.
+        :rtype: pd.DataFrame.
+        """
+        Client.check_decision_context_df(contexts_df)
+        configuration = self.get_generator(generator_id)["configuration"]
+
+        return self._pandas_boosting_decide_from_contexts_df(
+            generator_id,
+            from_ts,
+            to_ts,
+            contexts_df,
+            configuration,
+            self._pandas_generator_boosting_decide_from_df,
+            max_workers,
+        )
@@ -1,15 +1,26 @@
 import pandas as pd
 
-from .. import Interpreter as VanillaInterpreter, Time
-from ..errors import CraftAiNullDecisionError
-from .utils import is_valid_property_value, create_timezone_df, format_input
+from .. import Interpreter as VanillaInterpreter
+from ..errors import CraftAiBadRequestError, CraftAiError, CraftAiNullDecisionError
+from ..time import Time
+from .utils import (
+    is_valid_property_value,
+    create_timezone_df,
+    create_timezone_offsets,
+    format_input,
+    generate_time_features,
+    has_generated_time_features,
+)
 
 
 class Interpreter(VanillaInterpreter):
     @staticmethod
-    def decide_from_contexts_df(tree, contexts_df):
+    def decide_from_contexts_df(tree, contexts_df, explain=False, profiler=None):
         bare_tree, configuration, tree_version = VanillaInterpreter._parse_tree(tree)
-        interpreter = VanillaInterpreter._get_interpreter(tree_version)
+        interpreter = VanillaInterpreter._compile(
+            configuration, bare_tree, VanillaInterpreter._get_interpreter(tree_version)
+        )
+        explanation_index = VanillaInterpreter._get_explanation_index(tree, explain)
 
         df = contexts_df.copy(deep=True)
         tz_col = [
@@ -23,21 +34,41 @@ class Interpreter(VanillaInterpreter):
         if tz_col:
             tz_col = tz_col[0]
             df[tz_col] = create_timezone_df(contexts_df, tz_col).iloc[:, 0]
+        # The UTC offsets used to generate the time features are computed once for
+        # the whole DataFrame instead of parsing the timezone of each row.
+        if has_generated_time_features(configuration):
+            timezone_offsets = create_timezone_offsets(contexts_df, tz_col).tolist()
+        else:
+            timezone_offsets = [None] * len(df)
 
         predictions_iter = (
             Interpreter.decide_from_row(
                 {
                     "bare_tree": bare_tree,
                     "context_ops": row,
+                    "timezone_offset": timezone_offset,
                     "tz_col": tz_col,
                     "configuration": configuration,
                     "feature_names": df.columns.values,
                     "interpreter": interpreter,
+                    "explanation_index": explanation_index,
+                    "profiler": profiler,
                 }
             )
-            for row in df.itertuples(name=None)
+            for row, timezone_offset in zip(df.itertuples(name=None), timezone_offsets)
         )
-        return pd.DataFrame(predictions_iter, index=df.index)
+        predictions_df = pd.DataFrame(predictions_iter, index=df.index)
+        if explanation_index is not None:
+            # Explanations are shared between the rows decided by the same leaf,
+            # storing them as categories avoids holding one string per row.
+            for output in configuration["output"]:
+                column = "{}_explanation".format(output)
+                if column in predictions_df:
+                    predictions_df[column] = pd.Categorical(
+                        predictions_df[column],
+                        categories=explanation_index.explanations(output),
+                    )
+        return predictions_df
 
     @staticmethod
     def decide_from_row(params):
@@ -47,10 +78,13 @@ class Interpreter(VanillaInterpreter):
     params : dict {
       "bare_tree": a valid craft ai tree,
       "context_row": a valid tuple representing a context operation,
+      "timezone_offset": (optional) the UTC offset in seconds of the context operation,
       "tz_col": the time zone column,
       "configuration": a valid craft-ai configuration,
       "feature_names": the feature names,
-      "interpreter": craft_ai interpreter
+      "interpreter": craft_ai interpreter,
+      "explanation_index": (optional) the ExplanationIndex of the tree,
+      "profiler": (optional) a DecisionProfiler recording the decisions
     }
     """
 
@@ -61,13 +95,9 @@ class Interpreter(VanillaInterpreter):
             )
             if is_valid_property_value(feature_name, value)
         }
-        time = Time(
-            t=params["context_ops"][0].value
-            // 1000000000,  # Timestamp.value returns nanoseconds
-            timezone=context[params["tz_col"]]
-            if params["tz_col"]
-            else params["context_ops"][0].tz,
-        )
+        time = generate_time_features(params, context)
+        profiler = params.get("profiler")
+        start = profiler.start() if profiler is not None else None
         try:
             decision = VanillaInterpreter._decide(
                 params["configuration"],
@@ -75,11 +105,120 @@ class Interpreter(VanillaInterpreter):
                 (context, time),
                 params["interpreter"],
             )
+            if profiler is not None:
+                profiler.record(decision, params["bare_tree"], start)
+            explanation_index = params.get("explanation_index")
+            if explanation_index is not None:
+                VanillaInterpreter._explain(explanation_index, decision)
 
-            return {
-                "{}_{}".format(output, key): value
-                for output, output_decision in decision["output"].items()
-                for key, value in output_decision.items()
-            }
+            return Interpreter._format_decision(decision)
         except CraftAiNullDecisionError as e:
+            if profiler is not None:
+                profiler.record_error(e, start)
             return {"error": e.message}
+
+    @staticmethod
+    def _format_decision(decision):
+        return {
+            "{}_{}".format(output, key): value
+            for output, output_decision in decision["output"].items()
+            for key, value in output_decision.items()
+        }
+
+    @staticmethod
+    def _prepare_contexts(contexts_df, base_contexts, tz_col, generated):
+        """Compute the contexts and the time features of each row of the DataFrame,
+        given the timezone property of a configuration and whether it generates time
+        features."""
+        if generated:
+            offsets = create_timezone_offsets(contexts_df, tz_col)
+            timestamps = contexts_df.index.asi8 // 10 ** 9
+            times = [
+                Time.from_epoch(timestamp, offset)
+                for timestamp, offset in zip(timestamps.tolist(), offsets.tolist())
+            ]
+        else:
+            times = [None] * len(contexts_df)
+        if not tz_col:
+            return base_contexts, times
+        contexts = []
+        timezones = create_timezone_df(contexts_df, tz_col).iloc[:, 0].tolist()
+        for context, timezone in zip(base_contexts, timezones):
+            context = dict(context)
+            if is_valid_property_value(tz_col, timezone):
+                context[tz_col] = format_input(timezone)
+            else:
+                context.pop(tz_col, None)
+            contexts.append(context)
+        return contexts, times
+
+    @staticmethod
+    def decide_trees_from_contexts_df(
+        trees, contexts_df, layout="long", entity_column="entity_id"
+    ):
+        if layout not in ["long", "wide"]:
+            raise CraftAiError(
+                """Invalid layout given, {} should be "long" or "wide".""".format(
+                    layout
+                )
+            )
+        if not trees:
+            raise CraftAiBadRequestError(
+                """Invalid trees given, at least one tree is needed."""
+            )
+        feature_names = contexts_df.columns.values
+        base_contexts = [
+            {
+                feature_name: format_input(value)
+                for feature_name, value in zip(feature_names, row)
+                if is_valid_property_value(feature_name, value)
+            }
+            for row in contexts_df.itertuples(index=False, name=None)
+        ]
+        # The contexts and time features only depend on the timezone property and on
+        # the generated time features, they are shared by the trees with the same ones.
+        prepared_contexts = {}
+
+        predictions_dfs = {}
+        for entity_id, tree in trees.items():
+            bare_tree, configuration, tree_version = VanillaInterpreter._parse_tree(
+                tree
+            )
+            interpreter = VanillaInterpreter._compile(
+                configuration,
+                bare_tree,
+                VanillaInterpreter._get_interpreter(tree_version),
+            )
+            tz_col = next(
+                (
+                    key
+                    for key, value in configuration["context"].items()
+                    if value["type"] == "timezone"
+                ),
+                None,
+            )
+            key = (tz_col, has_generated_time_features(configuration))
+            if key not in prepared_contexts:
+                prepared_contexts[key] = Interpreter._prepare_contexts(
+                    contexts_df, base_contexts, *key
+                )
+            contexts, times = prepared_contexts[key]
+
+            predictions = []
+            for context, time in zip(contexts, times):
+                try:
+                    decision = VanillaInterpreter._decide(
+                        configuration, bare_tree, (context, time), interpreter
+                    )
+                    predictions.append(Interpreter._format_decision(decision))
+                except CraftAiNullDecisionError as e:
+                    predictions.append({"error": e.message})
+            predictions_dfs[entity_id] = pd.DataFrame(
+                predictions, index=contexts_df.index
+            )
+
+        if layout == "wide":
+            return pd.concat(predictions_dfs, axis=1, names=[entity_column])
+        for entity_id, predictions_df in predictions_dfs.items():
+            predictions_df.insert(0, entity_column, entity_id)
+        return pd.concat(list(predictions_dfs.values()))
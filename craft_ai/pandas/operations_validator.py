@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from ..interpreter_v2 import _VALUE_VALIDATORS
+from ..operations_validator import OperationsValidator as VanillaOperationsValidator
+from .constants import MISSING_VALUE, OPTIONAL_VALUE
+from .utils import DUMMY_COLUMN_NAME
+
+
+def _to_python_value(value):
+    """Python value of a numpy scalar, as checked by `_VALUE_VALIDATORS`.
+
+    Pandas stores the integers of a column holding missing values as floats, the
+    integral floats are converted back to integers. This is deliberately more
+    lenient than the interpreters, which reject the floats where integers are
+    expected."""
+    value = value.item() if isinstance(value, np.generic) else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _validate_numerical_column(values, validator):
+    """Apply a validator of `_VALUE_VALIDATORS` to each distinct value of a
+    numerical column."""
+    uniques = pd.unique(values)
+    valid_uniques = [value for value in uniques if validator(_to_python_value(value))]
+    return np.isin(values, np.array(valid_uniques, dtype=values.dtype))
+
+
+def _validate_object_column(column, validator):
+    """Apply a validator to each distinct value of an object column."""
+    try:
+        uniques = pd.unique(column.values)
+    except TypeError:
+        # Unhashable values
+        return column.map(validator).values.astype(bool)
+    valid_uniques = [value for value in uniques if validator(value)]
+    return column.isin(np.array(valid_uniques, dtype=object)).values
+
+
+class OperationsValidator(VanillaOperationsValidator):
+    """Check context operations against an agent configuration, before sending them.
+
+    Operations given as a DataFrame, as for the pandas `add_agent_operations`, are
+    checked column by column, `NaN` values being absent values. The integral floats
+    of the numerical columns are checked as integers.
+    """
+
+    def validate(self, operations):
+        if not isinstance(operations, pd.DataFrame):
+            return super(OperationsValidator, self).validate(operations)
+
+        errors = []
+        if not isinstance(operations.index, pd.DatetimeIndex):
+            errors.append(
+                self._error(None, None, None, "the DataFrame is not time indexed")
+            )
+        for prop in operations.columns:
+            if prop == DUMMY_COLUMN_NAME:
+                continue
+            column = operations[prop]
+            if prop not in self._types:
+                errors.append(
+                    self._error(
+                        None,
+                        prop,
+                        None,
+                        "'{}' is not a property of the configuration".format(prop),
+                    )
+                )
+                continue
+            property_type = self._types[prop]
+            validator = _VALUE_VALIDATORS.get(property_type)
+            if validator is None:
+                continue
+
+            if pd.api.types.is_bool_dtype(column.dtype):
+                valid = np.full(len(column), validator(True))
+            elif pd.api.types.is_numeric_dtype(column.dtype):
+                valid = _validate_numerical_column(column.values, validator)
+            else:
+                valid = _validate_object_column(
+                    column,
+                    lambda value: value is MISSING_VALUE
+                    or value is OPTIONAL_VALUE
+                    or validator(value),
+                )
+            # Absent values aren't sent
+            valid |= column.isna().values
+            for row in np.flatnonzero(~valid).tolist():
+                value = column.iat[row]
+                errors.append(
+                    self._error(
+                        row, prop, value, self._invalid_value_message(prop, value)
+                    )
+                )
+        errors.sort(key=lambda error: -1 if error["row"] is None else error["row"])
+        return errors
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+from ..errors import CraftAiBadRequestError
+from .constants import MISSING_VALUE, OPTIONAL_VALUE
+from .utils import create_timezone_offsets, is_valid_property_value
+
+TIME_TYPES = ["time_of_day", "day_of_week", "day_of_month", "month_of_year"]
+DEFAULT_TIME_QUANTUM = 600
+
+
+def _to_pandas_value(value):
+    # Same representation as the operations DataFrames of the pandas client
+    if value is None:
+        return MISSING_VALUE
+    if value == {}:
+        return OPTIONAL_VALUE
+    return value
+
+
+def _generate_time_features(index, offsets):
+    local_times = pd.to_datetime(index.asi8 // 10 ** 9 + offsets, unit="s")
+    return {
+        "time_of_day": (
+            local_times.hour + local_times.minute / 60 + local_times.second / 3600
+        ).values,
+        "day_of_week": local_times.dayofweek.values,
+        "day_of_month": local_times.day.values,
+        "month_of_year": local_times.month.values,
+    }
+
+
+class ContextReplay(object):
+    """Compute the context states of an agent from its operations, locally.
+
+    The operations are replayed as the craft ai API does: the state at a timestamp
+    holds the last value of each property, sampled every `time_quantum` seconds from
+    the first operation unless `operations_as_events` is set. Missing values (`None`
+    or `MISSING_VALUE`) are ignored when `deactivate_missing_values` is set, and
+    the generated time properties are computed in the timezone of each state.
+
+    :param dict configuration: the agent configuration.
+    :param operations: the context operations, either as a list like
+    `[{"timestamp": 1469415720, "context": {...}}]` or as a DataFrame with a tz-aware
+    DatetimeIndex like the ones given to `add_agent_operations`.
+    """
+
+    def __init__(self, configuration, operations):
+        self.configuration = configuration
+        context = configuration["context"]
+        self._properties = [
+            prop
+            for prop, attributes in context.items()
+            if not (
+                attributes["type"] in TIME_TYPES
+                and attributes.get("is_generated", True)
+            )
+        ]
+        self._generated = [prop for prop in context if prop not in self._properties]
+        self._tz_col = next(
+            (prop for prop in self._properties if context[prop]["type"] == "timezone"),
+            None,
+        )
+        if configuration.get("operations_as_events"):
+            self._time_quantum = None
+        else:
+            self._time_quantum = configuration.get("time_quantum", DEFAULT_TIME_QUANTUM)
+        self._deactivate_missing_values = configuration.get(
+            "deactivate_missing_values", True
+        )
+        self._replay(self._iter_operations(operations))
+
+    @staticmethod
+    def _iter_operations(operations):
+        if isinstance(operations, pd.DataFrame):
+            if not isinstance(operations.index, pd.DatetimeIndex):
+                raise CraftAiBadRequestError(
+                    "Invalid dataframe given, it is not time indexed."
+                )
+            if operations.index.tz is None:
+                raise CraftAiBadRequestError(
+                    """tz-naive DatetimeIndex are not supported,
+                                     it must be tz-aware."""
+                )
+            columns = operations.columns.values
+            timestamps = (operations.index.asi8 // 10 ** 9).tolist()
+            for timestamp, row in zip(
+                timestamps, operations.itertuples(index=False, name=None)
+            ):
+                yield timestamp, {
+                    column: value
+                    for column, value in zip(columns, row)
+                    if is_valid_property_value(column, value)
+                }
+        else:
+            for operation in operations:
+                yield operation["timestamp"], {
+                    prop: _to_pandas_value(value)
+                    for prop, value in operation["context"].items()
+                }
+
+    def _replay(self, operations):
+        # Stable sort, the operations sharing a timestamp are applied in their order
+        operations = sorted(operations, key=lambda operation: operation[0])
+        timestamps = []
+        states = []
+        state = {}
+        for timestamp, context in operations:
+            for prop, value in context.items():
+                if prop not in self.configuration["context"]:
+                    continue
+                if value is MISSING_VALUE and self._deactivate_missing_values:
+                    continue
+                state[prop] = value
+            if timestamps and timestamps[-1] == timestamp:
+                states[-1] = dict(state)
+            else:
+                timestamps.append(timestamp)
+                states.append(dict(state))
+        self._timestamps = np.array(timestamps, dtype=np.int64)
+        # The first row is the empty state, before the first operation
+        self._states_df = pd.DataFrame(
+            [{}] + states, columns=self._properties, dtype=object
+        )
+
+    def states_at(self, timestamps):
+        """Compute the context states at the given timestamps.
+
+        :param timestamps: POSIX timestamps in seconds, as a list or a numpy array, or
+        a tz-aware DatetimeIndex.
+
+        :return: the states, with one column per context property including the
+        generated time properties, indexed by the given timestamps. Properties
+        without value yet are NaN, missing and optional values are `MISSING_VALUE`
+        and `OPTIONAL_VALUE`, as expected by `decide_from_contexts_df`.
+        :rtype: pd.DataFrame.
+        """
+        if isinstance(timestamps, pd.DatetimeIndex):
+            if timestamps.tz is None:
+                raise CraftAiBadRequestError(
+                    """tz-naive DatetimeIndex are not supported,
+                                     it must be tz-aware."""
+                )
+            index = timestamps
+        else:
+            index = pd.to_datetime(
+                np.asarray(timestamps, dtype=np.int64), unit="s"
+            ).tz_localize("UTC")
+        query = index.asi8 // 10 ** 9
+
+        if self._time_quantum and len(self._timestamps):
+            # The state only changes at the samples of the time quantum
+            first = self._timestamps[0]
+            query = np.where(
+                query >= first,
+                first + (query - first) // self._time_quantum * self._time_quantum,
+                query,
+            )
+        positions = np.searchsorted(self._timestamps, query, side="right")
+        states_df = pd.DataFrame(
+            self._states_df.values[positions], columns=self._properties, index=index
+        )
+
+        if self._generated:
+            offsets = create_timezone_offsets(states_df, self._tz_col)
+            time_features = _generate_time_features(index, offsets)
+            for prop in self._generated:
+                states_df[prop] = time_features[
+                    self.configuration["context"][prop]["type"]
+                ]
+        return states_df[list(self.configuration["context"])]
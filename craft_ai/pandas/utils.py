@@ -4,6 +4,7 @@ import re
 import string
 import importlib
 
+import numpy as np
 import pandas as pd
 from semver import VersionInfo
 from .constants import (
@@ -11,7 +12,9 @@ from .constants import (
     OPTIONAL_VALUE,
 )
 from ..constants import REACT_CRAFT_AI_DECISION_TREE_VERSION
-from ..errors import CraftAiError
+from ..errors import CraftAiBadRequestError, CraftAiError, CraftAiTimeError
+from ..time import Time
+from ..timezones import is_timezone, timezone_offset_in_sec
 
 
 DUMMY_COLUMN_NAME = "CraftGeneratedDummy"
@@ -40,16 +43,103 @@ def is_valid_property_value(key, value):
     )
 
 
+TIME_TYPES = ["time_of_day", "day_of_week", "day_of_month", "month_of_year"]
+
+
+def has_generated_time_features(configuration):
+    """Whether some context properties of the configuration are generated from the
+    time of the contexts."""
+    return any(
+        attributes["type"] in TIME_TYPES and attributes.get("is_generated", True)
+        for prop, attributes in configuration["context"].items()
+        if prop not in configuration.get("output", [])
+    )
+
+
+def get_utc_offsets(index):
+    """Return the UTC offsets, in seconds, of each timestamp of a tz-aware DatetimeIndex"""
+    if index.tz is None:
+        raise CraftAiBadRequestError(
+            """tz-naive DatetimeIndex are not supported,
+                                     it must be tz-aware."""
+        )
+    local_ns = index.tz_localize(None).asi8
+    utc_ns = index.tz_convert("UTC").tz_localize(None).asi8
+    return (local_ns - utc_ns) // 10 ** 9
+
+
+def _format_utc_offset(offset):
+    # Same format as `strftime("%z")`, e.g. "+0200"
+    sign = "+" if offset >= 0 else "-"
+    hours, minutes = divmod(abs(int(offset)) // 60, 60)
+    return "{}{:02d}{:02d}".format(sign, hours, minutes)
+
+
 # Helper
 def create_timezone_df(df, name):
     timezone_df = pd.DataFrame(index=df.index)
     if name in df.columns:
         timezone_df[name] = df[name].fillna(method="ffill")
     else:
-        timezone_df[name] = df.index.strftime("%z")
+        # Only a few distinct offsets exist in a given index, they are formatted once
+        # and stored as a categorical column.
+        offsets, codes = np.unique(get_utc_offsets(df.index), return_inverse=True)
+        timezone_df[name] = pd.Categorical.from_codes(
+            codes, categories=[_format_utc_offset(offset) for offset in offsets]
+        )
     return timezone_df
 
 
+def create_timezone_offsets(df, name=None):
+    """Return the UTC offsets, in seconds, to use to generate the time features of
+    each row of the given DataFrame.
+
+    They are taken from the timezone column `name` when it is defined, forward-filled,
+    and from the DatetimeIndex for the rows without timezone.
+
+    :raises CraftAiTimeError: if a value of the timezone column isn't a timezone.
+    """
+    if not (name and name in df.columns):
+        return get_utc_offsets(df.index)
+    timezones = df[name].fillna(method="ffill")
+    offsets_by_timezone = {}
+    for timezone in timezones.drop_duplicates().tolist():
+        if not is_valid_property_value(name, timezone) or (
+            timezone is MISSING_VALUE or timezone is OPTIONAL_VALUE
+        ):
+            continue
+        if not is_timezone(timezone):
+            raise CraftAiTimeError(
+                """Unable to generate the time features, {} is not a valid"""
+                """ timezone.""".format(timezone)
+            )
+        offsets_by_timezone[timezone] = timezone_offset_in_sec(timezone)
+    timezones_offsets = timezones.map(offsets_by_timezone)
+    without_timezone = timezones_offsets.isna().values
+    if not without_timezone.any():
+        return timezones_offsets.values.astype(np.int64)
+    return np.where(
+        without_timezone, get_utc_offsets(df.index), timezones_offsets.values
+    ).astype(np.int64)
+
+
+def generate_time_features(params, context):
+    timestamp = (
+        params["context_ops"][0].value // 10 ** 9
+    )  # Timestamp.value returns nanoseconds
+    if "timezone_offset" in params:
+        if params["timezone_offset"] is None:
+            # No time feature to generate
+            return None
+        return Time.from_epoch(timestamp, params["timezone_offset"])
+    return Time(
+        t=timestamp,
+        timezone=context[params["tz_col"]]
+        if params["tz_col"]
+        else params["context_ops"][0].tz,
+    )
+
+
 def random_string(length=20):
     return "".join(choice(string.ascii_letters) for x in range(length))
 
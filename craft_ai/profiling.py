@@ -0,0 +1,156 @@
+import time
+
+from collections import Counter, defaultdict
+
+from .errors import CraftAiError
+
+
+def _decision_path_from_rules(node, decision_rules):
+    """Retrieve the path of a decision from its decision rules, for v1 decisions."""
+    path = ["0"]
+    for rule in decision_rules:
+        for i, child in enumerate(node.get("children") or []):
+            child_rule = child.get("decision_rule") or {}
+            if (
+                child_rule.get("property") == rule["property"]
+                and child_rule.get("operator") == rule["operator"]
+                and child_rule.get("operand") == rule["operand"]
+            ):
+                path.append(str(i))
+                node = child
+                break
+        else:
+            return None
+    return "-".join(path)
+
+
+class DecisionProfiler(object):
+    """Collect statistics on the decisions taken with a tree.
+
+    A profiler can be given to `Interpreter.decide`, `Interpreter.decide_many` and the
+    pandas `decide_from_contexts_df` to count the decisions taken at each node of the
+    tree, the decisions computed from a node distribution because no child matched
+    the context, the decision errors and, optionally, the time spent in each call.
+    """
+
+    def __init__(self, timings=False):
+        self.timings = timings
+        self.reset()
+
+    def reset(self):
+        self._decisions = 0
+        self._errors = Counter()
+        self._decision_paths = defaultdict(Counter)
+        self._fallbacks = defaultdict(Counter)
+        self._calls = 0
+        self._total_time = 0.0
+        self._min_time = None
+        self._max_time = None
+
+    def start(self):
+        return time.perf_counter() if self.timings else None
+
+    def record(self, decision, bare_tree=None, start=None):
+        """Record a decision, as returned by `Interpreter.decide`."""
+        self._decisions += 1
+        for output, output_decision in decision["output"].items():
+            decision_path = output_decision.get("decision_path")
+            if decision_path is None and bare_tree is not None:
+                decision_path = _decision_path_from_rules(
+                    bare_tree[output], output_decision["decision_rules"]
+                )
+            self._decision_paths[output][decision_path] += 1
+            # Without matching child, v2 interpreters compute the node distribution
+            if "decision_path" in output_decision and (
+                output_decision.get("confidence") is None
+            ):
+                self._fallbacks[output][decision_path] += 1
+        self._record_time(start)
+
+    def record_error(self, error, start=None):
+        """Record a decision error."""
+        self._errors[type(error).__name__] += 1
+        self._record_time(start)
+
+    def _record_time(self, start):
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        self._calls += 1
+        self._total_time += duration
+        if self._min_time is None or duration < self._min_time:
+            self._min_time = duration
+        if self._max_time is None or duration > self._max_time:
+            self._max_time = duration
+
+    def to_dict(self):
+        """Export the statistics.
+
+        The "node_visits" of an output count the decisions that went through each
+        node, i.e. the decisions taken at the node and in its subtree.
+
+        :return: the statistics, e.g. {"decisions": 10, "errors": {}, "outputs":
+        {"lightbulbState": {"decision_paths": {"0-1": 10}, "fallbacks": {},
+        "node_visits": {"0": 10, "0-1": 10}}}, "timings": None}.
+        :rtype: dict.
+        """
+        outputs = {}
+        for output, decision_paths in self._decision_paths.items():
+            node_visits = Counter()
+            for decision_path, hits in decision_paths.items():
+                if decision_path is None:
+                    continue
+                steps = decision_path.split("-")
+                for depth in range(1, len(steps) + 1):
+                    node_visits["-".join(steps[:depth])] += hits
+            outputs[output] = {
+                "decision_paths": dict(decision_paths),
+                "fallbacks": dict(self._fallbacks[output]),
+                "node_visits": dict(node_visits),
+            }
+        timings = None
+        if self._calls:
+            timings = {
+                "calls": self._calls,
+                "total": self._total_time,
+                "mean": self._total_time / self._calls,
+                "min": self._min_time,
+                "max": self._max_time,
+            }
+        return {
+            "decisions": self._decisions,
+            "errors": dict(self._errors),
+            "outputs": outputs,
+            "timings": timings,
+        }
+
+    def to_dataframe(self):
+        """Export the statistics of each node as a pandas DataFrame.
+
+        :return: one row per output and node visited, with the "visits", "decisions"
+        and "fallbacks" columns.
+        :rtype: pandas.DataFrame.
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise CraftAiError(
+                """Unable to export the statistics as a DataFrame, pandas is not"""
+                """ installed."""
+            )
+        rows = []
+        for output, statistics in self.to_dict()["outputs"].items():
+            for decision_path, visits in statistics["node_visits"].items():
+                rows.append(
+                    {
+                        "output": output,
+                        "decision_path": decision_path,
+                        "visits": visits,
+                        "decisions": statistics["decision_paths"].get(decision_path, 0),
+                        "fallbacks": statistics["fallbacks"].get(decision_path, 0),
+                    }
+                )
+        return pd.DataFrame(
+            rows,
+            columns=["output", "decision_path", "visits", "decisions", "fallbacks"],
+        )
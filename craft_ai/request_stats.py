@@ -0,0 +1,204 @@
+import os
+import re
+import threading
+
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# The segments following these ones are entity ids, except in the bulk routes
+_ENTITY_SEGMENTS = ["agents", "generators"]
+_API_PATH = re.compile("^/api/v1/[^/]+/[^/]+")
+
+
+def get_endpoint(method, url):
+    """Identify the endpoint of a request, without the entity ids and parameters.
+
+    :return: the endpoint, e.g. "GET /agents/{id}/decision/tree".
+    :rtype: str.
+    """
+    path = _API_PATH.sub("", urlparse(url).path)
+    segments = path.strip("/").split("/")
+    if segments[0] != "bulk":
+        segments = [
+            "{id}" if i > 0 and segments[i - 1] in _ENTITY_SEGMENTS else segment
+            for i, segment in enumerate(segments)
+        ]
+    return "{} /{}".format(method.upper(), "/".join(segments))
+
+
+class _Timings(object):
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if self.min is None or duration < self.min:
+            self.min = duration
+        if self.max is None or duration > self.max:
+            self.max = duration
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class _EndpointStats(object):
+    def __init__(self):
+        self.latency = _Timings()
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.status_codes = Counter()
+        self.errors = Counter()
+
+    def to_dict(self):
+        buckets = [str(bucket) for bucket in LATENCY_BUCKETS] + ["+Inf"]
+        return {
+            "requests": self.latency.count,
+            "latency": dict(
+                self.latency.to_dict(), histogram=dict(zip(buckets, self.histogram))
+            ),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "status_codes": dict(self.status_codes),
+            "errors": dict(self.errors),
+        }
+
+
+class RequestStats(object):
+    """Collect statistics on the requests sent by a client to the craft ai API.
+
+    Given to a client in the `requestStats` configuration, it records for each
+    endpoint the number of requests, a latency histogram, the request and response
+    sizes, the status codes and the error classes, as well as the time spent encoding
+    and decoding JSON and the polling attempts of the long requests.
+
+    :param on_request: Optional. function called after each request with its
+    "endpoint", "method", "url", "status_code", "duration" in seconds,
+    "request_bytes", "response_bytes" and "error" class name, e.g. to forward them
+    to a metrics system. It isn't pickled with the statistics, e.g. a lambda can't
+    be, the unpickled statistics have no `on_request` function.
+    """
+
+    def __init__(self, on_request=None):
+        self.on_request = on_request
+        self._pid = os.getpid()
+        self._process_lock = threading.Lock()
+        self.reset()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_process_lock"]
+        del state["on_request"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.on_request = None
+        self._pid = os.getpid()
+        self._process_lock = threading.Lock()
+
+    @property
+    def _lock(self):
+        # The lock may have been held by another thread of the parent process while
+        # forking, a forked process gets a new one
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._process_lock = threading.Lock()
+        return self._process_lock
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = defaultdict(_EndpointStats)
+            self._encode = _Timings()
+            self._encode_bytes = 0
+            self._decode = _Timings()
+            self._polls = Counter()
+
+    def record_request(
+        self,
+        method,
+        url,
+        duration,
+        status_code=None,
+        request_bytes=0,
+        response_bytes=0,
+        error=None,
+    ):
+        """Record a request, `error` being the class name of its error if any."""
+        endpoint = get_endpoint(method, url)
+        with self._lock:
+            stats = self._endpoints[endpoint]
+            stats.latency.add(duration)
+            bucket = 0
+            while bucket < len(LATENCY_BUCKETS) and duration > LATENCY_BUCKETS[bucket]:
+                bucket += 1
+            stats.histogram[bucket] += 1
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            if status_code is not None:
+                stats.status_codes[status_code] += 1
+            if error is not None:
+                stats.errors[error] += 1
+        if self.on_request is not None:
+            self.on_request(
+                {
+                    "endpoint": endpoint,
+                    "method": method.upper(),
+                    "url": url,
+                    "status_code": status_code,
+                    "duration": duration,
+                    "request_bytes": request_bytes,
+                    "response_bytes": response_bytes,
+                    "error": error,
+                }
+            )
+
+    def record_encode(self, duration, size):
+        with self._lock:
+            self._encode.add(duration)
+            self._encode_bytes += size
+
+    def record_decode(self, duration):
+        with self._lock:
+            self._decode.add(duration)
+
+    def record_poll(self, operation):
+        """Record a new attempt of a long request, e.g. "get_agent_decision_tree"."""
+        with self._lock:
+            self._polls[operation] += 1
+
+    def to_dict(self):
+        """Export the statistics.
+
+        :return: the statistics, e.g. {"endpoints": {"GET /agents/{id}": {"requests":
+        1, "latency": {"count": 1, "total": 0.1, "mean": 0.1, "min": 0.1, "max": 0.1,
+        "histogram": {"0.005": 0, ..., "+Inf": 0}}, "request_bytes": 0,
+        "response_bytes": 120, "status_codes": {200: 1}, "errors": {}}}, "json":
+        {"encode": {..., "bytes": 0}, "decode": {...}}, "polls": {}}.
+        :rtype: dict.
+        """
+        with self._lock:
+            return {
+                "endpoints": {
+                    endpoint: stats.to_dict()
+                    for endpoint, stats in self._endpoints.items()
+                },
+                "json": {
+                    "encode": dict(self._encode.to_dict(), bytes=self._encode_bytes),
+                    "decode": self._decode.to_dict(),
+                },
+                "polls": dict(self._polls),
+            }
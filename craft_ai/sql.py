@@ -0,0 +1,176 @@
+import math
+
+from .errors import CraftAiError
+from .interpreter_v2 import InterpreterV2
+from .operators import OPERATORS, OPERATORS_FUNCTION
+from .tree_utils import parse_v2_tree
+
+_DIALECTS = {
+    "ansi": {"quote": '"', "true": "TRUE", "false": "FALSE"},
+    "postgresql": {"quote": '"', "true": "TRUE", "false": "FALSE"},
+    "sqlite": {"quote": '"', "true": "1", "false": "0"},
+    "mysql": {"quote": "`", "true": "TRUE", "false": "FALSE"},
+    "bigquery": {"quote": "`", "true": "TRUE", "false": "FALSE"},
+}
+
+
+def _is_leaf(node):
+    return not (node.get("children") is not None and len(node.get("children")))
+
+
+class _SqlWriter(object):
+    def __init__(self, dialect, columns):
+        if dialect not in _DIALECTS:
+            raise CraftAiError(
+                """Unknown SQL dialect '{}', expected one of {}.""".format(
+                    dialect, ", ".join(sorted(_DIALECTS))
+                )
+            )
+        self.dialect = _DIALECTS[dialect]
+        self.columns = columns or {}
+
+    def column(self, prop):
+        name = self.columns.get(prop, prop)
+        quote = self.dialect["quote"]
+        return "{0}{1}{0}".format(quote, name.replace(quote, quote * 2))
+
+    def literal(self, value):
+        if value is None:
+            return "NULL"
+        if isinstance(value, bool):
+            return self.dialect["true"] if value else self.dialect["false"]
+        if isinstance(value, int):
+            return str(value)
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                raise CraftAiError(
+                    """Unable to translate the decision tree to SQL, """
+                    """'{}' has no SQL literal.""".format(value)
+                )
+            return repr(value)
+        if isinstance(value, str):
+            return "'{}'".format(value.replace("'", "''"))
+        raise CraftAiError(
+            """Unable to translate the decision tree to SQL, """
+            """'{}' has no SQL literal.""".format(value)
+        )
+
+    def condition(self, decision_rule):
+        operator = decision_rule["operator"]
+        operand = decision_rule["operand"]
+        column = self.column(decision_rule["property"])
+        if not isinstance(operator, str) or operator not in OPERATORS.values():
+            raise CraftAiError(
+                """Invalid decision tree format, {} is not a valid"""
+                """ decision operator.""".format(operator)
+            )
+        # A NULL value doesn't validate any condition, as a missing context value
+        # doesn't validate any rule in `OPERATORS_FUNCTION_V2`.
+        if operator == OPERATORS["IS"]:
+            return "{} = {}".format(column, self.literal(operand))
+        if operator == OPERATORS["GTE"]:
+            return "{} >= {}".format(column, self.literal(operand))
+        if operator == OPERATORS["LT"]:
+            return "{} < {}".format(column, self.literal(operand))
+        if operator == OPERATORS["IN_INTERVAL"]:
+            lower, upper = self.literal(operand[0]), self.literal(operand[1])
+            if OPERATORS_FUNCTION[OPERATORS["LT"]](operand[0], operand[1]):
+                return "({0} >= {1} AND {0} < {2})".format(column, lower, upper)
+            # Wrap around interval, e.g. [22, 6[ for the time of day
+            return "({0} >= {1} OR {0} < {2})".format(column, lower, upper)
+        # OPERATORS["IN_MULTI"]
+        if not operand:
+            # "IN ()" isn't valid SQL, no value belongs to an empty operand
+            return "(1 = 0)"
+        return "{} IN ({})".format(
+            column, ", ".join(self.literal(value) for value in operand)
+        )
+
+
+def _leaf_values(node, path):
+    prediction = node.get("prediction")
+    if prediction is None:
+        prediction = node
+    predicted_value = prediction.get("value")
+    if predicted_value is None:
+        # The interpreter raises a `CraftAiDecisionError`
+        return None, None, None
+    return predicted_value, prediction.get("confidence") or 0, "-".join(path)
+
+
+def _to_case(node, path, output_values, output_type, writer):
+    if _is_leaf(node):
+        return [writer.literal(value) for value in _leaf_values(node, path)]
+
+    conditions = [
+        writer.condition(child["decision_rule"]) for child in node["children"]
+    ]
+    children_expressions = [
+        _to_case(child, path + [str(i)], output_values, output_type, writer)
+        for i, child in enumerate(node["children"])
+    ]
+    # Without matching child, the interpreter computes the distribution of the node
+    try:
+        fallback = InterpreterV2.compute_distribution(
+            node, output_values, output_type, list(path)
+        )
+    except Exception:  # pylint: disable=broad-except
+        # The interpreter raises the same error for the contexts reaching the node
+        fallback_expressions = ["NULL"] * 3
+    else:
+        fallback_expressions = [
+            writer.literal(fallback["predicted_value"]),
+            writer.literal(fallback["confidence"]),
+            writer.literal(fallback["decision_path"]),
+        ]
+    return [
+        "CASE {} ELSE {} END".format(
+            " ".join(
+                "WHEN {} THEN {}".format(condition, expressions[i])
+                for condition, expressions in zip(conditions, children_expressions)
+            ),
+            fallback_expressions[i],
+        )
+        for i in range(3)
+    ]
+
+
+def tree_to_sql(tree, output=None, dialect="ansi", columns=None):
+    """Translate a v2 decision tree into SQL expressions.
+
+    Each context property is read from the column of the same name, the generated
+    time properties, e.g. `time_of_day`, must be columns as well. Contexts for which
+    the interpreter raises an error get `NULL` values.
+
+    :param dict tree: decision tree.
+    :param str output: Optional. the output property, the first output of the tree by
+    default.
+    :param str dialect: Optional. one of "ansi", "postgresql", "sqlite", "mysql" and
+    "bigquery", "ansi" by default.
+    :param dict columns: Optional. the column names of the context properties, when
+    they differ from the property names.
+
+    :return: the SQL CASE expressions of the "predicted_value", the "confidence" and
+    the "decision_path".
+    :rtype: dict.
+
+    :raises CraftAiError: if the tree can't be translated.
+    """
+    bare_tree, configuration = parse_v2_tree(tree)
+    if output is None:
+        output = configuration["output"][0]
+    if output not in bare_tree:
+        raise CraftAiError(
+            """'{}' output tree can't be found in the given decision tree.""".format(
+                output
+            )
+        )
+    root = bare_tree[output]
+    expressions = _to_case(
+        root,
+        ["0"],
+        root.get("output_values"),
+        configuration["context"][output]["type"],
+        _SqlWriter(dialect, columns),
+    )
+    return dict(zip(["predicted_value", "confidence", "decision_path"], expressions))
@@ -5,133 +5,89 @@ from __future__ import absolute_import
 import time
 
 from datetime import datetime, tzinfo, timedelta
+from functools import lru_cache
 
 from pytz import utc as pyutc
 from tzlocal import get_localzone
 from dateutil.parser import isoparse
 
 from craft_ai.errors import CraftAiTimeError
-from craft_ai.timezones import is_timezone, timezone_offset_in_sec
+from craft_ai.timezones import (
+    is_timezone,
+    timezone_from_offset_in_sec,
+    timezone_offset_in_sec,
+)
 
 _EPOCH = datetime(1970, 1, 1, tzinfo=pyutc)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
 
 
 class Time(object):
     """Handles time in a useful way for craft ai's client"""
 
+    __slots__ = (
+        "utc_iso",
+        "day_of_week",
+        "time_of_day",
+        "day_of_month",
+        "month_of_year",
+        "timezone",
+        "timestamp",
+    )
+
     def __init__(self, t=None, timezone=None):
-        def time_from_datetime_timestamp_and_timezone(timestamp, timezone):
-            # Handle when datetime already provides timezone :
-            # datetime(2012, 9, 12, 6, 0, 0, tzinfo=pytz.utc)
-            result = timestamp
-            if (result.tzinfo is None) and (not timezone):
-                # Handle this format :
-                # Time(datetime(2011, 1, 1, 0, 0), timezone=None)
-                raise CraftAiTimeError("You must provide at least one timezone")
-            elif (result.tzinfo is None) and timezone:
-                # Handle this format :
-                # Time(datetime(2011, 1, 1, 0, 0), timezone="+02:00")
-                result = pyutc.localize(result)
-                result = set_timezone(result, timezone)
-            elif (result.tzinfo is not None) and (timezone):
-                # Handle format like :
-                # Time(datetime(2002, 10, 27, 6, 0, 0, tzinfo=utc),timezone="+02:00" )
-                raise CraftAiTimeError(
-                    "You must provide one timezone, but two were provided:"
-                    " in the datetime and in the timezone parameter."
-                )
-            return result
-
-        def time_from_string_timestamp_and_timezone(timestamp, timezone):
-            # Else if t is a string we try to interprete it as an ISO time
-            # string
-            try:
-                # Can't use strptime with %z in Python 2
-                # https://stackoverflow.com/a/23940673
-                result = isoparse(timestamp)
-            except ValueError as e:
-                raise CraftAiTimeError(
-                    """Unable to instantiate Time from given string. {}""".format(
-                        e.__str__()
-                    )
-                )
+        if (
+            isinstance(t, int)
+            and timezone
+            and not isinstance(timezone, tzinfo)
+            and is_timezone(timezone)
+        ):
+            # Handle this type of datetime format : Time(1356998400, timezone="+0100")
+            # without going through any datetime timezone conversion.
+            self._set_from_epoch(t, timezone_offset_in_sec(timezone))
+        else:
+            self._set_from_datetime(_time_from_timestamp_and_timezone(t, timezone))
 
-            if result.tzinfo is None:
-                # Handle format like : Time(t="2017-01-01 00:00:00")
-                if timezone:
-                    # Handle format like : Time(t="2017-01-01 00:00:00", timezone="-03:00")
-                    result = pyutc.localize(result)
-                    result = set_timezone(result, timezone)
-                else:
-                    raise CraftAiTimeError(
-                        "The given datetime string must be tz-aware,"
-                        " or you must provide an explicit timezone."
-                    )
-            else:
-                if timezone:
-                    # Handle format like : Time("2011-04-22 01:00:00+0900", timezone="-03:00")
-                    raise CraftAiTimeError(
-                        "You must provide one timezone, but two were provided:"
-                        " in the datetime string and in the timezone parameter."
-                    )
-            return result
-
-        def set_time_and_timezone(timestamp, timezone):
-            if timestamp is None:
-                # If no initial timestamp is given, the current local time is used
-                _time = datetime.now(get_localzone())
-                # If a timezone is specified we can try to use it
-                if timezone:
-                    # Handle theses cases :   Time(timezone="+01:00") & Time(timezone="CET")
-                    _time = set_timezone(_time, timezone)
-
-            elif isinstance(timestamp, int):
-                # Else if t is an int we try to use it as a given timestamp with
-                # local UTC offset by default .
-                try:
-                    # Handle format like  : Time().timezone
-                    _time = datetime.fromtimestamp(timestamp, get_localzone())
-                except (OverflowError, OSError) as e:
-                    raise CraftAiTimeError(
-                        """Unable to instantiate Time from given timestamp. {}""".format(
-                            e.__str__()
-                        )
-                    )
-                # If a timezone is specified we can try to use it
-                if timezone:
-                    # Handle this type of datetime format : Time(1356998400, timezone="+0100")
-                    _time = set_timezone(_time, timezone)
+    @classmethod
+    def from_epoch(cls, timestamp, offset):
+        """Build a Time instance from a POSIX timestamp and an UTC offset.
 
-            elif isinstance(timestamp, datetime):
-                _time = time_from_datetime_timestamp_and_timezone(timestamp, timezone)
+        :param timestamp: POSIX timestamp, in seconds.
+        :param int offset: UTC offset, in seconds.
 
-            elif isinstance(timestamp, str):
-                _time = time_from_string_timestamp_and_timezone(timestamp, timezone)
+        :rtype: Time.
+        """
+        if not -86400 < offset < 86400:
+            raise CraftAiTimeError(
+                """Unable to instantiate Time with the given UTC offset."""
+                """ {} is not a valid offset in seconds.""".format(offset)
+            )
+        result = cls.__new__(cls)
+        result._set_from_epoch(timestamp, offset)
+        return result
 
-            else:
-                raise CraftAiTimeError(
-                    """Unable to instantiate Time from given timestamp."""
-                    """ It must be integer or string."""
-                )
-            return _time
-
-        def set_timezone(timestamp, timezone):
-            if isinstance(timezone, tzinfo):
-                # If it's already a timezone object, no more work is needed
-                _time = timestamp.astimezone(timezone)
-            elif is_timezone(timezone):
-                # If it's a string, we convert it to a usable timezone object
-                offset = timezone_offset_in_sec(timezone)
-                _time = timestamp.astimezone(tz=dt_timezone(timedelta(seconds=offset)))
-            else:
-                raise CraftAiTimeError(
-                    """Unable to instantiate Time with the given timezone."""
-                    """ {} is neither a string nor a timezone.""".format(timezone)
+    def _set_from_epoch(self, timestamp, offset):
+        try:
+            local_time = _NAIVE_EPOCH + timedelta(seconds=timestamp + offset)
+        except OverflowError as e:
+            raise CraftAiTimeError(
+                """Unable to instantiate Time from given timestamp. {}""".format(
+                    e.__str__()
                 )
-            return _time
+            )
+        timezone = timezone_from_offset_in_sec(offset)
 
-        _time = set_time_and_timezone(t, timezone)
+        self.utc_iso = local_time.isoformat() + timezone
+        self.day_of_week = local_time.weekday()
+        self.time_of_day = (
+            local_time.hour + local_time.minute / 60 + local_time.second / 3600
+        )
+        self.day_of_month = local_time.day
+        self.month_of_year = local_time.month
+        self.timezone = timezone
+        self.timestamp = float(timestamp)
 
+    def _set_from_datetime(self, _time):
         try:
             self.utc_iso = _time.isoformat()
         except ValueError as e:
@@ -143,7 +99,9 @@ class Time(object):
         self.time_of_day = _time.hour + _time.minute / 60 + _time.second / 3600
         self.day_of_month = _time.day
         self.month_of_year = _time.month
-        self.timezone = _time.strftime("%z")[:3] + ":" + _time.strftime("%z")[3:]
+        self.timezone = timezone_from_offset_in_sec(
+            _time.utcoffset() // timedelta(seconds=1)
+        )
         self.timestamp = Time.timestamp_from_datetime(_time)
 
     def to_dict(self):
@@ -181,6 +139,123 @@ class Time(object):
         return (date_time - _EPOCH).total_seconds()
 
 
+@lru_cache(maxsize=None)
+def _get_localzone():
+    return get_localzone()
+
+
+def _time_from_timestamp_and_timezone(timestamp, timezone):
+    if timestamp is None:
+        # If no initial timestamp is given, the current local time is used
+        _time = datetime.now(_get_localzone())
+        # If a timezone is specified we can try to use it
+        if timezone:
+            # Handle theses cases :   Time(timezone="+01:00") & Time(timezone="CET")
+            _time = _set_timezone(_time, timezone)
+
+    elif isinstance(timestamp, int):
+        # Else if t is an int we try to use it as a given timestamp with
+        # local UTC offset by default .
+        try:
+            # Handle format like  : Time().timezone
+            _time = datetime.fromtimestamp(timestamp, _get_localzone())
+        except (OverflowError, OSError) as e:
+            raise CraftAiTimeError(
+                """Unable to instantiate Time from given timestamp. {}""".format(
+                    e.__str__()
+                )
+            )
+        # If a timezone is specified we can try to use it
+        if timezone:
+            # Handle this type of datetime format : Time(1356998400, timezone=pytz.utc)
+            _time = _set_timezone(_time, timezone)
+
+    elif isinstance(timestamp, datetime):
+        _time = _time_from_datetime_and_timezone(timestamp, timezone)
+
+    elif isinstance(timestamp, str):
+        _time = _time_from_string_and_timezone(timestamp, timezone)
+
+    else:
+        raise CraftAiTimeError(
+            """Unable to instantiate Time from given timestamp."""
+            """ It must be integer or string."""
+        )
+    return _time
+
+
+def _time_from_datetime_and_timezone(timestamp, timezone):
+    # Handle when datetime already provides timezone :
+    # datetime(2012, 9, 12, 6, 0, 0, tzinfo=pytz.utc)
+    result = timestamp
+    if (result.tzinfo is None) and (not timezone):
+        # Handle this format :
+        # Time(datetime(2011, 1, 1, 0, 0), timezone=None)
+        raise CraftAiTimeError("You must provide at least one timezone")
+    elif (result.tzinfo is None) and timezone:
+        # Handle this format :
+        # Time(datetime(2011, 1, 1, 0, 0), timezone="+02:00")
+        result = pyutc.localize(result)
+        result = _set_timezone(result, timezone)
+    elif (result.tzinfo is not None) and (timezone):
+        # Handle format like :
+        # Time(datetime(2002, 10, 27, 6, 0, 0, tzinfo=utc),timezone="+02:00" )
+        raise CraftAiTimeError(
+            "You must provide one timezone, but two were provided:"
+            " in the datetime and in the timezone parameter."
+        )
+    return result
+
+
+def _time_from_string_and_timezone(timestamp, timezone):
+    # Else if t is a string we try to interprete it as an ISO time
+    # string
+    try:
+        # Can't use strptime with %z in Python 2
+        # https://stackoverflow.com/a/23940673
+        result = isoparse(timestamp)
+    except ValueError as e:
+        raise CraftAiTimeError(
+            """Unable to instantiate Time from given string. {}""".format(e.__str__())
+        )
+
+    if result.tzinfo is None:
+        # Handle format like : Time(t="2017-01-01 00:00:00")
+        if timezone:
+            # Handle format like : Time(t="2017-01-01 00:00:00", timezone="-03:00")
+            result = pyutc.localize(result)
+            result = _set_timezone(result, timezone)
+        else:
+            raise CraftAiTimeError(
+                "The given datetime string must be tz-aware,"
+                " or you must provide an explicit timezone."
+            )
+    else:
+        if timezone:
+            # Handle format like : Time("2011-04-22 01:00:00+0900", timezone="-03:00")
+            raise CraftAiTimeError(
+                "You must provide one timezone, but two were provided:"
+                " in the datetime string and in the timezone parameter."
+            )
+    return result
+
+
+def _set_timezone(timestamp, timezone):
+    if isinstance(timezone, tzinfo):
+        # If it's already a timezone object, no more work is needed
+        _time = timestamp.astimezone(timezone)
+    elif is_timezone(timezone):
+        # If it's a string, we convert it to a usable timezone object
+        offset = timezone_offset_in_sec(timezone)
+        _time = timestamp.astimezone(tz=_timezone_from_offset(offset))
+    else:
+        raise CraftAiTimeError(
+            """Unable to instantiate Time with the given timezone."""
+            """ {} is neither a string nor a timezone.""".format(timezone)
+        )
+    return _time
+
+
 # pylint: disable=C0103,W0212
 class dt_timezone(tzinfo):
     """
@@ -301,4 +376,11 @@ dt_timezone.min = dt_timezone._create(dt_timezone._minoffset)
 dt_timezone.max = dt_timezone._create(dt_timezone._maxoffset)
 # pylint: enable=C0103,W0212
 
+
+@lru_cache(maxsize=None)
+def _timezone_from_offset(offset):
+    """Return a shared `dt_timezone` instance for the given UTC offset in seconds."""
+    return dt_timezone(timedelta(seconds=offset))
+
+
 # pylint: enable=import-self,ungrouped-imports,wrong-import-order,no-member
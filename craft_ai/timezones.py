@@ -1,4 +1,11 @@
 import re
+import sys
+
+from functools import lru_cache
+
+# Only a handful of distinct timezones are seen in practice while they are parsed
+# once per context, the caches are bounded as any context value can be checked.
+_CACHE_SIZE = 1024
 
 _TIMEZONE_REGEX = re.compile(r"^([+-](2[0-3]|[01][0-9])(:?[0-5][0-9])?|Z)$")
 
@@ -39,14 +46,18 @@ TIMEZONES = {
 def is_timezone(value):
     # Valid time zone range is -12:00 (-720 min) and +14:00 (+840 min)
     # cf. https://en.wikipedia.org/wiki/List_of_UTC_time_offsets
-    if isinstance(value, int) and value <= 840 and value >= -720:
-        return True
-    if not isinstance(value, str):
-        return False
+    if isinstance(value, (int, str)):
+        return _is_timezone(value)
+    return False
+
+
+@lru_cache(maxsize=_CACHE_SIZE, typed=True)
+def _is_timezone(value):
+    if isinstance(value, int):
+        return value <= 840 and value >= -720
     if value in TIMEZONES:
         return True
-    result_reg_exp = _TIMEZONE_REGEX.match(value) is not None
-    return result_reg_exp
+    return _TIMEZONE_REGEX.match(value) is not None
 
 
 def get_timezone_key(configuration):
@@ -57,6 +68,11 @@ def get_timezone_key(configuration):
 
 
 def timezone_offset_in_sec(timezone):
+    return _timezone_offset_in_sec(timezone)
+
+
+@lru_cache(maxsize=_CACHE_SIZE, typed=True)
+def _timezone_offset_in_sec(timezone):
     if isinstance(timezone, int):
         # If the offset belongs to [-15, 15] it is considered to represent hours.
         # This reproduces Moment's utcOffset behaviour.
@@ -79,13 +95,22 @@ def timezone_offset_in_sec(timezone):
 
 def timezone_offset_in_standard_format(timezone):
     if isinstance(timezone, int):
-        sign = "+" if timezone >= 0 else "-"
-        absolute_offset = abs(timezone)
-        if absolute_offset < 16:
-            return "%s%02d:00" % (sign, absolute_offset)
-        return "%s%02d:%02d" % (
-            sign,
-            int(absolute_offset / 60),
-            int(absolute_offset % 60),
-        )
+        return _int_timezone_in_standard_format(timezone)
     return timezone
+
+
+@lru_cache(maxsize=_CACHE_SIZE, typed=True)
+def _int_timezone_in_standard_format(timezone):
+    sign = "+" if timezone >= 0 else "-"
+    absolute_offset = abs(timezone)
+    if absolute_offset < 16:
+        return "%s%02d:00" % (sign, absolute_offset)
+    return "%s%02d:%02d" % (sign, int(absolute_offset / 60), int(absolute_offset % 60))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def timezone_from_offset_in_sec(offset):
+    """Return the canonical "+hh:mm" representation of an UTC offset in seconds."""
+    sign = "+" if offset >= 0 else "-"
+    hours, minutes = divmod(abs(int(offset)) // 60, 60)
+    return sys.intern("%s%02d:%02d" % (sign, hours, minutes))
@@ -0,0 +1,344 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .constants import DEFAULT_DECISION_TREE_VERSION
+from .errors import CraftAiError
+from .interpreter import Interpreter
+
+ENTITY_TYPES = ["agent", "generator"]
+
+
+class _Entry(object):
+    def __init__(self):
+        self.tree = None
+        # The parsed tree, as (configuration, bare tree, interpreter)
+        self.parsed = None
+        self.fetched_at = None
+        self.refresh = None
+        self.last_error = None
+        self.last_error_at = None
+
+
+class DecisionTreeManager(object):
+    """Keep the decision trees of a set of agents and generators up to date.
+
+    The trees are retrieved once then refreshed in the background, periodically once
+    the manager is started and on demand with `refresh`. The last retrieved tree is
+    served while a refresh is running or if it fails.
+
+    :param client: the craft ai client retrieving the trees.
+    :param float refresh_interval: Optional. the number of seconds between the
+    periodic refreshes of the watched trees, no periodic refresh by default.
+    :param on_update: Optional. function called with the entity type, the entity id,
+    the previous and the new tree each time a tree is retrieved.
+    :param version: Optional. version of the trees to get.
+    :param int max_workers: Optional. the number of trees refreshed concurrently, 4
+    by default.
+    """
+
+    def __init__(
+        self,
+        client,
+        refresh_interval=None,
+        on_update=None,
+        version=DEFAULT_DECISION_TREE_VERSION,
+        max_workers=4,
+    ):
+        self._client = client
+        self._refresh_interval = refresh_interval
+        self._on_update = on_update
+        self._version = version
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._executor = None
+        self._scheduler = None
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @staticmethod
+    def _get_key(entity_id, entity_type):
+        if entity_type not in ENTITY_TYPES:
+            raise CraftAiError(
+                """Invalid entity type given, {} should be one of {}.""".format(
+                    entity_type, ", ".join(ENTITY_TYPES)
+                )
+            )
+        return (entity_type, entity_id)
+
+    def _get_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            raise CraftAiError(
+                """The {} '{}' isn't watched by the decision tree manager.""".format(
+                    *key
+                )
+            )
+        return entry
+
+    def _fetch(self, key):
+        entity_type, entity_id = key
+        if entity_type == "agent":
+            return self._client.get_agent_decision_tree(
+                entity_id, version=self._version
+            )
+        return self._client.get_generator_decision_tree(
+            entity_id, version=self._version
+        )
+
+    @staticmethod
+    def _parse(tree):
+        bare_tree, configuration, tree_version = Interpreter._parse_tree(tree)
+        interpreter = Interpreter._compile(
+            configuration, bare_tree, Interpreter._get_interpreter(tree_version)
+        )
+        return configuration, bare_tree, interpreter
+
+    def _swap(self, key, tree):
+        # Invalid trees are rejected before replacing the last one
+        parsed = self._parse(tree)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                # Unwatched while the tree was retrieved, it isn't watched again
+                return
+            previous_tree = entry.tree
+            entry.tree = tree
+            entry.parsed = parsed
+            entry.fetched_at = time.time()
+            entry.last_error = None
+        if self._on_update is not None:
+            self._on_update(key[0], key[1], previous_tree, tree)
+
+    def _refresh(self, key):
+        try:
+            self._swap(key, self._fetch(key))
+        except Exception as err:  # pylint: disable=broad-except
+            # The last retrieved tree is kept, e.g. on a connection error or an
+            # invalid tree, and the next refreshes go on
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.last_error = err
+                    entry.last_error_at = time.time()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+            return self._executor
+
+    def watch(self, entity_id, entity_type="agent"):
+        """Add an agent or a generator to the watched entities.
+
+        Its tree is retrieved on the first call to `get_decision_tree`, or by the
+        next refresh.
+        """
+        key = self._get_key(entity_id, entity_type)
+        with self._lock:
+            self._entries.setdefault(key, _Entry())
+
+    def unwatch(self, entity_id, entity_type="agent"):
+        """Remove an agent or a generator from the watched entities."""
+        key = self._get_key(entity_id, entity_type)
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def watched(self):
+        """The watched entities, as (entity type, entity id) tuples."""
+        with self._lock:
+            return list(self._entries)
+
+    def refresh(self, entity_id=None, entity_type="agent", wait=False):
+        """Refresh the tree of an entity in the background.
+
+        A refresh already running for the entity is not duplicated.
+
+        :param str entity_id: Optional. the entity to refresh, all the watched
+        entities by default.
+        :param str entity_type: Optional. "agent" or "generator", "agent" by default.
+        :param bool wait: Optional. wait for the refreshes to be done, False by
+        default.
+
+        :return: the futures of the refreshes.
+        :rtype: list.
+        """
+        if entity_id is None:
+            keys = self.watched()
+        else:
+            keys = [self._get_key(entity_id, entity_type)]
+            self.watch(entity_id, entity_type)
+
+        executor = self._get_executor()
+        futures = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry.refresh is None or entry.refresh.done():
+                    entry.refresh = executor.submit(self._refresh, key)
+                futures.append(entry.refresh)
+        if wait:
+            for future in futures:
+                future.result()
+        return futures
+
+    def add_agent_operations(self, agent_id, operations):
+        """Add operations to an agent then refresh its tree in the background."""
+        result = self._client.add_agent_operations(agent_id, operations)
+        self.refresh(agent_id, "agent")
+        return result
+
+    def _get_loaded_entry(self, entity_id, entity_type):
+        key = self._get_key(entity_id, entity_type)
+        self.watch(entity_id, entity_type)
+        entry = self._get_entry(key)
+        if entry.tree is None:
+            self._swap(key, self._fetch(key))
+        return entry
+
+    def get_decision_tree(self, entity_id, entity_type="agent"):
+        """Retrieve the last tree of an entity.
+
+        The entity is watched, its tree is retrieved in the foreground if it has
+        never been retrieved.
+
+        :raises CraftAiError: if the tree has never been retrieved and can't be.
+        """
+        return self._get_loaded_entry(entity_id, entity_type).tree
+
+    def warm(
+        self,
+        entity_ids,
+        entity_type="agent",
+        timestamp=None,
+        version=None,
+        max_workers=None,
+    ):
+        """Retrieve and parse the trees of several entities, e.g. at startup.
+
+        The trees are retrieved with `get_agents_decision_trees_bulk` or
+        `get_generators_decision_trees_bulk`, in batches of `operationsChunksSize`
+        entities, and parsed so that the decisions don't have to. The entities are
+        watched, including the ones whose tree can't be retrieved.
+
+        :param list entity_ids: the ids of the entities.
+        :param str entity_type: Optional. "agent" or "generator", "agent" by default.
+        :param int timestamp: Optional. the timestamp of the retrieved trees, the latest
+        trees by default.
+        :param version: Optional. version of the trees to get, the version of the
+        manager by default.
+        :param int max_workers: Optional. the number of batches retrieved
+        concurrently, the batches are retrieved sequentially by default.
+
+        :return: the errors of the entities whose tree can't be retrieved or parsed,
+        by entity id.
+        :rtype: dict.
+        """
+        for entity_id in entity_ids:
+            self.watch(entity_id, entity_type)
+        if entity_type == "agent":
+            get_bulk = self._client.get_agents_decision_trees_bulk
+        else:
+            get_bulk = self._client.get_generators_decision_trees_bulk
+        if version is None:
+            version = self._version
+
+        batch_size = self._client.config["operationsChunksSize"]
+        batches = [
+            [
+                {"id": entity_id}
+                if timestamp is None
+                else {"id": entity_id, "timestamp": timestamp}
+                for entity_id in entity_ids[pos : pos + batch_size]
+            ]
+            for pos in range(0, len(entity_ids), batch_size)
+        ]
+
+        def get_batch(batch):
+            try:
+                return get_bulk(batch, version)
+            except CraftAiError as err:
+                # e.g. all the ids of the batch are invalid, the other batches are kept
+                return [{"id": entity["id"], "error": err} for entity in batch]
+
+        if max_workers is not None and max_workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(get_batch, batches))
+        else:
+            results = [get_batch(batch) for batch in batches]
+
+        errors = {}
+        for batch, batch_results in zip(batches, results):
+            for entity, result in zip(batch, batch_results):
+                entity_id = entity["id"]
+                if "tree" not in result:
+                    errors[entity_id] = result.get("error")
+                    continue
+                try:
+                    self._swap(self._get_key(entity_id, entity_type), result["tree"])
+                except CraftAiError as err:
+                    errors[entity_id] = err
+        return errors
+
+    def get_metadata(self, entity_id, entity_type="agent"):
+        """Retrieve the freshness of the tree of a watched entity.
+
+        :return: the "fetched_at" timestamp of the tree, its "age" in seconds, whether
+        a refresh is "refreshing", the "last_error" of the refreshes since the tree was
+        retrieved and its "last_error_at" timestamp.
+        :rtype: dict.
+        """
+        entry = self._get_entry(self._get_key(entity_id, entity_type))
+        with self._lock:
+            return {
+                "fetched_at": entry.fetched_at,
+                "age": None
+                if entry.fetched_at is None
+                else time.time() - entry.fetched_at,
+                "refreshing": entry.refresh is not None and not entry.refresh.done(),
+                "last_error": entry.last_error,
+                "last_error_at": entry.last_error_at,
+            }
+
+    def decide(self, entity_id, *args, entity_type="agent"):
+        """Take a decision with the last tree of an entity, see `Interpreter.decide`.
+
+        The tree is parsed once, when it is retrieved.
+        """
+        configuration, bare_tree, interpreter = self._get_loaded_entry(
+            entity_id, entity_type
+        ).parsed
+        return Interpreter._decide(configuration, bare_tree, args, interpreter)
+
+    def _schedule(self):
+        while not self._stopped.wait(self._refresh_interval):
+            self.refresh()
+
+    def start(self):
+        """Start the periodic refreshes of the watched trees."""
+        if self._refresh_interval is not None and self._scheduler is None:
+            self._stopped.clear()
+            self._scheduler = threading.Thread(target=self._schedule, daemon=True)
+            self._scheduler.start()
+        return self
+
+    def stop(self):
+        """Stop the periodic refreshes and wait for the running ones."""
+        self._stopped.set()
+        if self._scheduler is not None:
+            self._scheduler.join()
+            self._scheduler = None
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
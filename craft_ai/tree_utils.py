@@ -1,51 +1,24 @@
-from copy import copy
-from .errors import CraftAiError
+import sys
 
+from .errors import CraftAiDecisionError, CraftAiError
 
-def _update_paths(paths, idx):
-    """ add new path build on idx to all paths """
-    if paths:
-        return paths + ["{}-{}".format(paths[-1], idx)]
-    return [str(idx)]
-
-
-def _paths(tree, paths=None):
-    """ return a raw list of all paths in a tree """
-    if paths is None:
-        paths = ["0"]
-    if "children" in tree:
-        current_paths = copy(paths)
-        for i, child in enumerate(tree["children"]):
-            paths.extend(_paths(child, _update_paths(current_paths, i)))
-        return paths
-    return paths
-
-
-def _get_paths(tree):
-    """ return a set of all paths in a tree """
-    return set(_paths(tree))
-
-
-def _is_neighbour(path0, path1):
-    """
-        Boolean function. A neighbour has exactly the same path excepted for the last node
-    """
-    return path0[:-1] == path1[:-1] and path0 != path1
-
-
-def _get_neighbours(paths, decision_path):
-    """
-    Collect all neighbours paths of the given decision path
-    param: paths: paths aggregator
-    param: decision_path: decision path to get neighbours from
-    """
-    split = decision_path.split("-")
-    neighbours = []
-    for step in range(1, len(split) + 1):
-        for path in paths:
-            if _is_neighbour(path, "-".join(split[:step])):
-                neighbours.append(path)
-    return neighbours
+# Keys used to take decisions, the others are stripped by `compact_decision_tree`
+_DECISION_KEYS = {
+    "tree": {"_version", "configuration", "trees"},
+    "node": {
+        "children",
+        "decision_rule",
+        "prediction",
+        "output_values",
+        # v1 trees
+        "predicted_value",
+        "confidence",
+        "standard_deviation",
+    },
+    "decision_rule": {"property", "operator", "operand"},
+    "prediction": {"value", "confidence", "distribution", "nb_samples"},
+    "distribution": {"standard_deviation", "min", "max"},
+}
 
 
 def extract_output_tree(tree, output_property=None):
@@ -84,6 +57,197 @@ def extract_output_tree(tree, output_property=None):
     return trees[output_property]
 
 
+def parse_v2_tree(tree):
+    """
+    Split a v2 decision tree into its bare trees and its configuration.
+
+    This function accepts trees as retrieved from `craft_ai.Client.get_agent_decision_tree`,
+    it is used to translate the trees, e.g. by `craft_ai.generate_decide_source`.
+
+    Parameters:
+        tree: A tree.
+    Returns: a (bare_tree, configuration) tuple, the bare tree being a dict of the
+        root nodes by output property.
+    """
+    # Imported here, the client imports this module without the interpreter
+    from .interpreter import Interpreter
+    from .interpreter_v2 import InterpreterV2
+
+    bare_tree, configuration, tree_version = Interpreter._parse_tree(tree)
+    if Interpreter._get_interpreter(tree_version) is not InterpreterV2:
+        raise CraftAiDecisionError(
+            """Unable to translate the decision tree, only the trees of version"""
+            """ 2.0.0 are supported, got {}.""".format(tree_version)
+        )
+    return bare_tree, configuration
+
+
+def iter_decision_paths(tree, output_property=None, max_depth=None, with_nodes=False):
+    """
+    Lazily enumerate the decision paths of a tree, in preorder.
+
+    This function accepts trees as retrieved from `craft_ai.Client.get_generator_decision_tree`.
+
+    Parameters:
+        tree: A tree.
+        output_property (optional): If provided, the output property for which the tree predicts
+            values, otherwise the first defined tree is used.
+        max_depth (int, optional): positive int, the paths deeper than max_depth aren't
+            enumerated, default is None.
+        with_nodes (bool, optional): yield (decision_path, node) tuples instead of the
+            decision paths, default is False.
+    Yields: e.g. '0', '0-0', '0-1'
+    """
+    if max_depth is not None and max_depth < 0:
+        raise CraftAiError(
+            """Invalid max depth given: {} should be None or a positive integer """.format(
+                max_depth
+            )
+        )
+    stack = [(extract_output_tree(tree, output_property), "0", 1)]
+    while stack:
+        node, path, depth = stack.pop()
+        if max_depth is not None and depth > max_depth:
+            continue
+        yield (path, node) if with_nodes else path
+        children = node.get("children")
+        if children and (max_depth is None or depth < max_depth):
+            prefix = path + "-"
+            for i in range(len(children) - 1, -1, -1):
+                stack.append((children[i], prefix + str(i), depth + 1))
+
+
+class DecisionPathIndex(object):
+    """Index of the nodes of an output tree by decision path.
+
+    The nodes are stored in preorder with their parent and children, so that the
+    lookups run in a time proportional to the size of their result instead of
+    going through all the paths of the tree.
+
+    This class accepts trees as retrieved from
+    `craft_ai.Client.get_generator_decision_tree`.
+
+    Parameters:
+        tree: A tree.
+        output_property (optional): If provided, the output property of the indexed
+            output tree, otherwise the first defined tree is indexed.
+    """
+
+    def __init__(self, tree, output_property=None):
+        self._nodes = []
+        self._paths = []
+        self._parents = []
+        self._children = []
+        self._depths = []
+        self._ids = {}
+
+        parents = []
+        for path, node in iter_decision_paths(tree, output_property, with_nodes=True):
+            node_id = len(self._nodes)
+            # In preorder, the parent is the last ancestor left on the parents stack
+            depth = path.count("-") + 1
+            del parents[depth - 1 :]
+            parent = parents[-1] if parents else -1
+            parents.append(node_id)
+            self._nodes.append(node)
+            self._paths.append(path)
+            self._parents.append(parent)
+            self._children.append([])
+            self._depths.append(depth)
+            self._ids[path] = node_id
+            if parent >= 0:
+                self._children[parent].append(node_id)
+
+        # The subtree of a node is the range [node_id, end[node_id]) of the preorder
+        self._ends = [0] * len(self._nodes)
+        for node_id in range(len(self._nodes) - 1, -1, -1):
+            children = self._children[node_id]
+            self._ends[node_id] = self._ends[children[-1]] if children else node_id + 1
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, decision_path):
+        return decision_path in self._ids
+
+    @property
+    def paths(self):
+        """The decision paths of all the nodes, in preorder."""
+        return list(self._paths)
+
+    def _get_id(self, decision_path):
+        node_id = self._ids.get(decision_path)
+        if node_id is None:
+            raise CraftAiError(
+                """Invalid decision path given. """
+                """{} not found in tree""".format(decision_path)
+            )
+        return node_id
+
+    def node(self, decision_path):
+        """Retrieve the node of a decision path, e.g. "0-2-1"."""
+        return self._nodes[self._get_id(decision_path)]
+
+    def depth(self, decision_path):
+        """Retrieve the depth of a decision path, the root "0" being at depth 1."""
+        return self._depths[self._get_id(decision_path)]
+
+    def children(self, decision_path):
+        """Retrieve the decision paths of the children of a node."""
+        return [
+            self._paths[child_id]
+            for child_id in self._children[self._get_id(decision_path)]
+        ]
+
+    def subtree(self, decision_path):
+        """Retrieve the decision paths of a node and of all its descendants."""
+        node_id = self._get_id(decision_path)
+        return self._paths[node_id : self._ends[node_id]]
+
+    def neighbors(self, decision_path, max_depth=None, include_self=False):
+        """
+        Retrieve the neighbors of a decision path, i.e. the siblings of the node and
+        of each of its ancestors.
+
+        Parameters:
+            decision_path: string tree path eg. "0-2-1".
+            max_depth (int, optional): positive int filter neighbours on their depth,
+                default is None.
+            include_self (bool, optional): include the given decision_path to the
+                neighbours, default is False.
+        """
+        node_id = self._get_id(decision_path)
+        if max_depth is None:
+            max_depth = self._depths[node_id]
+        if max_depth < 0:
+            raise CraftAiError(
+                """Invalid max depth given: {} should be None or a positive integer """.format(
+                    max_depth
+                )
+            )
+
+        ancestors = []
+        ancestor_id = node_id
+        while ancestor_id >= 0:
+            if self._depths[ancestor_id] <= max_depth:
+                ancestors.append(ancestor_id)
+            ancestor_id = self._parents[ancestor_id]
+
+        neighbours = []
+        for ancestor_id in reversed(ancestors):
+            parent_id = self._parents[ancestor_id]
+            if parent_id < 0:
+                continue
+            neighbours.extend(
+                self._paths[sibling_id]
+                for sibling_id in self._children[parent_id]
+                if sibling_id != ancestor_id
+            )
+        if include_self:
+            neighbours.append(decision_path)
+        return neighbours
+
+
 def extract_decision_paths_from_tree(tree):
     """
     Retrieve all the decision paths from a tree.
@@ -94,7 +258,7 @@ def extract_decision_paths_from_tree(tree):
         tree: A tree.
     Returns: e.g. ['0', '0-0', '0-1']
     """
-    return _get_paths(extract_output_tree(tree))
+    return set(iter_decision_paths(tree))
 
 
 def extract_decision_path_neighbors(
@@ -113,24 +277,124 @@ def extract_decision_path_neighbors(
         include_self (bool, optional): include the given decision_path to the neighbours,
             default is False.
     """
-    paths = _get_paths(extract_output_tree(tree))
-    if decision_path not in paths:
-        raise CraftAiError(
-            """Invalid decision path given. """
-            """{} not found in tree""".format(decision_path)
+    return DecisionPathIndex(tree).neighbors(decision_path, max_depth, include_self)
+
+
+class _TreeCompactor(object):
+    def __init__(self, strip_metadata, tuple_distributions):
+        self.strip_metadata = strip_metadata
+        self.tuple_distributions = tuple_distributions
+        self._shared = {}
+
+    def _share(self, value):
+        # Equal numbers, operands and distributions are shared between the nodes,
+        # the key is the representation to keep e.g. 0.0 and -0.0 apart
+        key = (type(value), repr(value))
+        return self._shared.setdefault(key, value)
+
+    def value(self, value, kind=None):
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, float):
+            return self._share(value)
+        if isinstance(value, list):
+            items = [self.value(item) for item in value]
+            if kind == "distribution" and self.tuple_distributions:
+                return self._share(tuple(items))
+            return self._share(items)
+        if isinstance(value, dict):
+            return self.mapping(value, kind)
+        return value
+
+    def mapping(self, value, kind=None):
+        keys = _DECISION_KEYS.get(kind) if self.strip_metadata else None
+        return {
+            sys.intern(key): self.child(key, item, kind)
+            for key, item in value.items()
+            if keys is None or key in keys
+        }
+
+    def child(self, key, item, kind):
+        if kind == "tree" and key == "trees":
+            return {
+                sys.intern(output): self.mapping(tree, "node")
+                for output, tree in item.items()
+            }
+        if kind == "node" and key == "children":
+            return [self.mapping(child, "node") for child in item]
+        if kind == "node" and key in ("decision_rule", "prediction"):
+            return self.value(item, key)
+        if kind == "prediction" and key == "distribution":
+            return self.value(item, "distribution")
+        return self.value(item)
+
+
+def _memory_size(value, seen):
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            _memory_size(key, seen) + _memory_size(item, seen)
+            for key, item in value.items()
         )
+    elif isinstance(value, (list, tuple)):
+        size += sum(_memory_size(item, seen) for item in value)
+    return size
+
+
+def get_decision_tree_memory_size(tree):
+    """
+    Compute the memory used by a tree, in bytes.
+
+    The objects shared between several nodes are only counted once.
+
+    Parameters:
+        tree: A tree.
+    """
+    return _memory_size(tree, set())
+
 
-    dp_depth = len(decision_path.split("-"))
-    neighbours = _get_neighbours(paths, decision_path)
-    if max_depth is None:
-        max_depth = dp_depth
-    if max_depth < 0:
+def compact_decision_tree(
+    tree, strip_metadata=False, tuple_distributions=False, report=False
+):
+    """
+    Compact a decision tree to reduce its memory footprint.
+
+    Keys and string values are interned, and equal numbers and operands are shared
+    between the nodes. The compacted tree takes the same decisions with
+    `craft_ai.Interpreter.decide` and can be used with the other tree utils. Its
+    nodes are shared and must not be modified.
+
+    This function accepts trees as retrieved from `craft_ai.Client.get_agent_decision_tree`.
+
+    Parameters:
+        tree: A tree.
+        strip_metadata (bool, optional): drop the keys that are not used to take
+            decisions, default is False.
+        tuple_distributions (bool, optional): store the classification distributions
+            as tuples, the decisions then hold tuples instead of lists. Default is
+            False.
+        report (bool, optional): also return the memory used by the tree before and
+            after the compaction, default is False.
+    Returns: the compacted tree, or the compacted tree and a dict like
+        {"size_before": 1024, "size_after": 512} if `report` is True.
+    """
+    if not isinstance(tree, dict) or not isinstance(tree.get("trees"), dict):
         raise CraftAiError(
-            """Invalid max depth given: {} should be None or a positive integer """.format(
-                max_depth
-            )
+            """Unable to compact the decision tree, """
+            """the given decision tree format is not valid."""
         )
-    filtered = [n for n in neighbours if len(n.split("-")) <= max_depth]
-    if include_self:
-        filtered.append(decision_path)
-    return filtered
+    compacted_tree = _TreeCompactor(strip_metadata, tuple_distributions).mapping(
+        tree, "tree"
+    )
+    if not report:
+        return compacted_tree
+    return (
+        compacted_tree,
+        {
+            "size_before": get_decision_tree_memory_size(tree),
+            "size_after": get_decision_tree_memory_size(compacted_tree),
+        },
+    )
@@ -0,0 +1,46 @@
+"""Measure the time taken to import craft_ai and its main exports.
+
+Each statement is run in a new interpreter, the median of the runs is reported, e.g.
+
+  $ python scripts/benchmark_import.py --runs 20
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = [
+    "import craft_ai",
+    "from craft_ai import Interpreter",
+    "from craft_ai import Client",
+    "from craft_ai import *",
+    "import craft_ai.pandas",
+]
+
+
+def measure(statement):
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "import time\n"
+            "start = time.perf_counter()\n"
+            "{}\n"
+            "print(time.perf_counter() - start)".format(statement),
+        ]
+    )
+    return float(output.decode("utf-8").split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="runs per statement")
+    args = parser.parse_args()
+
+    for statement in STATEMENTS:
+        durations = [measure(statement) for _ in range(args.runs)]
+        print("{:40} {:8.1f} ms".format(statement, 1000 * statistics.median(durations)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+V2_CONFIGURATION = {
+    "context": {
+        "timezone": {"type": "timezone"},
+        "day_of_week": {"type": "day_of_week"},
+        "time_of_day": {"type": "time_of_day"},
+        "presence": {"type": "enum"},
+        "temperature": {"type": "continuous"},
+        "lightbulbState": {"type": "enum"},
+        "brightness": {"type": "continuous"},
+    },
+    "output": ["lightbulbState", "brightness"],
+    "time_quantum": 600,
+    "learning_period": 108000,
+}
+
+V2_TREE = {
+    "_version": "2.0.0",
+    "configuration": V2_CONFIGURATION,
+    "trees": {
+        "lightbulbState": {
+            "output_values": ["ON", "OFF", "DIM"],
+            "children": [
+                {
+                    "decision_rule": {
+                        "property": "time_of_day",
+                        "operator": "[in[",
+                        "operand": [20, 6],
+                    },
+                    "children": [
+                        {
+                            "decision_rule": {
+                                "property": "presence",
+                                "operator": "in",
+                                "operand": ["home", "garden"],
+                            },
+                            "prediction": {
+                                "value": "ON",
+                                "confidence": 0.9,
+                                "distribution": [0.9, 0.05, 0.05],
+                                "nb_samples": 20,
+                            },
+                        },
+                        {
+                            "decision_rule": {
+                                "property": "presence",
+                                "operator": "in",
+                                "operand": ["away"],
+                            },
+                            "prediction": {
+                                "value": "OFF",
+                                "confidence": 0.8,
+                                "distribution": [0.1, 0.8, 0.1],
+                                "nb_samples": 10,
+                            },
+                        },
+                    ],
+                },
+                {
+                    "decision_rule": {
+                        "property": "time_of_day",
+                        "operator": "[in[",
+                        "operand": [6, 20],
+                    },
+                    "children": [
+                        {
+                            "decision_rule": {
+                                "property": "temperature",
+                                "operator": "<",
+                                "operand": 12.5,
+                            },
+                            "children": [
+                                {
+                                    "decision_rule": {
+                                        "property": "day_of_week",
+                                        "operator": "[in[",
+                                        "operand": [0, 5],
+                                    },
+                                    "prediction": {
+                                        "value": "DIM",
+                                        "confidence": 0.6,
+                                        "distribution": [0.2, 0.2, 0.6],
+                                        "nb_samples": 7,
+                                    },
+                                },
+                                {
+                                    "decision_rule": {
+                                        "property": "day_of_week",
+                                        "operator": "[in[",
+                                        "operand": [5, 0],
+                                    },
+                                    "prediction": {
+                                        "value": "ON",
+                                        "confidence": 0.55,
+                                        "distribution": [0.6, 0.3, 0.1],
+                                        "nb_samples": 5,
+                                    },
+                                },
+                            ],
+                        },
+                        {
+                            "decision_rule": {
+                                "property": "temperature",
+                                "operator": ">=",
+                                "operand": 12.5,
+                            },
+                            "prediction": {
+                                "value": "OFF",
+                                "confidence": 0.9,
+                                "distribution": [0.05, 0.9, 0.05],
+                                "nb_samples": 30,
+                            },
+                        },
+                    ],
+                },
+            ],
+        },
+        "brightness": {
+            "children": [
+                {
+                    "decision_rule": {
+                        "property": "presence",
+                        "operator": "is",
+                        "operand": "home",
+                    },
+                    "prediction": {
+                        "value": 80,
+                        "confidence": 0.8,
+                        "distribution": {
+                            "standard_deviation": 5.0,
+                            "min": 60,
+                            "max": 100,
+                        },
+                        "nb_samples": 20,
+                    },
+                },
+                {
+                    "decision_rule": {
+                        "property": "presence",
+                        "operator": "is",
+                        "operand": "away",
+                    },
+                    "prediction": {
+                        "value": 0.5,
+                        "confidence": 0.95,
+                        "distribution": {
+                            "standard_deviation": 0.5,
+                            "min": 0,
+                            "max": 3,
+                        },
+                        "nb_samples": 15,
+                    },
+                },
+                {
+                    "decision_rule": {
+                        "property": "presence",
+                        "operator": "is",
+                        "operand": "garden",
+                    },
+                    "children": [
+                        {
+                            "decision_rule": {
+                                "property": "temperature",
+                                "operator": "<",
+                                "operand": 20,
+                            },
+                            "prediction": {
+                                "value": 40.25,
+                                "confidence": 0.7,
+                                "distribution": {
+                                    "standard_deviation": 3.5,
+                                    "min": 30,
+                                    "max": 50,
+                                },
+                                "nb_samples": 8,
+                            },
+                        },
+                        {
+                            "decision_rule": {
+                                "property": "temperature",
+                                "operator": ">=",
+                                "operand": 20,
+                            },
+                            "prediction": {
+                                "value": 10,
+                                "confidence": 0.75,
+                                "distribution": {
+                                    "standard_deviation": 2.0,
+                                    "min": 5,
+                                    "max": 15,
+                                },
+                                "nb_samples": 12,
+                            },
+                        },
+                    ],
+                },
+            ]
+        },
+    },
+}
+
+V2_CONTEXT_VALUES = {
+    "timezone": ["+01:00", "+02:00", "-05:00", "CET", 2, -300],
+    "presence": ["home", "garden", "away", "office", None],
+    "temperature": [-3.5, 5, 12.5, 12.49, 19.99, 20, 31],
+}
+
+V1_CONFIGURATION = {
+    "context": {
+        "timezone": {"type": "timezone"},
+        "time_of_day": {"type": "time_of_day"},
+        "presence": {"type": "enum"},
+        "temperature": {"type": "continuous"},
+        "lightbulbState": {"type": "enum"},
+        "brightness": {"type": "continuous"},
+    },
+    "output": ["lightbulbState", "brightness"],
+    "time_quantum": 600,
+    "learning_period": 108000,
+}
+
+V1_TREE = {
+    "_version": "1.1.0",
+    "configuration": V1_CONFIGURATION,
+    "trees": {
+        "lightbulbState": {
+            "children": [
+                {
+                    "decision_rule": {
+                        "property": "time_of_day",
+                        "operator": "[in[",
+                        "operand": [20, 6],
+                    },
+                    "children": [
+                        {
+                            "decision_rule": {
+                                "property": "presence",
+                                "operator": "is",
+                                "operand": "home",
+                            },
+                            "predicted_value": "ON",
+                            "confidence": 0.9,
+                        },
+                        {
+                            "decision_rule": {
+                                "property": "presence",
+                                "operator": "is",
+                                "operand": "away",
+                            },
+                            "predicted_value": "OFF",
+                            "confidence": 0.8,
+                        },
+                        {
+                            "decision_rule": {
+                                "property": "presence",
+                                "operator": "is",
+                                "operand": "garden",
+                            },
+                            "predicted_value": None,
+                        },
+                    ],
+                },
+                {
+                    "decision_rule": {
+                        "property": "time_of_day",
+                        "operator": "[in[",
+                        "operand": [6, 20],
+                    },
+                    "children": [
+                        {
+                            "decision_rule": {
+                                "property": "temperature",
+                                "operator": "<",
+                                "operand": 0,
+                            },
+                            "predicted_value": "ON",
+                        },
+                        {
+                            "decision_rule": {
+                                "property": "temperature",
+                                "operator": "[in[",
+                                "operand": [10, 20],
+                            },
+                            "children": [
+                                {
+                                    "decision_rule": {
+                                        "property": "presence",
+                                        "operator": "is",
+                                        "operand": "home",
+                                    },
+                                    "predicted_value": "DIM",
+                                    "confidence": 0.6,
+                                },
+                                {
+                                    "decision_rule": {
+                                        "property": "presence",
+                                        "operator": "is",
+                                        "operand": "away",
+                                    },
+                                    "predicted_value": "OFF",
+                                    "confidence": 0.7,
+                                },
+                            ],
+                        },
+                        {
+                            "decision_rule": {
+                                "property": "temperature",
+                                "operator": ">=",
+                                "operand": 20,
+                            },
+                            "predicted_value": "OFF",
+                            "confidence": 0.95,
+                        },
+                    ],
+                },
+            ]
+        },
+        "brightness": {
+            "children": [
+                {
+                    "decision_rule": {
+                        "property": "temperature",
+                        "operator": "<",
+                        "operand": 15,
+                    },
+                    "predicted_value": 70,
+                    "confidence": 0.8,
+                    "standard_deviation": 5.5,
+                },
+                {
+                    "decision_rule": {
+                        "property": "temperature",
+                        "operator": ">=",
+                        "operand": 15,
+                    },
+                    "predicted_value": 20.5,
+                    "confidence": 0.6,
+                    "standard_deviation": 2.0,
+                },
+            ]
+        },
+    },
+}
+
+V1_CONTEXT_VALUES = {
+    "timezone": ["+01:00", "-05:00"],
+    "time_of_day": [0, 5.99, 6, 12.5, 19.99, 20, 23.5],
+    "presence": ["home", "away", "garden", "office"],
+    "temperature": [-3.5, 0, 5, 10, 15, 19.99, 20, 31],
+}
@@ -0,0 +1,148 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+
+import craft_ai
+
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+from .utils import generate_token
+
+
+def get_client_url(client):
+    # Run in the workers of a process pool
+    return client._base_url, client._requests_session.headers["Authorization"]
+
+
+class TestClientPickle(unittest.TestCase):
+    def setUp(self):
+        self.client = craft_ai.Client(
+            {
+                "token": generate_token(owner="me", project="my_project"),
+                "proxy": "http://proxy:3128",
+                "operationsChunksSize": 50,
+            }
+        )
+
+    def test_pickle_config(self):
+        session = self.client._requests_session
+        unpickled = pickle.loads(pickle.dumps(self.client))
+
+        self.assertEqual(unpickled.config, self.client.config)
+        self.assertEqual(unpickled._base_url, self.client._base_url)
+        self.assertEqual(unpickled.config["operationsChunksSize"], 50)
+
+        # The session is created again, with the same configuration
+        unpickled_session = unpickled._requests_session
+        self.assertIsNot(unpickled_session, session)
+        self.assertEqual(unpickled_session.headers, session.headers)
+        self.assertEqual(unpickled_session.proxies, {"https": "http://proxy:3128"})
+
+    def test_pickle_history_mirror(self):
+        client = craft_ai.Client(
+            {"token": generate_token(), "contextHistoryMirror": ":memory:"}
+        )
+        unpickled = pickle.loads(pickle.dumps(client))
+        mirror = unpickled.config["contextHistoryMirror"]
+        self.assertIsInstance(mirror, craft_ai.ContextHistoryMirror)
+        self.assertIsNot(mirror, client.config["contextHistoryMirror"])
+        self.assertEqual(mirror.get("agent", "operations"), [])
+
+    def test_config_change_keeps_session(self):
+        session = self.client._requests_session
+        self.client.config = dict(self.client.config, token=generate_token(owner="you"))
+        self.assertIs(self.client._requests_session, session)
+        self.assertEqual(
+            session.headers["Authorization"], "Bearer " + self.client.config["token"]
+        )
+
+    @unittest.skipIf(not hasattr(os, "fork"), "fork is not available")
+    def test_fork(self):
+        session = self.client._requests_session
+        single_flight = self.client._single_flight
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Child process
+            os.close(read_fd)
+            renewed = (
+                self.client._requests_session is not session
+                and self.client._single_flight is not single_flight
+                and self.client._requests_session.headers == session.headers
+            )
+            os.write(write_fd, b"1" if renewed else b"0")
+            os._exit(0)
+        os.close(write_fd)
+        result = os.read(read_fd, 1)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+        self.assertEqual(result, b"1")
+        # The parent process keeps its session
+        self.assertIs(self.client._requests_session, session)
+        self.assertIs(self.client._single_flight, single_flight)
+
+    @unittest.skipIf(not hasattr(os, "fork"), "fork is not available")
+    def test_fork_history_mirror_and_stats(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        client = craft_ai.Client(
+            {
+                "token": generate_token(),
+                "contextHistoryMirror": os.path.join(directory.name, "mirror.sqlite"),
+                "requestStats": True,
+            }
+        )
+        mirror = client.config["contextHistoryMirror"]
+        stats = client.config["requestStats"]
+        mirror.sync(
+            "agent",
+            "operations",
+            lambda agent_id, start: [{"timestamp": 1, "context": {"a": 1}}],
+        )
+        connection = mirror._connection
+        read_fd, write_fd = os.pipe()
+        # Locks held by other threads while forking
+        with mirror._lock, stats._lock:
+            pid = os.fork()
+            if pid == 0:
+                # Child process
+                os.close(read_fd)
+                renewed = False
+                try:
+                    stats.record_poll("get_agent_decision_tree")
+                    renewed = (
+                        len(mirror.get("agent", "operations")) == 1
+                        and mirror._connection is not connection
+                        and stats.to_dict()["polls"] == {"get_agent_decision_tree": 1}
+                    )
+                finally:
+                    os.write(write_fd, b"1" if renewed else b"0")
+                    os._exit(0)
+        os.close(write_fd)
+        result = os.read(read_fd, 1)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+        self.assertEqual(result, b"1")
+        # The parent process keeps its connection
+        self.assertIs(mirror._connection, connection)
+        mirror.close()
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(get_client_url, [self.client] * 3))
+        self.assertEqual(
+            results,
+            [(self.client._base_url, "Bearer " + self.client.config["token"])] * 3,
+        )
+
+    @unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+    def test_pickle_pandas_client(self):
+        client = craft_ai.pandas.Client({"token": generate_token()})
+        unpickled = pickle.loads(pickle.dumps(client))
+        self.assertIsInstance(unpickled, craft_ai.pandas.Client)
+        self.assertEqual(unpickled.config, client.config)
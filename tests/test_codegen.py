@@ -0,0 +1,93 @@
+import copy
+import unittest
+
+from craft_ai import Interpreter, errors
+from craft_ai.codegen import compile_decide, generate_decide_source
+
+from .data.decision_trees import V1_TREE, V2_TREE
+from .test_decide_many import generate_contexts
+
+
+def decide_or_error(decide, *args):
+    try:
+        return decide(*args)
+    except errors.CraftAiError as err:
+        return (type(err), err.message, err.metadata)
+
+
+class TestCodegen(unittest.TestCase):
+    def assert_same_decisions(self, tree, decide, contexts, times):
+        for context, time in zip(contexts, times):
+            expected = decide_or_error(
+                Interpreter.decide, tree, (copy.deepcopy(context), time)
+            )
+            decision = decide_or_error(decide, copy.deepcopy(context), time)
+            self.assertEqual(decision, expected, context)
+
+    def test_generate_decide_source(self):
+        source = generate_decide_source(V2_TREE)
+        self.assertIn("\ndef decide(context):", source)
+        # Operands are inlined and wrap around intervals unrolled
+        self.assertIn(">= 12.5", source)
+        self.assertIn(">= 20 or", source)
+        self.assertNotIn("OPERATORS", source)
+
+    def test_generated_source_is_self_contained(self):
+        tree = copy.deepcopy(V2_TREE)
+        # Null leaf
+        tree["trees"]["lightbulbState"]["children"][1]["children"][1]["prediction"][
+            "value"
+        ] = None
+        namespace = {}
+        exec(generate_decide_source(tree), namespace)  # pylint: disable=exec-used
+
+        def decide(context, time):
+            context = Interpreter._rebuild_context(
+                tree["configuration"], context, time
+            )["context"]
+            return namespace["decide"](context)
+
+        contexts, times = generate_contexts()
+        for context, time in zip(contexts, times):
+            expected = decide_or_error(
+                Interpreter.decide, tree, (copy.deepcopy(context), time)
+            )
+            if not isinstance(expected, tuple):
+                # The rebuilt context is added by `Interpreter.decide`
+                expected.pop("context")
+            self.assertEqual(
+                decide_or_error(decide, copy.deepcopy(context), time), expected
+            )
+
+    def test_compile_decide_matches_interpreter(self):
+        contexts, times = generate_contexts()
+        self.assert_same_decisions(V2_TREE, compile_decide(V2_TREE), contexts, times)
+
+    def test_compile_decide_errors(self):
+        tree = copy.deepcopy(V2_TREE)
+        lightbulb_tree = tree["trees"]["lightbulbState"]
+        # Null leaf
+        lightbulb_tree["children"][1]["children"][1]["prediction"]["value"] = None
+        # Invalid operator
+        tree["trees"]["brightness"]["children"][2]["children"][1]["decision_rule"][
+            "operator"
+        ] = "~"
+        contexts, times = generate_contexts()
+        self.assert_same_decisions(tree, compile_decide(tree), contexts, times)
+
+        decide = compile_decide(tree)
+        self.assertRaises(errors.CraftAiDecisionError, decide, {})
+
+    def test_compile_decide_unhashable_value(self):
+        tree = copy.deepcopy(V2_TREE)
+        tree["configuration"]["context"]["presence"]["type"] = "any"
+        decide = compile_decide(tree)
+        contexts, times = generate_contexts()
+        context = dict(contexts[0], presence=["home"])
+        self.assertEqual(
+            decide_or_error(decide, copy.deepcopy(context), times[0]),
+            decide_or_error(Interpreter.decide, tree, (context, times[0])),
+        )
+
+    def test_compile_decide_v1_tree(self):
+        self.assertRaises(errors.CraftAiDecisionError, compile_decide, V1_TREE)
@@ -0,0 +1,150 @@
+import copy
+import unittest
+
+import craft_ai
+
+from craft_ai import (
+    Interpreter,
+    compact_decision_tree,
+    errors,
+    extract_decision_paths_from_tree,
+    get_decision_tree_memory_size,
+)
+
+from .data.decision_trees import V1_TREE, V2_TREE
+from .test_decide_many import generate_contexts
+from .utils import generate_token
+
+
+def with_metadata(tree):
+    tree = copy.deepcopy(tree)
+    tree["statistics"] = {"nb_operations": 1234}
+
+    def add_metadata(node):
+        node["node_id"] = "node_{}".format(id(node))
+        if "prediction" in node:
+            node["prediction"]["debug"] = [1, 2, 3]
+        for child in node.get("children", []):
+            child["decision_rule"]["comment"] = "rule"
+            add_metadata(child)
+
+    for output_tree in tree["trees"].values():
+        add_metadata(output_tree)
+    return tree
+
+
+class Response(object):
+    def __init__(self, body):
+        self.status_code = 200
+        self.headers = {}
+        self.body = body
+
+    def json(self):
+        return copy.deepcopy(self.body)
+
+
+class BulkTreesSession(object):
+    """Session answering the bulk decision trees without reaching the API"""
+
+    def __init__(self):
+        self.headers = {}
+
+    def post(self, url, headers=None, data=None):
+        return Response(
+            [
+                {"id": "my_agent", "timestamp": 1234, "tree": with_metadata(V1_TREE)},
+                {"id": "other_agent", "status": 404, "message": "Not found"},
+            ]
+        )
+
+
+def decide_or_error(tree, context, time):
+    try:
+        return Interpreter.decide(tree, (copy.deepcopy(context), time))
+    except errors.CraftAiError as err:
+        return (type(err), err.message, err.metadata)
+
+
+class TestCompactDecisionTree(unittest.TestCase):
+    def test_compact_decision_tree(self):
+        for tree in [V1_TREE, V2_TREE]:
+            compacted_tree = compact_decision_tree(tree)
+            self.assertEqual(compacted_tree, tree)
+            self.assertEqual(
+                extract_decision_paths_from_tree(compacted_tree),
+                extract_decision_paths_from_tree(tree),
+            )
+
+        compacted_tree = compact_decision_tree(copy.deepcopy(V2_TREE))
+        first_rule = compacted_tree["trees"]["brightness"]["children"][0][
+            "decision_rule"
+        ]
+        second_rule = compacted_tree["trees"]["brightness"]["children"][1][
+            "decision_rule"
+        ]
+        self.assertIs(first_rule["property"], second_rule["property"])
+        self.assertIs(first_rule["operator"], second_rule["operator"])
+
+    def test_compact_decision_tree_strip_metadata(self):
+        tree = with_metadata(V2_TREE)
+        compacted_tree, report = compact_decision_tree(
+            tree, strip_metadata=True, report=True
+        )
+        self.assertEqual(compacted_tree, V2_TREE)
+        self.assertLess(report["size_after"], report["size_before"])
+        self.assertEqual(report["size_before"], get_decision_tree_memory_size(tree))
+
+        contexts, times = generate_contexts()
+        for context, time in zip(contexts, times):
+            self.assertEqual(
+                decide_or_error(compacted_tree, context, time),
+                decide_or_error(tree, context, time),
+            )
+
+    def test_compact_decision_tree_tuple_distributions(self):
+        compacted_tree = compact_decision_tree(V2_TREE, tuple_distributions=True)
+        contexts, times = generate_contexts()
+        for context, time in zip(contexts, times):
+            decision = decide_or_error(compacted_tree, context, time)
+            expected = decide_or_error(V2_TREE, context, time)
+            if isinstance(expected, dict):
+                for output_decision in decision["output"].values():
+                    if "distribution" in output_decision:
+                        output_decision["distribution"] = list(
+                            output_decision["distribution"]
+                        )
+            self.assertEqual(decision, expected)
+
+    def test_compact_decision_tree_invalid(self):
+        self.assertRaises(errors.CraftAiError, compact_decision_tree, {})
+
+    def test_client_decision_tree_compaction(self):
+        client = craft_ai.Client(
+            {
+                "token": generate_token(),
+                "decisionTreeCompaction": {"strip_metadata": True},
+            }
+        )
+        self.assertEqual(client._compact_decision_tree(with_metadata(V1_TREE)), V1_TREE)
+        client = craft_ai.Client({"token": generate_token()})
+        tree = with_metadata(V1_TREE)
+        self.assertIs(client._compact_decision_tree(tree), tree)
+
+    def test_client_bulk_decision_trees_compaction(self):
+        client = craft_ai.Client(
+            {
+                "token": generate_token(),
+                "decisionTreeCompaction": {"strip_metadata": True},
+            }
+        )
+        client._requests_session = BulkTreesSession()
+        payload = [{"id": "my_agent"}, {"id": "other_agent"}]
+        for get_bulk in [
+            client.get_agents_decision_trees_bulk,
+            client.get_generators_decision_trees_bulk,
+        ]:
+            decision_trees = get_bulk(payload)
+            self.assertEqual(decision_trees[0]["tree"], V1_TREE)
+            self.assertIsInstance(
+                decision_trees[1]["error"], errors.CraftAiNotFoundError
+            )
@@ -0,0 +1,94 @@
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from craft_ai import Interpreter, errors, extract_decision_paths_from_tree
+from craft_ai.compact_tree import CompactTree, load_compact_tree, save_compact_tree
+
+from .data.decision_trees import V1_TREE, V2_TREE
+from .test_decide_many import generate_contexts
+
+
+def decide_or_error(decide, *args):
+    try:
+        return decide(*args)
+    except errors.CraftAiError as err:
+        return (type(err), err.message, err.metadata)
+
+
+class TestCompactTree(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "tree.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        for tree in [V1_TREE, V2_TREE]:
+            compact_tree = CompactTree.from_tree(tree)
+            self.assertEqual(compact_tree.to_dict(), tree)
+            self.assertEqual(
+                CompactTree(compact_tree.to_bytes()).to_dict(), copy.deepcopy(tree)
+            )
+            self.assertLess(
+                len(compact_tree.to_bytes()), len(json.dumps(tree).encode("utf-8"))
+            )
+        self.assertEqual(
+            extract_decision_paths_from_tree(CompactTree.from_tree(V2_TREE).to_dict()),
+            extract_decision_paths_from_tree(V2_TREE),
+        )
+
+    def test_save_load(self):
+        save_compact_tree(V2_TREE, self.path)
+        self.assertEqual(load_compact_tree(self.path).to_dict(), V2_TREE)
+        with load_compact_tree(self.path, mmap_mode=True) as compact_tree:
+            self.assertEqual(compact_tree.to_dict(), V2_TREE)
+            self.assertEqual(compact_tree.outputs, ["lightbulbState", "brightness"])
+            self.assertEqual(compact_tree.configuration, V2_TREE["configuration"])
+
+    def test_decide(self):
+        save_compact_tree(V2_TREE, self.path)
+        contexts, times = generate_contexts()
+        with load_compact_tree(self.path, mmap_mode=True) as compact_tree:
+            for context, time in zip(contexts, times):
+                self.assertEqual(
+                    decide_or_error(compact_tree.decide, copy.deepcopy(context), time),
+                    decide_or_error(
+                        Interpreter.decide, V2_TREE, (copy.deepcopy(context), time)
+                    ),
+                )
+
+    def test_decide_v1(self):
+        compact_tree = CompactTree.from_tree(V1_TREE)
+        context = {
+            "timezone": "+01:00",
+            "time_of_day": 22,
+            "presence": "garden",
+            "temperature": 12,
+        }
+        for presence in ["home", "garden", "office"]:
+            context["presence"] = presence
+            self.assertEqual(
+                decide_or_error(compact_tree.decide, dict(context)),
+                decide_or_error(Interpreter.decide, V1_TREE, (dict(context),)),
+            )
+
+    def test_output_tree(self):
+        compact_tree = CompactTree.from_tree(V2_TREE)
+        output_tree = compact_tree.output_tree("brightness")
+        self.assertEqual(len(output_tree["children"]), 3)
+        self.assertEqual(
+            dict(output_tree["children"][2]["children"][0]["decision_rule"]),
+            V2_TREE["trees"]["brightness"]["children"][2]["children"][0][
+                "decision_rule"
+            ],
+        )
+        self.assertRaises(errors.CraftAiError, compact_tree.output_tree, "foo")
+
+    def test_invalid(self):
+        self.assertRaises(errors.CraftAiError, CompactTree, b"not a tree")
+        self.assertRaises(errors.CraftAiError, CompactTree.from_tree, {"trees": None})
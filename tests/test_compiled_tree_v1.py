@@ -0,0 +1,111 @@
+import copy
+import itertools
+import unittest
+
+from craft_ai import Interpreter, errors
+from craft_ai.interpreter_v1 import InterpreterV1
+
+from .data.decision_trees import V1_CONFIGURATION, V1_TREE, V1_CONTEXT_VALUES
+
+
+def decide_or_error(decide, context):
+    try:
+        return decide(context)
+    except errors.CraftAiError as err:
+        return (type(err), err.message, err.metadata)
+
+
+class TestCompiledTreeV1(unittest.TestCase):
+    def setUp(self):
+        self.bare_tree = V1_TREE["trees"]
+        self.compiled_tree = InterpreterV1.compile(V1_CONFIGURATION, self.bare_tree)
+
+    def assert_same_decisions(self, contexts):
+        for context in contexts:
+            expected = decide_or_error(
+                lambda c: InterpreterV1.decide(V1_CONFIGURATION, self.bare_tree, c),
+                copy.deepcopy(context),
+            )
+            decision = decide_or_error(
+                self.compiled_tree.decide_context, copy.deepcopy(context)
+            )
+            self.assertEqual(decision, expected, context)
+
+    def test_compiled_decide_matches_recursion(self):
+        contexts = [
+            {
+                "timezone": timezone,
+                "time_of_day": time_of_day,
+                "presence": presence,
+                "temperature": temperature,
+            }
+            for timezone, time_of_day, presence, temperature in itertools.product(
+                *V1_CONTEXT_VALUES.values()
+            )
+        ]
+        self.assert_same_decisions(contexts)
+
+    def test_compiled_decide_errors(self):
+        context = {
+            "timezone": "+01:00",
+            "time_of_day": 12,
+            "presence": "home",
+            "temperature": 5,
+        }
+        # No child matches the temperature
+        decision = decide_or_error(self.compiled_tree.decide_context, context)
+        self.assertEqual(decision[0], errors.CraftAiDecisionError)
+        self.assertEqual(
+            decision[2],
+            {
+                "decision_rules": [
+                    {"property": "time_of_day", "operator": "[in[", "operand": [6, 20]}
+                ],
+                "expected_values": [0, [10, 20], 20],
+                "property": "temperature",
+                "value": 5,
+            },
+        )
+        self.assert_same_decisions(
+            [
+                dict(context, presence="office", temperature=12),
+                dict(context, time_of_day=22, presence="garden"),
+                dict(context, time_of_day=None),
+                dict(context, time_of_day=25),
+            ]
+        )
+
+    def test_compiled_decide_invalid_operator(self):
+        bare_tree = copy.deepcopy(self.bare_tree)
+        bare_tree["brightness"]["children"][1]["decision_rule"]["operator"] = "~"
+        compiled_tree = InterpreterV1.compile(V1_CONFIGURATION, bare_tree)
+        for temperature in [5, 25]:
+            context = {
+                "timezone": "+01:00",
+                "time_of_day": 12,
+                "presence": "home",
+                "temperature": temperature,
+            }
+            self.assertEqual(
+                decide_or_error(compiled_tree.decide_context, context),
+                decide_or_error(
+                    lambda c: InterpreterV1.decide(V1_CONFIGURATION, bare_tree, c),
+                    context,
+                ),
+            )
+
+    def test_decide_many_v1(self):
+        contexts = [
+            {"timezone": "+01:00", "time_of_day": 22, "presence": presence}
+            for presence in ["home", "away", "garden"]
+        ]
+        for context, temperature in zip(contexts, [25, 5, 12]):
+            context["temperature"] = temperature
+        decisions = list(Interpreter.decide_many(V1_TREE, copy.deepcopy(contexts)))
+        self.assertEqual(
+            decisions[0], Interpreter.decide(V1_TREE, (copy.deepcopy(contexts[0]),))
+        )
+        self.assertEqual(
+            decisions[1]["output"]["lightbulbState"]["predicted_value"], "OFF"
+        )
+        self.assertIsInstance(decisions[2]["error"], errors.CraftAiDecisionError)
@@ -0,0 +1,78 @@
+import copy
+import itertools
+import unittest
+
+from craft_ai import Interpreter, Time, errors
+
+from .data.decision_trees import V2_TREE, V2_CONTEXT_VALUES
+
+
+def generate_contexts():
+    contexts = []
+    times = []
+    for timezone, presence, temperature in itertools.product(
+        V2_CONTEXT_VALUES["timezone"],
+        V2_CONTEXT_VALUES["presence"],
+        V2_CONTEXT_VALUES["temperature"],
+    ):
+        contexts.append(
+            {"timezone": timezone, "presence": presence, "temperature": temperature}
+        )
+        times.append(Time(1577876400 + 3600 * len(times), timezone))
+    return contexts, times
+
+
+class TestDecideMany(unittest.TestCase):
+    def test_decide_many_matches_decide(self):
+        contexts, times = generate_contexts()
+        decisions = list(
+            Interpreter.decide_many(V2_TREE, copy.deepcopy(contexts), times)
+        )
+        self.assertEqual(len(decisions), len(contexts))
+        for context, time, decision in zip(contexts, times, decisions):
+            try:
+                expected = Interpreter.decide(V2_TREE, (context, time))
+            except errors.CraftAiDecisionError as err:
+                self.assertIsInstance(decision["error"], errors.CraftAiDecisionError)
+                self.assertEqual(decision["error"].message, err.message)
+            else:
+                self.assertEqual(decision, expected)
+
+    def test_decide_many_captures_errors(self):
+        contexts, times = generate_contexts()
+        # Without times, the generated properties are missing
+        decisions = list(Interpreter.decide_many(V2_TREE, contexts[:3]))
+        self.assertEqual(len(decisions), 3)
+        for decision in decisions:
+            self.assertIsInstance(decision["error"], errors.CraftAiDecisionError)
+
+        decisions = list(
+            Interpreter.decide_many(V2_TREE, [contexts[0], {}, contexts[1]], times)
+        )
+        self.assertIn("output", decisions[0])
+        self.assertIsInstance(decisions[1]["error"], errors.CraftAiDecisionError)
+        self.assertIn("output", decisions[2])
+
+    def test_decide_many_invalid_contexts(self):
+        contexts, times = generate_contexts()
+        decisions = list(
+            Interpreter.decide_many(
+                V2_TREE, [contexts[0], None, "context", contexts[3]], times
+            )
+        )
+        self.assertIn("output", decisions[0])
+        self.assertIsInstance(decisions[1]["error"], errors.CraftAiDecisionError)
+        self.assertIsInstance(decisions[2]["error"], errors.CraftAiDecisionError)
+        self.assertIn("output", decisions[3])
+
+    def test_decide_many_missing_times(self):
+        contexts, times = generate_contexts()
+        decisions = Interpreter.decide_many(V2_TREE, contexts[:3], times[:2])
+        self.assertIn("output", next(decisions))
+        self.assertIn("output", next(decisions))
+        self.assertRaises(errors.CraftAiDecisionError, next, decisions)
+
+    def test_decide_many_invalid_tree(self):
+        self.assertRaises(
+            errors.CraftAiDecisionError, Interpreter.decide_many, {"trees": {}}, []
+        )
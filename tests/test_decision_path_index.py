@@ -0,0 +1,128 @@
+import unittest
+
+from craft_ai import (
+    DecisionPathIndex,
+    errors,
+    extract_decision_paths_from_tree,
+    extract_decision_path_neighbors,
+    iter_decision_paths,
+)
+
+from .data.decision_trees import V2_TREE
+
+
+def wide_tree(nb_children):
+    children = [
+        {
+            "decision_rule": {"property": "value", "operator": "is", "operand": i},
+            "children": [{"prediction": {"value": 0}}, {"prediction": {"value": 1}},],
+        }
+        for i in range(nb_children)
+    ]
+    return {"_version": "2.0.0", "trees": {"output": {"children": children}}}
+
+
+def deep_tree(depth):
+    node = {"prediction": {"value": 0}}
+    for _ in range(depth - 1):
+        node = {
+            "children": [
+                {
+                    "decision_rule": {
+                        "property": "value",
+                        "operator": "<",
+                        "operand": 0,
+                    },
+                    "prediction": {"value": 1},
+                },
+                dict(
+                    node,
+                    decision_rule={"property": "value", "operator": ">=", "operand": 0},
+                ),
+            ]
+        }
+    return {"_version": "2.0.0", "trees": {"output": node}}
+
+
+class TestIterDecisionPaths(unittest.TestCase):
+    def test_iter_decision_paths(self):
+        self.assertEqual(
+            list(iter_decision_paths(V2_TREE, "brightness")),
+            ["0", "0-0", "0-1", "0-2", "0-2-0", "0-2-1"],
+        )
+        self.assertEqual(
+            list(iter_decision_paths(V2_TREE, "brightness", max_depth=2)),
+            ["0", "0-0", "0-1", "0-2"],
+        )
+        self.assertEqual(list(iter_decision_paths(V2_TREE, max_depth=0)), [])
+        self.assertRaises(
+            errors.CraftAiError, list, iter_decision_paths(V2_TREE, max_depth=-1)
+        )
+
+    def test_iter_decision_paths_with_nodes(self):
+        brightness_tree = V2_TREE["trees"]["brightness"]
+        paths = dict(iter_decision_paths(V2_TREE, "brightness", with_nodes=True))
+        self.assertIs(paths["0"], brightness_tree)
+        self.assertIs(paths["0-2-0"], brightness_tree["children"][2]["children"][0])
+
+    def test_iter_decision_paths_deep_tree(self):
+        tree = deep_tree(5000)
+        paths = iter_decision_paths(tree)
+        self.assertEqual([next(paths) for _ in range(3)], ["0", "0-0", "0-1"])
+        self.assertEqual(len(extract_decision_paths_from_tree(tree)), 2 * 5000 - 1)
+        self.assertEqual(
+            DecisionPathIndex(tree).depth("-".join(["0"] + ["1"] * 4999)), 5000
+        )
+
+
+class TestDecisionPathIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = DecisionPathIndex(V2_TREE, "brightness")
+
+    def test_paths(self):
+        self.assertEqual(
+            self.index.paths, ["0", "0-0", "0-1", "0-2", "0-2-0", "0-2-1"],
+        )
+        self.assertEqual(len(self.index), 6)
+        self.assertIn("0-2-1", self.index)
+        self.assertNotIn("0-3", self.index)
+        self.assertEqual(
+            extract_decision_paths_from_tree(V2_TREE),
+            set(DecisionPathIndex(V2_TREE).paths),
+        )
+
+    def test_lookups(self):
+        brightness_tree = V2_TREE["trees"]["brightness"]
+        self.assertIs(self.index.node("0"), brightness_tree)
+        self.assertIs(
+            self.index.node("0-2-1"), brightness_tree["children"][2]["children"][1]
+        )
+        self.assertEqual(self.index.depth("0-2-1"), 3)
+        self.assertEqual(self.index.children("0-2"), ["0-2-0", "0-2-1"])
+        self.assertEqual(self.index.children("0-1"), [])
+        self.assertEqual(self.index.subtree("0-2"), ["0-2", "0-2-0", "0-2-1"])
+        self.assertEqual(self.index.subtree("0-0"), ["0-0"])
+        self.assertRaises(errors.CraftAiError, self.index.node, "0-4")
+
+    def test_neighbors(self):
+        self.assertEqual(self.index.neighbors("0-2-1"), ["0-0", "0-1", "0-2-0"])
+        self.assertEqual(self.index.neighbors("0-2-1", max_depth=2), ["0-0", "0-1"])
+        self.assertEqual(
+            self.index.neighbors("0-1", include_self=True), ["0-0", "0-2", "0-1"]
+        )
+        self.assertEqual(self.index.neighbors("0"), [])
+        self.assertRaises(errors.CraftAiError, self.index.neighbors, "0-1", -1)
+        self.assertRaises(errors.CraftAiError, self.index.neighbors, "1-0")
+
+    def test_neighbors_wide_tree(self):
+        # Siblings are compared by path segment, "0-1" and "0-10" aren't siblings
+        # of the same parent prefix
+        tree = wide_tree(12)
+        neighbours = extract_decision_path_neighbors(tree, "0-10-1")
+        self.assertEqual(
+            neighbours, ["0-{}".format(i) for i in range(12) if i != 10] + ["0-10-0"],
+        )
+        self.assertEqual(
+            sorted(extract_decision_path_neighbors(tree, "0-1", include_self=True)),
+            sorted("0-{}".format(i) for i in range(12)),
+        )
@@ -0,0 +1,134 @@
+import unittest
+
+from craft_ai import (
+    ExplanationIndex,
+    Interpreter,
+    errors,
+    format_decision_rules,
+    reduce_decision_rules,
+)
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+from .data.decision_trees import V2_TREE
+from .test_decide_many import generate_contexts
+
+if CRAFTAI_PANDAS_ENABLED:
+    import pandas as pd
+
+    import craft_ai.pandas
+
+
+class TestExplanationIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ExplanationIndex(V2_TREE)
+
+    def test_get(self):
+        entry = self.index.get("brightness", "0-2-1")
+        self.assertEqual(
+            entry["decision_rules"],
+            [
+                {"property": "presence", "operator": "is", "operand": "garden"},
+                {"property": "temperature", "operator": ">=", "operand": 20},
+            ],
+        )
+        self.assertEqual(
+            entry["reduced_decision_rules"],
+            reduce_decision_rules(entry["decision_rules"]),
+        )
+        self.assertEqual(
+            entry["explanation"], "'presence' is garden and 'temperature' >= 20"
+        )
+        self.assertEqual(self.index.get("brightness", "0")["explanation"], "")
+        self.assertRaises(errors.CraftAiError, self.index.get, "brightness", "0-5")
+
+    def test_get_unformattable_rules(self):
+        # The formatters don't handle the v2 'in' operator
+        self.assertRaises(
+            errors.CraftAiError, self.index.get, "lightbulbState", "0-0-0"
+        )
+        self.assertEqual(
+            self.index.get("lightbulbState", "0-1-1")["explanation"],
+            "'time_of_day' in [6, 20[ and 'temperature' >= 12.5",
+        )
+
+    def test_decide_many_explain(self):
+        contexts, times = generate_contexts()
+        decisions = Interpreter.decide_many(V2_TREE, contexts, times, explain=True)
+        for decision in decisions:
+            if "error" in decision:
+                continue
+            output_decision = decision["output"]["brightness"]
+            reduced_rules = reduce_decision_rules(output_decision["decision_rules"])
+            self.assertEqual(output_decision["reduced_decision_rules"], reduced_rules)
+            self.assertEqual(
+                output_decision["explanation"], format_decision_rules(reduced_rules)
+            )
+            output_decision = decision["output"]["lightbulbState"]
+            # Only the leaves below the presence 'in' rules can't be explained
+            if output_decision["decision_path"].startswith("0-0-"):
+                self.assertIsNone(output_decision["explanation"])
+            else:
+                self.assertIsNotNone(output_decision["explanation"])
+
+    def test_decide_many_shared_index(self):
+        contexts, times = generate_contexts()
+        decisions = [
+            decision
+            for decision in Interpreter.decide_many(
+                V2_TREE, contexts, times, explain=self.index
+            )
+            if "error" not in decision
+        ]
+        for decision in decisions:
+            output_decision = decision["output"]["brightness"]
+            self.assertIs(
+                output_decision["reduced_decision_rules"],
+                self.index.get("brightness", output_decision["decision_path"])[
+                    "reduced_decision_rules"
+                ],
+            )
+
+    def test_explain_from_decision_rules(self):
+        # Decisions without decision path, as the ones from v1 trees
+        entry = self.index.explain(
+            "brightness",
+            {
+                "decision_rules": [
+                    {"property": "presence", "operator": "is", "operand": "home"}
+                ]
+            },
+        )
+        self.assertIs(entry, self.index.get("brightness", "0-0"))
+        self.assertEqual(entry["explanation"], "'presence' is home")
+
+
+@unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+class TestPandasExplanations(unittest.TestCase):
+    def test_decide_from_contexts_df_explain(self):
+        contexts_df = pd.DataFrame(
+            {
+                "presence": ["home", "away", "garden", "garden", "home"],
+                "temperature": [5, 12.5, 25, 12, 19],
+            },
+            index=pd.date_range(
+                "2020-01-01T00:00:00", periods=5, freq="7H", tz="Europe/Paris"
+            ),
+        )
+        decisions_df = craft_ai.pandas.Client.decide_from_contexts_df(
+            V2_TREE, contexts_df, explain=True
+        )
+        expected_df = craft_ai.pandas.Client.decide_from_contexts_df(
+            V2_TREE, contexts_df
+        )
+        explanations = decisions_df["brightness_explanation"]
+        self.assertEqual(explanations.dtype.name, "category")
+        self.assertEqual(
+            list(explanations),
+            [
+                format_decision_rules(reduce_decision_rules(rules))
+                for rules in expected_df["brightness_decision_rules"]
+            ],
+        )
+        pd.testing.assert_frame_equal(
+            decisions_df[expected_df.columns], expected_df, check_like=True
+        )
@@ -0,0 +1,175 @@
+import copy
+import json
+import unittest
+
+import craft_ai
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+from .utils import generate_token
+
+if CRAFTAI_PANDAS_ENABLED:
+    import craft_ai.pandas
+
+
+class Response(object):
+    def __init__(self, body, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+        self.body = body
+
+    def json(self):
+        return copy.deepcopy(self.body)
+
+
+class HistorySession(object):
+    """Session answering the agents' history without reaching the API"""
+
+    def __init__(self):
+        self.headers = {}
+        self.requests = []
+        self.operations = []
+        self.states = []
+
+    def get(self, url, params=None):
+        params = params or {}
+        self.requests.append((url.rsplit("/", 1)[-1], params.get("start")))
+        items = self.states if url.endswith("/history") else self.operations
+        return Response(
+            [
+                item
+                for item in items
+                if (params.get("start") is None or item["timestamp"] >= params["start"])
+                and (params.get("end") is None or item["timestamp"] <= params["end"])
+            ]
+        )
+
+    def post(self, url, headers=None, data=None):
+        if url.endswith("/bulk/context"):
+            return Response(
+                [
+                    {"id": agent["id"], "status": 201, "message": "1 operations added"}
+                    for agent in json.loads(data)
+                ],
+                207,
+            )
+        self.operations = sorted(
+            self.operations + json.loads(data), key=lambda item: item["timestamp"]
+        )
+        return Response({"message": "Operations added"}, 201)
+
+    def delete(self, url, headers=None, data=None):
+        self.operations = []
+        if data is not None:
+            # Bulk deletion
+            return Response([{"id": agent["id"]} for agent in json.loads(data)])
+        return Response({"id": url.rsplit("/", 1)[-1]})
+
+
+def operation(timestamp, temperature):
+    return {"timestamp": timestamp, "context": {"temperature": temperature}}
+
+
+class TestContextHistoryMirror(unittest.TestCase):
+    def setUp(self):
+        self.session = HistorySession()
+        self.session.operations = [operation(10, 1), operation(20, 2), operation(30, 3)]
+        self.session.states = [
+            {"timestamp": 10, "sample": {"temperature": 1}},
+            {"timestamp": 20, "sample": {"temperature": 2}},
+        ]
+        self.client = craft_ai.Client(
+            {"token": generate_token(), "contextHistoryMirror": ":memory:"}
+        )
+        self.client._requests_session = self.session
+        self.mirror = self.client.config["contextHistoryMirror"]
+
+    def test_get_agent_operations(self):
+        self.assertEqual(
+            self.client.get_agent_operations("my_agent"), self.session.operations
+        )
+        self.assertEqual(
+            self.client.get_agent_operations("my_agent", 15, 30),
+            self.session.operations[1:],
+        )
+        # Only the operations since the last stored timestamp are retrieved
+        self.assertEqual(self.session.requests, [("context", None), ("context", 30)])
+        self.assertEqual(self.mirror.last_timestamp("my_agent", "operations"), 30)
+
+    def test_incremental_sync(self):
+        self.client.get_agent_operations("my_agent")
+        # Operations added at the last stored timestamp and later
+        self.session.operations += [operation(30, 4), operation(40, 5)]
+        self.assertEqual(
+            self.client.get_agent_operations("my_agent"), self.session.operations
+        )
+        self.assertEqual(self.session.requests[-1], ("context", 30))
+
+    def test_fresh_mirror(self):
+        self.client.config = dict(self.client.config, contextHistoryMaxAge=3600)
+        self.client.get_agent_states("my_agent")
+        self.session.states.append({"timestamp": 30, "sample": {"temperature": 3}})
+        self.assertEqual(len(self.client.get_agent_states("my_agent")), 2)
+        self.assertEqual(self.session.requests, [("history", None)])
+        self.mirror.clear("my_agent")
+        self.assertEqual(len(self.client.get_agent_states("my_agent")), 3)
+
+    def test_add_operations_invalidates(self):
+        self.client.config = dict(self.client.config, contextHistoryMaxAge=3600)
+        self.client.get_agent_operations("my_agent")
+        # Operations added before the last stored timestamp are retrieved too
+        self.client.add_agent_operations(
+            "my_agent", [operation(15, 4), operation(40, 5)]
+        )
+        self.assertEqual(
+            self.mirror.get("my_agent", "operations"), self.session.operations[:1]
+        )
+        self.assertFalse(self.mirror.is_fresh("my_agent", "operations", 3600))
+        self.assertEqual(
+            self.client.get_agent_operations("my_agent"), self.session.operations
+        )
+        self.assertEqual(len(self.session.operations), 5)
+        self.assertEqual(self.session.requests[-1], ("context", 10))
+
+    def test_add_operations_bulk_invalidates(self):
+        self.client.get_agent_operations("my_agent")
+        self.client.get_agent_operations("other_agent")
+        self.client.add_agents_operations_bulk(
+            [
+                {"id": "my_agent", "operations": [operation(25, 4)]},
+                {"id": "other_agent", "operations": [operation(5, 4)]},
+            ]
+        )
+        self.assertEqual(len(self.mirror.get("my_agent", "operations")), 2)
+        self.assertEqual(self.mirror.get("other_agent", "operations"), [])
+
+    def test_delete_agent_clears(self):
+        self.client.get_agent_operations("my_agent")
+        self.client.get_agent_states("my_agent")
+        self.client.delete_agent("my_agent")
+        self.assertEqual(self.mirror.get("my_agent", "operations"), [])
+        self.assertEqual(self.mirror.get("my_agent", "states"), [])
+        self.assertIsNone(self.mirror.last_timestamp("my_agent", "operations"))
+        self.assertEqual(self.client.get_agent_operations("my_agent"), [])
+
+    def test_delete_agents_bulk_clears(self):
+        self.client.get_agent_operations("my_agent")
+        self.client.get_agent_operations("other_agent")
+        self.client.delete_agents_bulk([{"id": "my_agent"}])
+        self.assertEqual(self.mirror.get("my_agent", "operations"), [])
+        self.assertEqual(len(self.mirror.get("other_agent", "operations")), 3)
+
+    def test_invalid_history(self):
+        self.assertRaises(
+            craft_ai.errors.CraftAiError, self.mirror.get, "my_agent", "decisions"
+        )
+
+    @unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+    def test_pandas_get_agent_operations(self):
+        client = craft_ai.pandas.Client(
+            {"token": generate_token(), "contextHistoryMirror": self.mirror}
+        )
+        client._requests_session = self.session
+        operations_df = client.get_agent_operations("my_agent")
+        self.assertEqual(operations_df["temperature"].tolist(), [1, 2, 3])
+        self.assertEqual(client.get_agent_operations("my_agent", 20).shape, (2, 1))
+        self.assertEqual(len(self.session.requests), 2)
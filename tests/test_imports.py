@@ -0,0 +1,52 @@
+import subprocess
+import sys
+import unittest
+
+import craft_ai
+
+
+def get_imported_modules(statement):
+    """Import in a new interpreter, return the modules imported by the statement."""
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "before = set(sys.modules)\n"
+            "{}\n"
+            "print('\\n'.join(set(sys.modules) - before))".format(statement),
+        ]
+    )
+    return set(output.decode("utf-8").split())
+
+
+class TestImports(unittest.TestCase):
+    def test_import_package(self):
+        modules = get_imported_modules("import craft_ai")
+        for module in ["requests", "semver", "dateutil", "pytz", "tzlocal"]:
+            self.assertNotIn(module, modules)
+
+    def test_import_interpreter(self):
+        modules = get_imported_modules("from craft_ai import Interpreter")
+        self.assertIn("craft_ai.interpreter", modules)
+        self.assertNotIn("requests", modules)
+
+    def test_import_client(self):
+        modules = get_imported_modules("from craft_ai import Client")
+        self.assertIn("requests", modules)
+        for module in ["craft_ai.interpreter", "dateutil", "pytz", "tzlocal"]:
+            self.assertNotIn(module, modules)
+
+    def test_import_all(self):
+        namespace = {}
+        exec("from craft_ai import *", namespace)
+        for name in craft_ai.__all__:
+            self.assertIs(namespace[name], getattr(craft_ai, name))
+        self.assertIs(namespace["Client"], craft_ai.client.Client)
+
+    def test_dir(self):
+        self.assertTrue(set(craft_ai.__all__) <= set(dir(craft_ai)))
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            craft_ai.unknown  # pylint: disable=pointless-statement
@@ -0,0 +1,184 @@
+import unittest
+
+import craft_ai
+from craft_ai import OperationsValidator
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+from .utils import generate_token
+
+if CRAFTAI_PANDAS_ENABLED:
+    import numpy as np
+    import pandas as pd
+
+    import craft_ai.pandas
+    from craft_ai.pandas import MISSING_VALUE
+
+CONFIGURATION = {
+    "context": {
+        "timezone": {"type": "timezone"},
+        "day_of_week": {"type": "day_of_week", "is_generated": False},
+        "presence": {"type": "enum"},
+        "temperature": {"type": "continuous"},
+        "lightOn": {"type": "boolean"},
+    },
+    "output": ["presence"],
+    "time_quantum": 100,
+}
+
+
+class OfflineClient(craft_ai.Client):
+    """Client adding the operations without reaching the API"""
+
+    def get_agent(self, agent_id):
+        return {"configuration": CONFIGURATION}
+
+    def _add_agent_operations(self, agent_id, operations):
+        self.sent_operations.extend(operations)
+        return {"added_operations_count": len(operations)}
+
+
+class TestOperationsValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = OperationsValidator(CONFIGURATION)
+
+    def test_validate(self):
+        errors = self.validator.validate(
+            [
+                {"timestamp": 1, "context": {"timezone": "+02:00", "presence": "home"}},
+                {"timestamp": 2, "context": {"presence": 3, "temperature": None}},
+                {"timestamp": 3, "context": {"day_of_week": 7, "lightOn": {}}},
+                {"timestamp": -4, "context": {"timezone": "+25:00", "speed": 3}},
+                {"timestamp": 5, "context": {"lightOn": "true", "temperature": "12"}},
+                "operation",
+            ]
+        )
+        self.assertEqual(
+            [(error["row"], error["property"]) for error in errors],
+            [
+                (1, "presence"),
+                (2, "day_of_week"),
+                (3, None),
+                (3, "timezone"),
+                (3, "speed"),
+                (4, "lightOn"),
+                (4, "temperature"),
+                (5, None),
+            ],
+        )
+
+    def test_check(self):
+        self.validator.check([{"timestamp": 1, "context": {"presence": "home"}}])
+        with self.assertRaises(craft_ai.errors.CraftAiBadRequestError) as context:
+            self.validator.check(
+                [{"timestamp": i, "context": {"presence": i}} for i in range(12)]
+            )
+        self.assertEqual(len(context.exception.metadata["errors"]), 12)
+        self.assertIn("and 2 other error(s)", context.exception.message)
+
+    def test_client_operations_validation(self):
+        client = OfflineClient(
+            {"token": generate_token(), "operationsValidation": True}
+        )
+        client.sent_operations = []
+        self.assertRaises(
+            craft_ai.errors.CraftAiBadRequestError,
+            client.add_agent_operations,
+            "my_agent",
+            [
+                {"timestamp": 1, "context": {"presence": "home"}},
+                {"timestamp": 2, "context": {"presence": False}},
+            ],
+        )
+        self.assertEqual(client.sent_operations, [])
+        client.add_agent_operations(
+            "my_agent", [{"timestamp": 1, "context": {"presence": "home"}}]
+        )
+        self.assertEqual(len(client.sent_operations), 1)
+
+
+@unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+class TestPandasOperationsValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = craft_ai.pandas.OperationsValidator(CONFIGURATION)
+
+    def test_validate_df(self):
+        operations_df = pd.DataFrame(
+            {
+                "timezone": ["+02:00", np.nan, "UTC+3", "+01:00"],
+                "day_of_week": [1, np.nan, 6.5, 6],
+                "presence": ["home", MISSING_VALUE, "away", 2],
+                "temperature": [1.5, 2, np.nan, 3],
+                "lightOn": [True, False, True, False],
+                "speed": [1, 2, 3, 4],
+            },
+            index=pd.date_range("2020-01-01", periods=4, freq="H", tz="UTC"),
+        )
+        errors = self.validator.validate(operations_df)
+        self.assertEqual(
+            [(error["row"], error["property"]) for error in errors],
+            [(None, "speed"), (2, "timezone"), (2, "day_of_week"), (3, "presence")],
+        )
+        self.assertEqual(errors[2]["value"], 6.5)
+        self.assertEqual(
+            self.validator.validate(
+                [{"timestamp": 1, "context": {"temperature": "hot"}}]
+            )[0]["property"],
+            "temperature",
+        )
+
+    def test_validate_numerical_columns(self):
+        operations_df = pd.DataFrame(
+            {
+                "timezone": [120, -800, np.nan],
+                "presence": [1.0, np.nan, np.nan],
+                "lightOn": [1, 0, 1],
+            },
+            index=pd.date_range("2020-01-01", periods=3, freq="H", tz="UTC"),
+        )
+        self.assertEqual(
+            [
+                (error["row"], error["property"])
+                for error in self.validator.validate(operations_df)
+            ],
+            [
+                (0, "presence"),
+                (0, "lightOn"),
+                (1, "timezone"),
+                (1, "lightOn"),
+                (2, "lightOn"),
+            ],
+        )
+
+    def test_numerical_columns_agree_with_interpreter_rules(self):
+        properties = {
+            "timezone": "timezone",
+            "day_of_week": "day_of_week",
+            "day_of_month": "day_of_month",
+            "month_of_year": "month_of_year",
+            "time_of_day": "time_of_day",
+            "temperature": "continuous",
+        }
+        configuration = {
+            "context": {prop: {"type": t} for prop, t in properties.items()},
+            "output": ["temperature"],
+        }
+        validator = craft_ai.pandas.OperationsValidator(configuration)
+        vanilla_validator = OperationsValidator(configuration)
+        index = pd.date_range("2020-01-01", periods=1, freq="H", tz="UTC")
+        for prop in properties:
+            for value in [-900, -720, -1, 0, 1, 6, 7, 12, 13, 23, 24, 31, 32, 840, 841]:
+                for values in [[value], [value + 0.5]]:
+                    self.assertEqual(
+                        validator.validate(pd.DataFrame({prop: values}, index=index)),
+                        vanilla_validator.validate(
+                            [{"timestamp": 1, "context": {prop: values[0]}}]
+                        ),
+                        (prop, values),
+                    )
+        # Unlike the interpreter rules, the integral floats are accepted as integers
+        self.assertEqual(
+            validator.validate(
+                pd.DataFrame({"day_of_week": [6.0, np.nan]}, index=index.repeat(2))
+            ),
+            [],
+        )
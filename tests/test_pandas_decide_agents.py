@@ -0,0 +1,132 @@
+import unittest
+
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+from .data.decision_trees import V1_TREE, V2_TREE
+
+if CRAFTAI_PANDAS_ENABLED:
+    import pandas as pd
+
+    import craft_ai.pandas
+
+    from .utils import generate_token
+
+    TREES = {"store_1": V1_TREE, "store_2": V2_TREE, "store_3": V2_TREE}
+
+    class OfflineClient(craft_ai.Client):
+        """Client answering the decision trees without reaching the API"""
+
+        def get_agents_decision_trees_bulk(self, payload, version=None):
+            self.batches.append([entity["id"] for entity in payload])
+            return [
+                {"id": entity["id"], "tree": TREES[entity["id"]]}
+                if entity["id"] in TREES
+                else {
+                    "id": entity["id"],
+                    "error": craft_ai.errors.CraftAiNotFoundError(
+                        "Agent {} not found".format(entity["id"])
+                    ),
+                }
+                for entity in payload
+            ]
+
+    # The pandas client calls the vanilla client methods through `super`, the
+    # offline implementations must come right after it in the MRO.
+    class TreesClient(craft_ai.pandas.Client, OfflineClient):
+        def __init__(self, cfg):
+            super(TreesClient, self).__init__(cfg)
+            self.batches = []
+
+
+@unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+class TestPandasDecideFromAgentsContextsDf(unittest.TestCase):
+    def setUp(self):
+        self.client = TreesClient(
+            {"token": generate_token(), "operationsChunksSize": 2}
+        )
+        # Agents' rows are interleaved and share the same timestamps
+        index = pd.date_range(
+            "2020-01-01T00:00:00", periods=4, freq="5H", tz="Europe/Paris"
+        )
+        self.contexts_df = pd.DataFrame(
+            {
+                "agent_id": [
+                    "store_1",
+                    "store_2",
+                    "store_3",
+                    "store_4",
+                    "store_1",
+                    "store_2",
+                    "store_1",
+                    "store_3",
+                ],
+                "presence": [
+                    "home",
+                    "away",
+                    "away",
+                    "home",
+                    "home",
+                    "home",
+                    "away",
+                    "home",
+                ],
+                "temperature": [15, 12.5, 25, 12, 16, 19, 22, 11],
+            },
+            index=index.append(index),
+        )
+
+    def check_decisions(self, decisions_df):
+        self.assertEqual(
+            list(decisions_df["agent_id"]), list(self.contexts_df["agent_id"])
+        )
+        self.assertTrue(decisions_df.index.equals(self.contexts_df.index))
+        for agent_id, tree in TREES.items():
+            positions = (self.contexts_df["agent_id"] == agent_id).values
+            expected_df = craft_ai.pandas.Client.decide_from_contexts_df(
+                tree, self.contexts_df[positions].drop(columns="agent_id")
+            )
+            pd.testing.assert_frame_equal(
+                decisions_df[positions][expected_df.columns],
+                expected_df,
+                check_dtype=False,
+            )
+        self.assertEqual(
+            decisions_df[(self.contexts_df["agent_id"] == "store_4").values][
+                "error"
+            ].tolist(),
+            ["Agent store_4 not found"],
+        )
+
+    def test_decide_from_agents_contexts_df(self):
+        decisions_df = self.client.decide_from_agents_contexts_df(self.contexts_df)
+        self.check_decisions(decisions_df)
+        self.assertEqual(
+            self.client.batches, [["store_1", "store_2"], ["store_3", "store_4"]]
+        )
+
+    def test_decide_from_agents_contexts_df_concurrently(self):
+        decisions_df = self.client.decide_from_agents_contexts_df(
+            self.contexts_df, max_workers=2, max_processes=2
+        )
+        self.check_decisions(decisions_df)
+
+    def test_decide_from_agents_contexts_df_missing_column(self):
+        self.assertRaises(
+            craft_ai.errors.CraftAiBadRequestError,
+            self.client.decide_from_agents_contexts_df,
+            self.contexts_df,
+            "store_id",
+        )
+
+    def test_decide_from_agents_contexts_df_missing_agent_ids(self):
+        self.contexts_df["agent_id"] = self.contexts_df["agent_id"].replace(
+            {"store_4": None, "store_3": float("nan")}
+        )
+        decisions_df = self.client.decide_from_agents_contexts_df(self.contexts_df)
+        missing = self.contexts_df["agent_id"].isna().values
+        self.assertEqual(
+            decisions_df[missing]["error"].tolist(),
+            ["The agent id of the row is missing."] * 3,
+        )
+        self.assertTrue(decisions_df[~missing]["error"].isna().all())
+        self.assertEqual(self.client.batches, [["store_1", "store_2"]])
@@ -0,0 +1,99 @@
+import unittest
+
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+if CRAFTAI_PANDAS_ENABLED:
+    import copy
+    import pandas as pd
+
+    import craft_ai.pandas
+
+    from .data import pandas_valid_data
+    from .utils import generate_token
+
+    SIMPLE_AGENT_BOOSTING_CONFIGURATION = (
+        pandas_valid_data.SIMPLE_AGENT_BOOSTING_CONFIGURATION
+    )
+
+    class OfflineClient(craft_ai.Client):
+        """Client answering the boosting decisions without reaching the API"""
+
+        def get_agent(self, agent_id):
+            return {"configuration": SIMPLE_AGENT_BOOSTING_CONFIGURATION}
+
+        def get_generator(self, generator_id):
+            return {"configuration": SIMPLE_AGENT_BOOSTING_CONFIGURATION}
+
+        def _decide(self, payload):
+            self.payloads.append(payload)
+            return [
+                {"output": {"predicted_value": "{:.6f}".format(p["context"]["b"])}}
+                for p in payload
+            ]
+
+        def get_agent_bulk_boosting_decision(self, payload):
+            return self._decide(payload)
+
+        def get_generator_bulk_boosting_decision(self, payload):
+            return self._decide(payload)
+
+    # The pandas client calls the vanilla client methods through `super`, the
+    # offline implementations must come right after it in the MRO.
+    class BoostingClient(craft_ai.pandas.Client, OfflineClient):
+        def __init__(self, cfg):
+            super(BoostingClient, self).__init__(cfg)
+            self.payloads = []
+
+
+@unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+class TestPandasDecideBoosting(unittest.TestCase):
+    def setUp(self):
+        self.client = BoostingClient(
+            {"token": generate_token(), "operationsChunksSize": 70}
+        )
+        self.contexts_df = pandas_valid_data.SIMPLE_AGENT_BOOSTING_DATA.drop(
+            columns=["a"]
+        )
+        self.expected_df = pd.DataFrame(
+            {
+                "a_predicted_value": [
+                    "{:.6f}".format(b) for b in self.contexts_df["b"].tolist()
+                ]
+            },
+            index=self.contexts_df.index,
+        )
+
+    def test_decide_boosting_from_contexts_df(self):
+        decisions_df = self.client.decide_boosting_from_contexts_df(
+            "agent", 0, 1, self.contexts_df
+        )
+        pd.testing.assert_frame_equal(decisions_df, self.expected_df)
+        self.assertEqual(
+            [len(payload) for payload in self.client.payloads], [70, 70, 70, 70, 20]
+        )
+        self.assertEqual(self.client.payloads[0][0]["context"]["e"], "+01:00")
+
+    def test_decide_boosting_from_contexts_df_concurrently(self):
+        decisions_df = self.client.decide_boosting_from_contexts_df(
+            "agent", 0, 1, self.contexts_df, max_workers=3
+        )
+        pd.testing.assert_frame_equal(decisions_df, self.expected_df)
+        self.assertEqual(len(self.client.payloads), 5)
+
+    def test_decide_generator_boosting_from_contexts_df(self):
+        contexts_df = copy.deepcopy(self.contexts_df).drop(columns=["e"])
+        decisions_df = self.client.decide_generator_boosting_from_contexts_df(
+            "generator", 0, 1, contexts_df, max_workers=2
+        )
+        pd.testing.assert_frame_equal(decisions_df, self.expected_df)
+        # The timezone is generated from the DatetimeIndex
+        self.assertEqual(self.client.payloads[0][0]["context"]["e"], "+0100")
+
+    def test_decide_boosting_missing_decisions(self):
+        decide = self.client._decide
+        # The decisions of the last context of each chunk are missing
+        self.client._decide = lambda payload: decide(payload)[:-1]
+        with self.assertRaises(craft_ai.errors.CraftAiDecisionError):
+            self.client.decide_boosting_from_contexts_df(
+                "agent", 0, 1, self.contexts_df, max_workers=2
+            )
@@ -0,0 +1,160 @@
+import copy
+import unittest
+
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+from .data.decision_trees import V1_TREE, V2_TREE
+
+if CRAFTAI_PANDAS_ENABLED:
+    import numpy as np
+    import pandas as pd
+
+    import craft_ai.pandas
+
+TREES = {"store_1": V1_TREE, "store_2": V2_TREE}
+
+
+def contexts_df(with_timezone=False):
+    df = pd.DataFrame(
+        {
+            "presence": ["home", "away", "away", "home", "home", "away"],
+            "temperature": [15, 12.5, 25, 12, 16, 19],
+        },
+        index=pd.date_range(
+            "2020-01-01T00:00:00", periods=6, freq="5H", tz="Europe/Paris"
+        ),
+    )
+    if with_timezone:
+        df["timezone"] = ["-05:00", np.nan, "+02:00", np.nan, np.nan, "+01:00"]
+    return df
+
+
+@unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+class TestPandasDecideTrees(unittest.TestCase):
+    def check_long_layout(self, df):
+        decisions_df = craft_ai.pandas.Client.decide_trees_from_contexts_df(TREES, df)
+        self.assertEqual(len(decisions_df), len(TREES) * len(df))
+        for entity_id, tree in TREES.items():
+            expected_df = craft_ai.pandas.Client.decide_from_contexts_df(tree, df)
+            entity_df = decisions_df[decisions_df["entity_id"] == entity_id]
+            pd.testing.assert_frame_equal(
+                entity_df.drop(columns="entity_id").dropna(axis=1, how="all"),
+                expected_df,
+                check_like=True,
+                # Stacking the trees introduces missing values in the integer columns
+                check_dtype=False,
+            )
+
+    def test_decide_trees_long(self):
+        self.check_long_layout(contexts_df())
+
+    def test_decide_trees_timezone_column(self):
+        self.check_long_layout(contexts_df(with_timezone=True))
+
+    def test_decide_trees_wide(self):
+        df = contexts_df()
+        decisions_df = craft_ai.pandas.Client.decide_trees_from_contexts_df(
+            TREES, df, layout="wide", entity_column="store"
+        )
+        self.assertEqual(decisions_df.columns.names[0], "store")
+        for entity_id, tree in TREES.items():
+            pd.testing.assert_frame_equal(
+                decisions_df[entity_id],
+                craft_ai.pandas.Client.decide_from_contexts_df(tree, df),
+                check_like=True,
+            )
+
+    def test_decide_trees_invalid_layout(self):
+        self.assertRaises(
+            craft_ai.errors.CraftAiError,
+            craft_ai.pandas.Client.decide_trees_from_contexts_df,
+            TREES,
+            contexts_df(),
+            "diagonal",
+        )
+
+    def test_decide_trees_generated_and_given_time(self):
+        # The first tree generates `day_of_week`, the second one reads it from the
+        # contexts, the generated values mustn't leak into the second tree contexts
+        given_tree = copy.deepcopy(V2_TREE)
+        given_tree["configuration"]["context"]["day_of_week"]["is_generated"] = False
+        trees = {"generated": V2_TREE, "given": given_tree}
+        df = pd.DataFrame(
+            {"presence": ["home", "away"], "temperature": [10, 11], "day_of_week": 6},
+            index=pd.date_range(
+                "2020-01-01T10:00:00", periods=2, freq="1H", tz="Europe/Paris"
+            ),
+        )
+        decisions_df = craft_ai.pandas.Client.decide_trees_from_contexts_df(
+            trees, df, layout="wide"
+        )
+        for entity_id, tree in trees.items():
+            pd.testing.assert_frame_equal(
+                decisions_df[entity_id].dropna(axis=1, how="all"),
+                craft_ai.pandas.Client.decide_from_contexts_df(tree, df),
+                check_like=True,
+            )
+        self.assertEqual(
+            decisions_df["given"]["lightbulbState_predicted_value"].tolist(),
+            ["ON", "ON"],
+        )
+        self.assertEqual(
+            decisions_df["generated"]["lightbulbState_predicted_value"].tolist(),
+            ["DIM", "DIM"],
+        )
+
+    def test_decide_trees_no_tree(self):
+        self.assertRaises(
+            craft_ai.errors.CraftAiBadRequestError,
+            craft_ai.pandas.Client.decide_trees_from_contexts_df,
+            {},
+            contexts_df(),
+        )
+
+    def test_decide_tz_naive_without_generated_time(self):
+        # Neither timezone property nor generated time property, the time of the
+        # contexts isn't needed by the interpreter
+        tree = copy.deepcopy(V2_TREE)
+        context = tree["configuration"]["context"]
+        del context["timezone"]
+        context["day_of_week"]["is_generated"] = False
+        context["time_of_day"]["is_generated"] = False
+        df = pd.DataFrame(
+            {
+                "presence": ["home", "away"],
+                "temperature": [10, 11],
+                "day_of_week": [6, 2],
+                "time_of_day": [10, 11],
+            },
+            index=pd.date_range("2020-01-01T10:00:00", periods=2, freq="1H"),
+        )
+        decisions_df = craft_ai.pandas.Interpreter.decide_from_contexts_df(tree, df)
+        self.assertEqual(
+            decisions_df["lightbulbState_predicted_value"].tolist(), ["ON", "DIM"]
+        )
+        decisions_df = craft_ai.pandas.Interpreter.decide_trees_from_contexts_df(
+            {"store": tree}, df
+        )
+        self.assertEqual(
+            decisions_df["lightbulbState_predicted_value"].tolist(), ["ON", "DIM"]
+        )
+
+    def test_decide_tz_naive_with_generated_time(self):
+        df = contexts_df()
+        df.index = df.index.tz_localize(None)
+        self.assertRaises(
+            craft_ai.errors.CraftAiBadRequestError,
+            craft_ai.pandas.Interpreter.decide_from_contexts_df,
+            V2_TREE,
+            df,
+        )
+
+    def test_decide_invalid_timezone(self):
+        df = contexts_df(with_timezone=True)
+        df["timezone"] = "+99:99"
+        self.assertRaises(
+            craft_ai.errors.CraftAiTimeError,
+            craft_ai.pandas.Client.decide_from_contexts_df,
+            V2_TREE,
+            df,
+        )
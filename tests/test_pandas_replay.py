@@ -0,0 +1,90 @@
+import unittest
+
+from craft_ai import Time
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+if CRAFTAI_PANDAS_ENABLED:
+    import numpy as np
+    import pandas as pd
+
+    from craft_ai.pandas import MISSING_VALUE, ContextReplay
+
+CONFIGURATION = {
+    "context": {
+        "timezone": {"type": "timezone"},
+        "time_of_day": {"type": "time_of_day"},
+        "day_of_week": {"type": "day_of_week", "is_generated": False},
+        "presence": {"type": "enum"},
+        "temperature": {"type": "continuous"},
+        "lightbulbState": {"type": "enum"},
+    },
+    "output": ["lightbulbState"],
+    "time_quantum": 100,
+}
+
+OPERATIONS = [
+    {
+        "timestamp": 1000,
+        "context": {"timezone": "+02:00", "presence": "home", "day_of_week": 1},
+    },
+    {"timestamp": 1150, "context": {"temperature": 12, "lightbulbState": "ON"}},
+    {"timestamp": 1150, "context": {"presence": "away"}},
+    {"timestamp": 1320, "context": {"temperature": None, "timezone": "-05:00"}},
+    {"timestamp": 1310, "context": {"lightbulbState": "OFF"}},
+]
+
+
+@unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+class TestContextReplay(unittest.TestCase):
+    def test_states_at(self):
+        replay = ContextReplay(CONFIGURATION, OPERATIONS)
+        states_df = replay.states_at([900, 1000, 1099, 1150, 1200, 1350, 5000])
+        self.assertEqual(list(states_df.columns), list(CONFIGURATION["context"]))
+        self.assertTrue(pd.isna(states_df["presence"].iloc[0]))
+        # Sampled every 100 seconds from the first operation
+        self.assertEqual(
+            states_df["presence"].tolist()[1:],
+            ["home", "home", "home", "away", "away", "away"],
+        )
+        # The operations of 1310 and 1320 are only sampled at 1400
+        self.assertEqual(states_df["lightbulbState"].tolist()[4:], ["ON", "ON", "OFF"])
+        # Missing values are deactivated by default
+        self.assertEqual(states_df["temperature"].tolist()[-1], 12)
+        self.assertEqual(states_df["day_of_week"].tolist()[1:], [1] * 6)
+        self.assertEqual(
+            states_df["time_of_day"].tolist()[-3:],
+            [
+                Time(1200, "+02:00").time_of_day,
+                Time(1350, "+02:00").time_of_day,
+                Time(5000, "-05:00").time_of_day,
+            ],
+        )
+
+    def test_missing_values(self):
+        replay = ContextReplay(
+            dict(CONFIGURATION, deactivate_missing_values=False, time_quantum=1),
+            OPERATIONS,
+        )
+        self.assertIs(replay.states_at([1320])["temperature"].iloc[0], MISSING_VALUE)
+
+    def test_operations_df(self):
+        operations_df = pd.DataFrame(
+            {
+                "presence": ["home", np.nan, "away"],
+                "temperature": [np.nan, 12, MISSING_VALUE],
+                "timezone": ["+01:00", np.nan, np.nan],
+            },
+            index=pd.to_datetime([0, 300, 700], unit="s").tz_localize("UTC"),
+        )
+        replay = ContextReplay(
+            dict(CONFIGURATION, operations_as_events=True), operations_df
+        )
+        index = pd.date_range("1970-01-01 00:05", periods=3, freq="200s", tz="UTC")
+        states_df = replay.states_at(index)
+        self.assertTrue(states_df.index.equals(index))
+        self.assertEqual(states_df["presence"].tolist(), ["home", "home", "away"])
+        self.assertEqual(states_df["temperature"].tolist(), [12, 12, 12])
+        self.assertEqual(
+            states_df["time_of_day"].tolist(),
+            [Time(t, "+01:00").time_of_day for t in [300, 500, 700]],
+        )
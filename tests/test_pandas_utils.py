@@ -0,0 +1,84 @@
+import unittest
+
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+if CRAFTAI_PANDAS_ENABLED:
+    import pandas as pd
+
+    import craft_ai.pandas
+    from craft_ai.pandas.utils import (
+        create_timezone_df,
+        create_timezone_offsets,
+        generate_time_features,
+        get_utc_offsets,
+    )
+
+
+@unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+class TestPandasTimezones(unittest.TestCase):
+    def setUp(self):
+        # Crosses the 2020 daylight saving time change in Europe/Paris
+        self.df = pd.DataFrame(
+            {"a": [0, 1, 2, 3], "tz": ["+03:00", None, "CET", -5]},
+            index=pd.date_range(
+                "2020-03-29T00:00:00", periods=4, freq="H", tz="UTC"
+            ).tz_convert("Europe/Paris"),
+        )
+
+    def test_get_utc_offsets(self):
+        self.assertEqual(list(get_utc_offsets(self.df.index)), [3600, 7200, 7200, 7200])
+
+    def test_create_timezone_df_from_index(self):
+        timezone_df = create_timezone_df(self.df, "timezone")
+        self.assertEqual(
+            list(timezone_df["timezone"]), ["+0100", "+0200", "+0200", "+0200"]
+        )
+        self.assertEqual(
+            list(timezone_df["timezone"]), list(self.df.index.strftime("%z"))
+        )
+
+    def test_create_timezone_df_from_column(self):
+        timezone_df = create_timezone_df(self.df, "tz")
+        self.assertEqual(list(timezone_df["tz"]), ["+03:00", "+03:00", "CET", -5])
+
+    def test_create_timezone_offsets(self):
+        self.assertEqual(
+            list(create_timezone_offsets(self.df)), [3600, 7200, 7200, 7200]
+        )
+        self.assertEqual(
+            list(create_timezone_offsets(self.df, "tz")), [10800, 10800, 3600, -18000],
+        )
+
+    def test_get_utc_offsets_tz_naive(self):
+        self.assertRaises(
+            craft_ai.errors.CraftAiBadRequestError,
+            get_utc_offsets,
+            self.df.index.tz_localize(None),
+        )
+
+    def test_create_timezone_offsets_invalid_timezone(self):
+        df = self.df.copy()
+        df["tz"] = ["+03:00", None, "Mars/Olympus_Mons", -5]
+        self.assertRaises(
+            craft_ai.errors.CraftAiTimeError, create_timezone_offsets, df, "tz"
+        )
+
+    def test_create_timezone_offsets_missing_timezone(self):
+        df = self.df.copy()
+        df["tz"] = [None, craft_ai.pandas.MISSING_VALUE, "CET", None]
+        # The rows without timezone use the offsets of the index
+        self.assertEqual(
+            list(create_timezone_offsets(df, "tz")), [3600, 7200, 3600, 3600]
+        )
+
+    def test_generate_time_features(self):
+        df = self.df.copy()
+        offsets = create_timezone_offsets(df, "tz").tolist()
+        for row, offset in zip(df.itertuples(name=None), offsets):
+            params = {"context_ops": row, "tz_col": "tz"}
+            context = {"tz": row[2] if row[2] is not None else "+03:00"}
+            expected = generate_time_features(params, context).to_dict()
+            params["timezone_offset"] = offset
+            self.assertEqual(
+                generate_time_features(params, context).to_dict(), expected
+            )
@@ -0,0 +1,101 @@
+import copy
+import unittest
+
+from craft_ai import DecisionProfiler, Interpreter, errors
+from craft_ai.pandas import CRAFTAI_PANDAS_ENABLED
+
+from .data.decision_trees import V1_TREE, V2_TREE
+from .test_decide_many import generate_contexts
+
+if CRAFTAI_PANDAS_ENABLED:
+    import pandas as pd
+
+    import craft_ai.pandas
+
+
+class TestDecisionProfiler(unittest.TestCase):
+    def test_decide_many_profiler(self):
+        contexts, times = generate_contexts()
+        profiler = DecisionProfiler(timings=True)
+        decisions = list(
+            Interpreter.decide_many(
+                V2_TREE, copy.deepcopy(contexts), times, profiler=profiler
+            )
+        )
+        statistics = profiler.to_dict()
+
+        valid_decisions = [d for d in decisions if "error" not in d]
+        self.assertEqual(statistics["decisions"], len(valid_decisions))
+        self.assertEqual(
+            sum(statistics["errors"].values()), len(decisions) - len(valid_decisions)
+        )
+        self.assertEqual(statistics["timings"]["calls"], len(decisions))
+
+        brightness = statistics["outputs"]["brightness"]
+        expected_paths = {}
+        expected_fallbacks = {}
+        for decision in valid_decisions:
+            output_decision = decision["output"]["brightness"]
+            path = output_decision["decision_path"]
+            expected_paths[path] = expected_paths.get(path, 0) + 1
+            if output_decision["confidence"] is None:
+                expected_fallbacks[path] = expected_fallbacks.get(path, 0) + 1
+        self.assertEqual(brightness["decision_paths"], expected_paths)
+        self.assertEqual(brightness["fallbacks"], expected_fallbacks)
+        self.assertTrue(expected_fallbacks)
+        self.assertEqual(brightness["node_visits"]["0"], len(valid_decisions))
+        self.assertEqual(
+            brightness["node_visits"]["0-2"],
+            sum(
+                hits
+                for path, hits in expected_paths.items()
+                if path == "0-2" or path.startswith("0-2-")
+            ),
+        )
+
+    def test_decide_profiler_v1(self):
+        profiler = DecisionProfiler()
+        context = {"timezone": "+01:00", "time_of_day": 22, "temperature": 12}
+        for presence in ["home", "away", "away", "garden"]:
+            try:
+                Interpreter.decide(
+                    V1_TREE, (dict(context, presence=presence),), profiler=profiler
+                )
+            except errors.CraftAiDecisionError:
+                pass
+        statistics = profiler.to_dict()
+        self.assertEqual(statistics["decisions"], 3)
+        self.assertEqual(statistics["errors"], {"CraftAiDecisionError": 1})
+        self.assertIsNone(statistics["timings"])
+        self.assertEqual(
+            statistics["outputs"]["lightbulbState"]["decision_paths"],
+            {"0-0-0": 1, "0-0-1": 2},
+        )
+        self.assertEqual(
+            statistics["outputs"]["brightness"]["decision_paths"], {"0-0": 3}
+        )
+
+    @unittest.skipIf(CRAFTAI_PANDAS_ENABLED is False, "pandas is not enabled")
+    def test_decide_from_contexts_df_profiler(self):
+        contexts_df = pd.DataFrame(
+            {
+                "presence": ["home", "away", "garden", "garden", "home"],
+                "temperature": [5, 12.5, 25, 12, 19],
+            },
+            index=pd.date_range(
+                "2020-01-01T00:00:00", periods=5, freq="7H", tz="Europe/Paris"
+            ),
+        )
+        profiler = DecisionProfiler()
+        decisions_df = craft_ai.pandas.Client.decide_from_contexts_df(
+            V2_TREE, contexts_df, profiler=profiler
+        )
+        profile_df = profiler.to_dataframe()
+        brightness_df = profile_df[profile_df["output"] == "brightness"].set_index(
+            "decision_path"
+        )
+        self.assertEqual(brightness_df.loc["0", "visits"], 5)
+        self.assertEqual(
+            dict(brightness_df["decisions"][brightness_df["decisions"] > 0]),
+            dict(decisions_df["brightness_decision_path"].value_counts()),
+        )
@@ -0,0 +1,112 @@
+import copy
+import threading
+import time
+import unittest
+
+import craft_ai
+
+from .data.decision_trees import V2_TREE
+from .utils import generate_token
+
+
+class Response(object):
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return copy.deepcopy(self.body)
+
+
+class SlowSession(object):
+    """Session answering the GET requests after a delay, without reaching the API"""
+
+    def __init__(self, status_code=200, body=None):
+        self.headers = {}
+        self.urls = []
+        self.status_code = status_code
+        self.body = body
+
+    def get(self, url):
+        self.urls.append(url)
+        time.sleep(0.1)
+        return Response(self.status_code, self.body)
+
+
+def call_concurrently(function, args_list):
+    results = [None] * len(args_list)
+
+    def call(i):
+        try:
+            results[i] = function(*args_list[i])
+        except craft_ai.errors.CraftAiError as err:
+            results[i] = err
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(args_list))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestRequestCoalescing(unittest.TestCase):
+    def create_client(self, session, **cfg):
+        client = craft_ai.Client(
+            dict({"requestCoalescing": True}, **cfg, token=generate_token())
+        )
+        client._requests_session = session
+        return client
+
+    def test_coalesce_decision_tree_requests(self):
+        session = SlowSession(body=V2_TREE)
+        client = self.create_client(session)
+        trees = call_concurrently(
+            client.get_agent_decision_tree, [("my_agent", 1234)] * 10
+        )
+        self.assertEqual(len(session.urls), 1)
+        self.assertEqual(trees[0], V2_TREE)
+        for tree in trees:
+            self.assertIs(tree, trees[0])
+
+        # Requests with different parameters aren't shared
+        call_concurrently(
+            client.get_agent_decision_tree,
+            [("my_agent", 1234), ("my_agent", 1235), ("other_agent", 1234)],
+        )
+        self.assertEqual(len(session.urls), 4)
+
+    def test_coalesce_agent_state_requests(self):
+        session = SlowSession(body={"sample": {"presence": "home"}})
+        client = self.create_client(session)
+        states = call_concurrently(client.get_agent_state, [("my_agent", 1234)] * 5)
+        self.assertEqual(len(session.urls), 1)
+        self.assertEqual(states, [{"sample": {"presence": "home"}}] * 5)
+
+    def test_coalesce_errors(self):
+        session = SlowSession(status_code=404, body={"message": "Not found"})
+        client = self.create_client(session, decisionTreeRetrievalTimeout=False)
+        errors = call_concurrently(
+            client.get_generator_decision_tree, [("my_generator", 1234)] * 5
+        )
+        self.assertEqual(len(session.urls), 1)
+        for error in errors:
+            self.assertIsInstance(error, craft_ai.errors.CraftAiNotFoundError)
+
+    def test_disabled_coalescing(self):
+        session = SlowSession(body=V2_TREE)
+        client = self.create_client(session, requestCoalescing=False)
+        call_concurrently(client.get_agent_decision_tree, [("my_agent", 1234)] * 3)
+        self.assertEqual(len(session.urls), 3)
+
+    def test_disabled_by_default(self):
+        session = SlowSession(body=V2_TREE)
+        client = craft_ai.Client({"token": generate_token()})
+        client._requests_session = session
+        self.assertFalse(client.config["requestCoalescing"])
+        trees = call_concurrently(
+            client.get_agent_decision_tree, [("my_agent", 1234)] * 3
+        )
+        self.assertEqual(len(session.urls), 3)
+        # Each caller can modify its own tree
+        self.assertIsNot(trees[0], trees[1])
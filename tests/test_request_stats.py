@@ -0,0 +1,151 @@
+import json
+import pickle
+import unittest
+
+import craft_ai
+
+from craft_ai.request_stats import get_endpoint
+
+from .data.decision_trees import V2_TREE
+from .utils import generate_token
+
+
+class Response(object):
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ScriptedSession(object):
+    """Session answering the requests with the given responses, in order"""
+
+    def __init__(self, responses):
+        self.headers = {}
+        self.responses = list(responses)
+
+    def request(self, url, **kwargs):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    get = post = delete = request
+
+
+class TestRequestStats(unittest.TestCase):
+    def setUp(self):
+        self.stats = craft_ai.RequestStats()
+        self.client = craft_ai.Client(
+            {"token": generate_token(), "requestStats": self.stats}
+        )
+
+    def test_get_endpoint(self):
+        base_url = self.client._base_url
+        self.assertEqual(
+            get_endpoint("get", base_url + "/agents/my_agent/decision/tree?t=10"),
+            "GET /agents/{id}/decision/tree",
+        )
+        self.assertEqual(
+            get_endpoint("post", base_url + "/agents/my_agent/context"),
+            "POST /agents/{id}/context",
+        )
+        self.assertEqual(get_endpoint("post", base_url + "/agents"), "POST /agents")
+        self.assertEqual(
+            get_endpoint("post", base_url + "/bulk/generators/tree"),
+            "POST /bulk/generators/tree",
+        )
+
+    def test_record_requests(self):
+        self.client._requests_session = ScriptedSession(
+            [Response(200, V2_TREE), Response(404, {"message": "Not found"})]
+        )
+        self.client.get_agent_decision_tree("my_agent")
+        with self.assertRaises(craft_ai.errors.CraftAiNotFoundError):
+            self.client.get_agent_decision_tree("other_agent")
+
+        statistics = self.stats.to_dict()
+        endpoint = statistics["endpoints"]["GET /agents/{id}/decision/tree"]
+        self.assertEqual(endpoint["requests"], 2)
+        self.assertEqual(endpoint["status_codes"], {200: 1, 404: 1})
+        self.assertEqual(endpoint["errors"], {"CraftAiNotFoundError": 1})
+        self.assertEqual(endpoint["request_bytes"], 0)
+        self.assertEqual(
+            endpoint["response_bytes"],
+            len(json.dumps(V2_TREE)) + len(json.dumps({"message": "Not found"})),
+        )
+        self.assertEqual(endpoint["latency"]["count"], 2)
+        self.assertEqual(sum(endpoint["latency"]["histogram"].values()), 2)
+        self.assertEqual(statistics["json"]["decode"]["count"], 2)
+
+    def test_record_polls(self):
+        self.client._requests_session = ScriptedSession(
+            [
+                Response(202, {"message": "Computing"}),
+                Response(202, {"message": "Computing"}),
+                Response(200, V2_TREE),
+            ]
+        )
+        self.client.get_agent_decision_tree("my_agent")
+
+        statistics = self.stats.to_dict()
+        self.assertEqual(statistics["polls"], {"get_agent_decision_tree": 2})
+        endpoint = statistics["endpoints"]["GET /agents/{id}/decision/tree"]
+        self.assertEqual(endpoint["requests"], 3)
+        self.assertEqual(endpoint["errors"], {"CraftAiLongRequestTimeOutError": 2})
+
+    def test_record_payload(self):
+        self.client._requests_session = ScriptedSession(
+            [Response(201, {"message": "ok"})]
+        )
+        operations = [{"timestamp": 1, "context": {"temperature": 20}}]
+        self.client.add_agent_operations("my_agent", operations)
+
+        statistics = self.stats.to_dict()
+        endpoint = statistics["endpoints"]["POST /agents/{id}/context"]
+        self.assertEqual(endpoint["request_bytes"], len(json.dumps(operations)))
+        self.assertEqual(statistics["json"]["encode"]["count"], 1)
+        self.assertEqual(
+            statistics["json"]["encode"]["bytes"], len(json.dumps(operations))
+        )
+
+    def test_on_request(self):
+        records = []
+        client = craft_ai.Client(
+            {
+                "token": generate_token(),
+                "requestStats": craft_ai.RequestStats(on_request=records.append),
+            }
+        )
+        client._requests_session = ScriptedSession([ConnectionError("unreachable")])
+        with self.assertRaises(ConnectionError):
+            client.get_agent("my_agent")
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["endpoint"], "GET /agents/{id}")
+        self.assertEqual(records[0]["error"], "ConnectionError")
+        self.assertIsNone(records[0]["status_code"])
+
+    def test_disabled(self):
+        client = craft_ai.Client({"token": generate_token()})
+        self.assertIsNone(client.config["requestStats"])
+        client = craft_ai.Client({"token": generate_token(), "requestStats": True})
+        self.assertIsInstance(client.config["requestStats"], craft_ai.RequestStats)
+
+    def test_reset_and_pickle(self):
+        self.stats.record_poll("get_agent_decision_tree")
+        unpickled = pickle.loads(pickle.dumps(self.stats))
+        self.assertEqual(unpickled.to_dict(), self.stats.to_dict())
+        self.stats.reset()
+        self.assertEqual(self.stats.to_dict()["polls"], {})
+
+    def test_pickle_on_request(self):
+        stats = craft_ai.RequestStats(on_request=lambda record: None)
+        stats.record_poll("get_agent_decision_tree")
+        client = craft_ai.Client({"token": generate_token(), "requestStats": stats})
+        unpickled = pickle.loads(pickle.dumps(client)).config["requestStats"]
+        self.assertIsNone(unpickled.on_request)
+        self.assertEqual(unpickled.to_dict(), stats.to_dict())
+        self.assertIsNotNone(stats.on_request)
@@ -0,0 +1,119 @@
+import copy
+import sqlite3
+import unittest
+
+from craft_ai import Interpreter, errors
+from craft_ai.sql import tree_to_sql
+
+from .data.decision_trees import V1_TREE, V2_TREE
+from .test_decide_many import generate_contexts
+
+COLUMNS = ["time_of_day", "day_of_week", "presence", "temperature"]
+
+
+class TestTreeToSql(unittest.TestCase):
+    def setUp(self):
+        contexts, times = generate_contexts()
+        self.rows = []
+        self.decisions = []
+        for context, time in zip(contexts, times):
+            try:
+                decision = Interpreter.decide(V2_TREE, (copy.deepcopy(context), time))
+            except errors.CraftAiDecisionError:
+                continue
+            self.decisions.append(decision)
+            self.rows.append(tuple(decision["context"][c] for c in COLUMNS))
+
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute(
+            "CREATE TABLE contexts (time_of_day REAL, day_of_week INTEGER, "
+            "presence TEXT, temperature REAL)"
+        )
+        self.connection.executemany(
+            "INSERT INTO contexts VALUES (?, ?, ?, ?)", self.rows
+        )
+
+    def tearDown(self):
+        self.connection.close()
+
+    def score(self, output):
+        expressions = tree_to_sql(V2_TREE, output, dialect="sqlite")
+        query = "SELECT {}, {}, {} FROM contexts ORDER BY rowid".format(
+            expressions["predicted_value"],
+            expressions["confidence"],
+            expressions["decision_path"],
+        )
+        return self.connection.execute(query).fetchall()
+
+    def test_tree_to_sql_parity(self):
+        self.assertTrue(self.rows)
+        for output in V2_TREE["configuration"]["output"]:
+            scores = self.score(output)
+            self.assertEqual(len(scores), len(self.decisions))
+            for score, decision in zip(scores, self.decisions):
+                output_decision = decision["output"][output]
+                if isinstance(output_decision["predicted_value"], str):
+                    self.assertEqual(score[0], output_decision["predicted_value"])
+                else:
+                    self.assertAlmostEqual(score[0], output_decision["predicted_value"])
+                self.assertEqual(score[1], output_decision["confidence"])
+                self.assertEqual(score[2], output_decision["decision_path"])
+
+    def test_tree_to_sql_wrap_around_interval(self):
+        expressions = tree_to_sql(V2_TREE, "lightbulbState")
+        self.assertIn(
+            '("time_of_day" >= 20 OR "time_of_day" < 6)',
+            expressions["predicted_value"],
+        )
+        self.assertIn(
+            "\"presence\" IN ('home', 'garden')", expressions["predicted_value"]
+        )
+
+    def test_tree_to_sql_dialect(self):
+        expressions = tree_to_sql(
+            V2_TREE, "brightness", dialect="mysql", columns={"presence": "where"}
+        )
+        self.assertIn("`where` = 'home'", expressions["predicted_value"])
+        self.assertRaises(errors.CraftAiError, tree_to_sql, V2_TREE, dialect="foo")
+        self.assertRaises(errors.CraftAiError, tree_to_sql, V2_TREE, "foo")
+        self.assertRaises(errors.CraftAiDecisionError, tree_to_sql, V1_TREE)
+
+    def test_tree_to_sql_invalid_distribution(self):
+        tree = copy.deepcopy(V2_TREE)
+        # The distribution of the root can't be computed anymore
+        del tree["trees"]["brightness"]["children"][0]["prediction"]["distribution"][
+            "standard_deviation"
+        ]
+        expressions = tree_to_sql(tree, "brightness", dialect="sqlite")
+        for expression in expressions.values():
+            self.assertTrue(expression.endswith(" ELSE NULL END"))
+        query = "SELECT {}, {}, {} FROM (SELECT ? AS presence)".format(
+            expressions["predicted_value"],
+            expressions["confidence"],
+            expressions["decision_path"],
+        )
+        self.assertEqual(
+            self.connection.execute(query, ("home",)).fetchall(), [(80, 0.8, "0-0")]
+        )
+        self.assertEqual(
+            self.connection.execute(query, ("none",)).fetchall(), [(None, None, None)]
+        )
+
+    def test_tree_to_sql_empty_in_operand(self):
+        tree = copy.deepcopy(V2_TREE)
+        # The first rule of the "lightbulbState" tree is replaced
+        child = tree["trees"]["lightbulbState"]["children"][0]["children"][0]
+        child["decision_rule"]["operand"] = []
+        expressions = tree_to_sql(tree, "lightbulbState", dialect="sqlite")
+        self.assertNotIn("IN ()", expressions["predicted_value"])
+        self.assertIn("WHEN (1 = 0) THEN", expressions["predicted_value"])
+        scores = self.connection.execute(
+            "SELECT {} FROM contexts ORDER BY rowid".format(
+                expressions["predicted_value"]
+            )
+        ).fetchall()
+        for (score,), decision in zip(scores, self.decisions):
+            expected = Interpreter.decide(tree, [decision["context"]])
+            self.assertEqual(
+                score, expected["output"]["lightbulbState"]["predicted_value"]
+            )
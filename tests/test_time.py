@@ -64,3 +64,15 @@ class TestTime(unittest.TestCase):
         # Invalid UTC offset
         self.assertRaises(CraftAiTimeError, Time, "2011-04-22 01:00:00+0900", -950)
         self.assertRaises(CraftAiTimeError, Time, "2011-04-22 01:00:00+0900", 950)
+
+    def test_from_epoch(self):
+        self.assertEqual(
+            Time.from_epoch(1356998400, 3600).to_dict(),
+            Time(1356998400, timezone="+01:00").to_dict(),
+        )
+        self.assertEqual(
+            Time.from_epoch(1356998400, -34200).to_dict(),
+            Time(1356998400, timezone="-09:30").to_dict(),
+        )
+        self.assertEqual(Time.from_epoch(0, 0).utc_iso, "1970-01-01T00:00:00+00:00")
+        self.assertRaises(CraftAiTimeError, Time.from_epoch, 1356998400, 86400)
@@ -0,0 +1,54 @@
+import unittest
+
+from craft_ai.timezones import (
+    _is_timezone,
+    is_timezone,
+    timezone_from_offset_in_sec,
+    timezone_offset_in_sec,
+    timezone_offset_in_standard_format,
+)
+
+
+class TestTimezones(unittest.TestCase):
+    def test_is_timezone(self):
+        self.assertTrue(is_timezone("+02:00"))
+        self.assertTrue(is_timezone("-0330"))
+        self.assertTrue(is_timezone("CET"))
+        self.assertTrue(is_timezone(120))
+        self.assertTrue(is_timezone(-2))
+        self.assertFalse(is_timezone(950))
+        self.assertFalse(is_timezone("+25:00"))
+        self.assertFalse(is_timezone("Europe/Paris"))
+        # Floats and unhashable values must not be confused with cached ints
+        self.assertFalse(is_timezone(1.0))
+        self.assertFalse(is_timezone({}))
+        self.assertFalse(is_timezone(None))
+
+    def test_is_timezone_bounded_cache(self):
+        for i in range(5000):
+            self.assertFalse(is_timezone("invalid timezone {}".format(i)))
+        self.assertLessEqual(_is_timezone.cache_info().currsize, 1024)
+        self.assertTrue(is_timezone("+02:00"))
+
+    def test_timezone_offset_in_sec(self):
+        self.assertEqual(timezone_offset_in_sec("+02:00"), 7200)
+        self.assertEqual(timezone_offset_in_sec("+0200"), 7200)
+        self.assertEqual(timezone_offset_in_sec("-03"), -10800)
+        self.assertEqual(timezone_offset_in_sec("ACST"), 34200)
+        self.assertEqual(timezone_offset_in_sec(2), 7200)
+        self.assertEqual(timezone_offset_in_sec(-90), -5400)
+        # Cached values are returned on subsequent calls
+        self.assertEqual(timezone_offset_in_sec("+02:00"), 7200)
+
+    def test_timezone_offset_in_standard_format(self):
+        self.assertEqual(timezone_offset_in_standard_format(2), "+02:00")
+        self.assertEqual(timezone_offset_in_standard_format(-90), "-01:30")
+        self.assertEqual(timezone_offset_in_standard_format("CET"), "CET")
+
+    def test_timezone_from_offset_in_sec(self):
+        self.assertEqual(timezone_from_offset_in_sec(7200), "+02:00")
+        self.assertEqual(timezone_from_offset_in_sec(-34200), "-09:30")
+        self.assertEqual(timezone_from_offset_in_sec(0), "+00:00")
+        self.assertIs(
+            timezone_from_offset_in_sec(3600), timezone_from_offset_in_sec(3600)
+        )
@@ -0,0 +1,228 @@
+import threading
+import time
+import unittest
+
+from craft_ai import DecisionTreeManager, errors
+
+from .data.decision_trees import V1_TREE, V2_TREE
+
+
+class OfflineClient(object):
+    """Client answering the decision trees without reaching the API"""
+
+    def __init__(self, trees):
+        self.config = {"operationsChunksSize": 2}
+        self.trees = trees
+        self.requests = []
+        self.bulk_requests = []
+        self.operations = []
+        self.delay = 0
+
+    def _get_tree(self, entity_type, entity_id):
+        self.requests.append((entity_type, entity_id))
+        time.sleep(self.delay)
+        tree = self.trees[entity_id]
+        if isinstance(tree, Exception):
+            raise tree
+        return tree
+
+    def get_agent_decision_tree(self, agent_id, timestamp=None, version=None):
+        return self._get_tree("agent", agent_id)
+
+    def get_generator_decision_tree(self, generator_id, timestamp=None, version=None):
+        return self._get_tree("generator", generator_id)
+
+    def _get_trees_bulk(self, payload):
+        self.bulk_requests.append([entity["id"] for entity in payload])
+        if all(entity["id"] not in self.trees for entity in payload):
+            raise errors.CraftAiBadRequestError("All the ids are invalid")
+        return [
+            {"id": entity["id"], "tree": self.trees[entity["id"]]}
+            if entity["id"] in self.trees
+            else {
+                "id": entity["id"],
+                "error": errors.CraftAiNotFoundError("Not found"),
+            }
+            for entity in payload
+        ]
+
+    def get_agents_decision_trees_bulk(self, payload, version=None):
+        return self._get_trees_bulk(payload)
+
+    def get_generators_decision_trees_bulk(self, payload, version=None):
+        return self._get_trees_bulk(payload)
+
+    def add_agent_operations(self, agent_id, operations):
+        self.operations.append((agent_id, operations))
+        return {"message": "ok"}
+
+
+class TestDecisionTreeManager(unittest.TestCase):
+    def setUp(self):
+        self.client = OfflineClient({"my_agent": V1_TREE, "my_generator": V2_TREE})
+        self.updates = []
+        self.manager = DecisionTreeManager(
+            self.client, on_update=lambda *args: self.updates.append(args),
+        )
+        self.addCleanup(self.manager.stop)
+
+    def test_get_decision_tree(self):
+        self.assertIs(self.manager.get_decision_tree("my_agent"), V1_TREE)
+        self.assertIs(self.manager.get_decision_tree("my_agent"), V1_TREE)
+        self.assertIs(
+            self.manager.get_decision_tree("my_generator", "generator"), V2_TREE
+        )
+        self.assertEqual(
+            self.client.requests, [("agent", "my_agent"), ("generator", "my_generator")]
+        )
+        self.assertEqual(
+            self.updates,
+            [
+                ("agent", "my_agent", None, V1_TREE),
+                ("generator", "my_generator", None, V2_TREE),
+            ],
+        )
+        self.assertEqual(
+            sorted(self.manager.watched()),
+            [("agent", "my_agent"), ("generator", "my_generator")],
+        )
+        self.assertRaises(
+            errors.CraftAiError, self.manager.get_decision_tree, "my_agent", "robot"
+        )
+
+    def test_refresh_serves_last_tree(self):
+        self.manager.get_decision_tree("my_agent")
+        self.client.trees["my_agent"] = V2_TREE
+        self.client.delay = 0.2
+        futures = self.manager.refresh("my_agent")
+        # A refresh already running is shared
+        self.assertEqual(self.manager.refresh("my_agent"), futures)
+        self.assertIs(self.manager.get_decision_tree("my_agent"), V1_TREE)
+        self.assertTrue(self.manager.get_metadata("my_agent")["refreshing"])
+        futures[0].result()
+        self.assertIs(self.manager.get_decision_tree("my_agent"), V2_TREE)
+        self.assertEqual(self.updates[-1], ("agent", "my_agent", V1_TREE, V2_TREE))
+        self.assertEqual(len(self.client.requests), 2)
+
+    def test_refresh_error_keeps_last_tree(self):
+        self.manager.get_decision_tree("my_agent")
+        error = errors.CraftAiInternalError("Server error")
+        self.client.trees["my_agent"] = error
+        self.manager.refresh(wait=True)
+        self.assertIs(self.manager.get_decision_tree("my_agent"), V1_TREE)
+        metadata = self.manager.get_metadata("my_agent")
+        self.assertIs(metadata["last_error"], error)
+        self.assertFalse(metadata["refreshing"])
+        self.assertGreaterEqual(metadata["age"], 0)
+        self.assertRaises(errors.CraftAiError, self.manager.get_metadata, "other_agent")
+
+    def test_refresh_unexpected_error_keeps_last_tree(self):
+        self.manager.get_decision_tree("my_agent")
+        error = ConnectionError("Connection reset")
+        self.client.trees["my_agent"] = error
+        self.manager.refresh(wait=True)
+        self.assertIs(self.manager.get_decision_tree("my_agent"), V1_TREE)
+        metadata = self.manager.get_metadata("my_agent")
+        self.assertIs(metadata["last_error"], error)
+        self.assertIsNotNone(metadata["last_error_at"])
+
+        # The refreshes go on after an error
+        self.client.trees["my_agent"] = V2_TREE
+        self.manager.refresh(wait=True)
+        self.assertIs(self.manager.get_decision_tree("my_agent"), V2_TREE)
+        self.assertIsNone(self.manager.get_metadata("my_agent")["last_error"])
+
+    def test_unwatch_during_refresh(self):
+        self.manager.get_decision_tree("my_agent")
+        self.client.trees["my_agent"] = V2_TREE
+        self.client.delay = 0.2
+        futures = self.manager.refresh("my_agent")
+        self.manager.unwatch("my_agent")
+        futures[0].result()
+        # The retrieved tree is dropped
+        self.assertEqual(self.manager.watched(), [])
+        self.assertEqual(len(self.updates), 1)
+
+    def test_add_agent_operations(self):
+        self.manager.get_decision_tree("my_agent")
+        self.client.trees["my_agent"] = V2_TREE
+        self.manager.add_agent_operations("my_agent", [])
+        self.manager.stop()
+        self.assertEqual(self.client.operations, [("my_agent", [])])
+        self.assertIs(self.manager.get_decision_tree("my_agent"), V2_TREE)
+
+    def test_periodic_refresh(self):
+        refreshed = threading.Event()
+        manager = DecisionTreeManager(
+            self.client,
+            refresh_interval=0.05,
+            on_update=lambda *args: args[2] is not None and refreshed.set(),
+        )
+        with manager:
+            manager.get_decision_tree("my_generator", "generator")
+            self.assertTrue(refreshed.wait(5))
+        self.assertGreaterEqual(len(self.client.requests), 2)
+
+    def test_decide(self):
+        decision = self.manager.decide(
+            "my_generator",
+            {
+                "presence": "home",
+                "temperature": 10,
+                "timezone": "+01:00",
+                "time_of_day": 10.0,
+                "day_of_week": 2,
+            },
+            entity_type="generator",
+        )
+        self.assertIn("brightness", decision["output"])
+
+    def test_warm(self):
+        self.client.trees.update(
+            {"agent_1": V2_TREE, "agent_2": V1_TREE, "invalid_tree": {"trees": {}}}
+        )
+        entity_ids = [
+            "my_agent",
+            "agent_1",
+            "agent_2",
+            "unknown_agent",
+            "missing_1",
+            "missing_2",
+            "invalid_tree",
+        ]
+        errors_by_id = self.manager.warm(entity_ids, max_workers=2)
+        self.assertEqual(
+            sorted(errors_by_id),
+            ["invalid_tree", "missing_1", "missing_2", "unknown_agent"],
+        )
+        self.assertIsInstance(
+            errors_by_id["unknown_agent"], errors.CraftAiNotFoundError
+        )
+        self.assertIsInstance(errors_by_id["missing_1"], errors.CraftAiBadRequestError)
+        self.assertIsInstance(errors_by_id["invalid_tree"], errors.CraftAiError)
+        self.assertEqual(
+            self.client.bulk_requests,
+            [
+                ["my_agent", "agent_1"],
+                ["agent_2", "unknown_agent"],
+                ["missing_1", "missing_2"],
+                ["invalid_tree"],
+            ],
+        )
+        self.assertEqual(
+            sorted(entity_id for _, entity_id in self.manager.watched()),
+            sorted(entity_ids),
+        )
+        # The warmed trees are served without any other request
+        self.assertIs(self.manager.get_decision_tree("agent_1"), V2_TREE)
+        self.manager.decide(
+            "agent_2",
+            {
+                "presence": "home",
+                "temperature": 15,
+                "timezone": "+01:00",
+                "time_of_day": 10.0,
+                "day_of_week": 2,
+            },
+        )
+        self.assertEqual(self.client.requests, [])
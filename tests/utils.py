@@ -1,3 +1,6 @@
+import json
+
+from base64 import urlsafe_b64encode
 from os import environ
 
 ENTITY_MAX_LEN = 36
@@ -14,3 +17,18 @@ def generate_entity_id(base_name="entity"):
     counter += 1
     counters[base_name] = counter
     return "{}_{:03}_{}".format(base_name, counter, JOB_ID[-3:])
+
+
+def generate_token(owner="owner", project="project", platform="https://beta.craft.ai"):
+    """Generate an unsigned token, enough to instantiate a client offline."""
+
+    def encode(segment):
+        return urlsafe_b64encode(json.dumps(segment).encode("utf-8")).rstrip(b"=")
+
+    return b".".join(
+        [
+            encode({"alg": "HS256", "typ": "JWT"}),
+            encode({"owner": owner, "project": project, "platform": platform}),
+            encode("signature"),
+        ]
+    ).decode("ascii")